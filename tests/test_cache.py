@@ -0,0 +1,48 @@
+import itertools
+import vt_cache
+from vt_cache import TranscriptCache, transcript_cache_key
+
+
+def write(path, size):
+    path.write_text("x" * size, encoding='utf-8')
+    return str(path)
+
+
+def test_cache_round_trip(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache"), 1000)
+    cache.put("a", write(tmp_path / "a.txt", 10))
+    assert cache.get("a", str(tmp_path / "copy.txt"))
+    assert (tmp_path / "copy.txt").read_text(encoding='utf-8') == "x" * 10
+    assert not cache.get("b", str(tmp_path / "other.txt"))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(vt_cache.time, "time", lambda: next(clock))
+    cache = TranscriptCache(str(tmp_path / "cache"), 250)
+    cache.put("a", write(tmp_path / "a.txt", 100))
+    cache.put("b", write(tmp_path / "b.txt", 100))
+    assert cache.get("a", str(tmp_path / "copy.txt")) # "b" is now the least recently used
+    cache.put("c", write(tmp_path / "c.txt", 100))
+    assert set(cache.entries) == {"a", "c"}
+    assert not (tmp_path / "cache" / "b.txt").exists()
+
+
+def test_cache_skips_transcripts_over_the_cap(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache"), 50)
+    cache.put("a", write(tmp_path / "a.txt", 100))
+    assert not cache.entries
+
+
+def test_cache_index_survives_a_restart(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache"), 1000)
+    cache.put("a", write(tmp_path / "a.txt", 10))
+    assert set(TranscriptCache(str(tmp_path / "cache"), 1000).entries) == {"a"}
+
+
+def test_cache_key_depends_on_model_and_options():
+    key = transcript_cache_key("fingerprint", "turbo", ["--compute_type", "int8"])
+    assert key == transcript_cache_key("fingerprint", "turbo", ("--compute_type", "int8"))
+    assert key != transcript_cache_key("fingerprint", "small", ["--compute_type", "int8"])
+    assert key != transcript_cache_key("fingerprint", "turbo", ["--compute_type", "float32"])
@@ -0,0 +1,59 @@
+from vt_chunking import ChunkedJob, plan_chunks, parse_timestamp, format_timestamp, SEGMENT_PATTERN
+
+
+def write_chunk(job, index, lines):
+    with open(job.done_path(index), 'w', encoding='utf-8') as f:
+        f.write("".join(f"[{format_timestamp(start)} --> {format_timestamp(end)}] {text}\n"
+                        for start, end, text in lines))
+
+
+def read_segments(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        matches = [SEGMENT_PATTERN.match(line.strip()) for line in f]
+    return [(parse_timestamp(m.group(1)), parse_timestamp(m.group(2)), m.group(3)) for m in matches]
+
+
+def test_timestamps_round_trip():
+    for seconds in (0.0, 59.999, 61.5, 3599.0, 3723.25):
+        assert parse_timestamp(format_timestamp(seconds)) == seconds
+    assert format_timestamp(3723.25) == "01:02:03.250"
+    assert format_timestamp(61.5) == "01:01.500"
+
+
+def test_plan_chunks_covers_the_file_without_gaps():
+    chunks = plan_chunks(1000.0, [], 300)
+    assert chunks[0][0] == 0.0 and chunks[-1][1] == 1000.0
+    assert all(end == next_start for (_, end), (next_start, _) in zip(chunks, chunks[1:]))
+    assert chunks == [(0.0, 300), (300, 600), (600, 1000.0)] # The short tail joins the last chunk
+
+
+def test_plan_chunks_cuts_at_the_nearest_silence():
+    chunks = plan_chunks(1000.0, [280.0, 310.0, 590.0, 900.0], 300)
+    assert [end for _, end in chunks[:-1]] == [310.0, 590.0]
+
+
+def test_plan_chunks_keeps_short_files_whole():
+    assert plan_chunks(400.0, [], 300) == [(0.0, 400.0)]
+
+
+def test_stitch_keeps_each_overlapping_segment_once(tmp_path):
+    job = ChunkedJob("media.mp4", "media.mp4", str(tmp_path), [(0.0, 10.0), (10.0, 20.0)], overlap=2)
+    # The second chunk's audio starts at 8 s, so its times are 8 s behind file time
+    write_chunk(job, 0, [(0.0, 4.0, "one"), (4.0, 9.0, "two"), (9.5, 11.5, "three")])
+    write_chunk(job, 1, [(1.5, 3.5, "three"), (4.0, 8.0, "four")])
+    out_path = str(tmp_path / "stitched.txt")
+    job.stitch(out_path)
+    assert read_segments(out_path) == [(0.0, 4.0, "one"), (4.0, 9.0, "two"), (9.5, 11.5, "three"),
+                                       (12.0, 16.0, "four")]
+
+
+def test_stitch_never_writes_a_segment_that_ends_before_it_starts(tmp_path):
+    job = ChunkedJob("media.mp4", "media.mp4", str(tmp_path), [(0.0, 10.0), (10.0, 20.0)], overlap=2)
+    write_chunk(job, 0, [(0.0, 9.8, "long")])
+    write_chunk(job, 1, [(1.0, 3.0, "one"), (1.5, 2.5, "inside")]) # 9-11 s and 9.5-10.5 s of file time
+    out_path = str(tmp_path / "stitched.txt")
+    job.stitch(out_path)
+    segments = read_segments(out_path)
+    assert [text for _, _, text in segments] == ["long", "one", "inside"]
+    assert all(start <= end for start, end, _ in segments)
+    assert all(end <= next_start for (_, end, _), (next_start, _, _) in zip(segments, segments[1:]))
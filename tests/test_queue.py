@@ -0,0 +1,28 @@
+from vt_queue import QueueModel
+
+
+def queue(*paths):
+    model = QueueModel()
+    model.extend((path, path, "No") for path in paths)
+    return model
+
+
+def test_move_block_up_keeps_runs_together():
+    model = queue("a", "b", "c", "d", "e")
+    changed = model.move_block(["c", "d"], "up")
+    assert model.paths() == ["a", "c", "d", "b", "e"]
+    assert changed == ["c", "d", "b"]
+    assert model.get("b").path == "b" # Positions are reindexed
+
+
+def test_move_block_down_moves_every_run():
+    model = queue("a", "b", "c", "d", "e")
+    model.move_block(["a", "c"], "down")
+    assert model.paths() == ["b", "a", "d", "c", "e"]
+
+
+def test_move_block_at_the_edge_does_nothing():
+    model = queue("a", "b", "c")
+    assert model.move_block(["a"], "up") == []
+    assert model.move_block(["c"], "down") == []
+    assert model.paths() == ["a", "b", "c"]
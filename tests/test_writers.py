@@ -0,0 +1,47 @@
+import json
+import pytest
+import vt_writers
+from vt_writers import render_transcript, iter_segments
+
+TRANSCRIPT = "[00:00.000 --> 00:02.500] Hello there.\n[00:02.500 --> 00:05.000] General Kenobi.\n"
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = tmp_path / "engine.txt"
+    path.write_text(TRANSCRIPT, encoding='utf-8')
+    return str(path)
+
+
+def test_iter_segments(transcript):
+    assert list(iter_segments(transcript)) == [(0.0, 2.5, "Hello there."), (2.5, 5.0, "General Kenobi.")]
+
+
+def test_render_writes_every_format(tmp_path, transcript):
+    outputs = {name: str(tmp_path / f"out.{name}") for name in ("txt", "srt", "vtt", "json")}
+    assert render_transcript(transcript, outputs) == []
+    assert (tmp_path / "out.txt").read_text(encoding='utf-8').split("\n")[:2] == ["Hello there.", "General Kenobi."]
+    assert "00:00:02,500 --> 00:00:05,000" in (tmp_path / "out.srt").read_text(encoding='utf-8')
+    assert (tmp_path / "out.vtt").read_text(encoding='utf-8').startswith("WEBVTT")
+    segments = json.loads((tmp_path / "out.json").read_text(encoding='utf-8'))['segments']
+    assert segments[1] == {"start": 2.5, "end": 5.0, "text": "General Kenobi."}
+
+
+def test_failed_close_leaves_no_outputs(tmp_path, transcript, monkeypatch):
+    def fail(self):
+        raise OSError("disk full")
+    monkeypatch.setattr(vt_writers.VttTranscriptWriter, "close", fail)
+    outputs = {name: str(tmp_path / f"out.{name}") for name in ("txt", "srt", "vtt", "json")}
+    with pytest.raises(OSError):
+        render_transcript(transcript, outputs)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["engine.txt"]
+
+
+def test_failed_write_leaves_no_outputs(tmp_path, transcript, monkeypatch):
+    def fail(self, start, end, text):
+        raise ValueError("bad segment")
+    monkeypatch.setattr(vt_writers.JsonTranscriptWriter, "write", fail)
+    outputs = {name: str(tmp_path / f"out.{name}") for name in ("txt", "srt", "json")}
+    with pytest.raises(ValueError):
+        render_transcript(transcript, outputs)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["engine.txt"]
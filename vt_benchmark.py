@@ -0,0 +1,370 @@
+"""Benchmarks of the app's own overhead, with a stand-in engine instead of Whisper.
+
+Measures end-to-end queue throughput, folder scan rate, queue load/save
+time, transcript rendering throughput, transcript search latency and GUI
+event-loop latency for a range
+of queue sizes, and writes the results as JSON so runs of different versions
+can be compared.
+
+Usage:
+    python vt_benchmark.py [--sizes 100,1000,10000,100000] [--output results.json]
+    python vt_benchmark.py --compare old.json new.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+# Constants
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_E2E_MAX = 1000 # Largest queue run end to end; every file starts a stand-in engine process
+DEFAULT_FAKE_LINES = 20 # Transcript lines the stand-in engine prints and writes per file
+MAX_RENDER_SEGMENTS = 20000
+FILES_PER_DIR = 100 # Layout of the generated folder tree for the scan benchmark
+SEARCH_SEGMENTS = 50 # Segments per generated transcript in the search benchmark
+SEARCH_VOCABULARY = 5000 # Distinct words; drawn with a Zipf-like skew so there are common and rare terms
+SEARCH_QUERIES = 20
+GUI_SAMPLE_SECONDS = 2.0 # How long event-loop latency is sampled
+GUI_TICK_MS = 10
+RESULTS_DIR = 'benchmark_results'
+
+
+def fake_engine_main(argv):
+    """Stand-in for faster-whisper-xxl: prints progress lines and writes <media>.txt at a set rate."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=DEFAULT_FAKE_LINES)
+    parser.add_argument("--line-delay", type=float, default=0.0, help="seconds between printed lines")
+    parser.add_argument("--output_dir", default=".")
+    parser.add_argument("--output_format", default="txt")
+    parser.add_argument("media")
+    args, _ = parser.parse_known_args(argv)
+    base_filename = os.path.splitext(os.path.basename(args.media))[0]
+    segments = []
+    with open(os.path.join(args.output_dir, f"{base_filename}.txt"), 'w', encoding='utf-8') as f:
+        for index in range(args.lines):
+            line = f"[{index // 60:02d}:{index % 60:02d}.000 --> {index // 60:02d}:{index % 60:02d}.900] Segment {index} of {base_filename}"
+            f.write(line + "\n")
+            print(line, flush=True)
+            # Every fifth segment is low-confidence, for cascade runs
+            segments.append({'start': float(index), 'end': index + 0.9, 'text': f"Segment {index} of {base_filename}",
+                             'avg_logprob': -1.0 if index % 5 == 4 else -0.2, 'no_speech_prob': 0.05,
+                             'compression_ratio': 1.3})
+            if args.line_delay:
+                time.sleep(args.line_delay)
+    if args.output_format == "json":
+        with open(os.path.join(args.output_dir, f"{base_filename}.json"), 'w', encoding='utf-8') as f:
+            json.dump({'segments': segments}, f)
+    return 0
+
+
+def timed(function, *args, **kwargs):
+    """Returns (seconds, result) of one call."""
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def record(results, benchmark, size, seconds, count, unit, **extra):
+    """Appends one result row and prints it."""
+    rate = count / seconds if seconds > 0 else None
+    row = {'benchmark': benchmark, 'size': size, 'seconds': round(seconds, 6),
+           'rate': round(rate, 3) if rate else None, 'unit': unit, **extra}
+    results.append(row)
+    rate_text = f"{rate:,.1f} {unit}" if rate else "-"
+    print(f"{benchmark:<22} {size:>8}  {seconds:>10.4f} s  {rate_text}", flush=True)
+
+
+def queue_items(size, root="media"):
+    return [(os.path.join(root, f"dir{index // FILES_PER_DIR:05d}", f"file{index:06d}.mp4"),
+             f"file{index:06d}.mp4", "No") for index in range(size)]
+
+
+def bench_scan(results, size, work_dir):
+    """Folder scan rate, cold (no index) and warm (unchanged tree, index reused)."""
+    from vt_scanner import FolderScanner
+    from vt_pipeline import SUPPORTED_EXTENSIONS
+    tree = os.path.join(work_dir, "tree")
+    for index in range(size):
+        dir_path = os.path.join(tree, f"dir{index // FILES_PER_DIR:05d}")
+        if index % FILES_PER_DIR == 0:
+            os.makedirs(dir_path, exist_ok=True)
+        open(os.path.join(dir_path, f"file{index:06d}.mp4"), 'w').close()
+    index_path = os.path.join(work_dir, "scan_index.json")
+    for benchmark in ("scan_cold", "scan_warm"):
+        scanner = FolderScanner(SUPPORTED_EXTENSIONS, index_path)
+        seconds, _ = timed(scanner.scan, tree, lambda batch: None, threading.Event())
+        record(results, benchmark, size, seconds, scanner.files_matched, "files/s",
+               dirs_listed=scanner.dirs_listed)
+
+
+def bench_queue_store(results, size, work_dir):
+    """Queue save (insert), load (into the in-memory model) and status update time."""
+    from vt_queue_store import QueueStore
+    from vt_queue import QueueModel
+    store = QueueStore(os.path.join(work_dir, "queue.db"))
+    items = queue_items(size)
+    seconds, _ = timed(store.add_items, items)
+    record(results, "queue_save", size, seconds, size, "items/s")
+
+    def load():
+        model = QueueModel()
+        for batch in store.iter_batches():
+            model.extend((item['path'], item['filename'], item['processed']) for item in batch)
+        return model
+    seconds, model = timed(load)
+    record(results, "queue_load", size, seconds, len(model), "items/s")
+
+    updates = random.Random(size).sample([path for path, _, _ in items], min(size, 1000))
+
+    def update_statuses():
+        for path in updates:
+            model.update_status(path, "Yes")
+            store.update_status(path, "Yes")
+    seconds, _ = timed(update_statuses)
+    record(results, "queue_status_update", size, seconds, len(updates), "updates/s")
+    store.close()
+
+
+def bench_render(results, size, work_dir):
+    """Transcript rendering throughput for PDF only and for every output format."""
+    from vt_writers import render_transcript, find_unicode_font, OUTPUT_FORMATS
+    segments = min(size, MAX_RENDER_SEGMENTS)
+    txt_path = os.path.join(work_dir, "transcript.txt")
+    with open(txt_path, 'w', encoding='utf-8') as f:
+        for index in range(segments):
+            f.write(f"[{index // 60:02d}:{index % 60:02d}.000 --> {index // 60:02d}:{index % 60:02d}.900] "
+                    f"Segment number {index}, a sentence of typical length for a spoken transcript.\n")
+    font_path = find_unicode_font()
+    for benchmark, formats in (("render_pdf", ("pdf",)), ("render_all_formats", OUTPUT_FORMATS)):
+        outputs = {f: os.path.join(work_dir, f"out.{f}") for f in formats}
+        seconds, _ = timed(render_transcript, txt_path, outputs, font_path)
+        record(results, benchmark, size, seconds, segments, "segments/s", segments=segments,
+               unicode_font=font_path is not None)
+
+
+def bench_end_to_end(results, size, work_dir, workers, fake_lines, line_delay):
+    """Queue throughput of the full pipeline with the stand-in engine."""
+    from vt_queue import QueueModel
+    from vt_cache import TranscriptCache
+    from vt_pipeline import TranscriptionPipeline
+    source = os.path.join(work_dir, "media")
+    destination = os.path.join(work_dir, "out")
+    os.makedirs(destination, exist_ok=True)
+    model = QueueModel()
+    items = []
+    for index in range(size):
+        dir_path = os.path.join(source, f"dir{index // FILES_PER_DIR:05d}")
+        os.makedirs(dir_path, exist_ok=True)
+        path = os.path.join(dir_path, f"file{index:06d}.mp4")
+        with open(path, 'wb') as f:
+            f.write(index.to_bytes(8, 'little')) # Unique content, so the transcript cache never hits
+        items.append((path, os.path.basename(path), "No"))
+    model.extend(items)
+    messages = []
+    pipeline = TranscriptionPipeline(
+        model, "tiny", destination,
+        TranscriptCache(os.path.join(work_dir, "cache"), 1024 * 1024 * 1024),
+        log=lambda message, color="black": messages.append(message),
+        set_status=lambda path, status: None, worker_count=workers,
+        scratch_dir=os.path.join(work_dir, "scratch"),
+        engine_command=[sys.executable, os.path.abspath(__file__), "--fake-engine",
+                        "--lines", str(fake_lines), "--line-delay", str(line_delay)])
+    seconds, _ = timed(pipeline.run)
+    done = sum(1 for entry in model.view() if pipeline.final_statuses.get(entry.path) == "Yes")
+    record(results, "end_to_end", size, seconds, done, "files/s", workers=workers, completed=done,
+           log_messages=len(messages))
+
+
+def bench_search(results, size, work_dir):
+    """Backfill rate of the transcript search index and query latency, with size transcripts."""
+    from vt_search import TranscriptIndex
+    rng = random.Random(size)
+    vocabulary = [f"w{index}" for index in range(SEARCH_VOCABULARY)]
+    weights = [1.0 / (rank + 1) for rank in range(SEARCH_VOCABULARY)]
+    transcripts = []
+    for index in range(size):
+        dir_path = os.path.join(work_dir, "out", f"dir{index // FILES_PER_DIR:05d}")
+        if index % FILES_PER_DIR == 0:
+            os.makedirs(dir_path, exist_ok=True)
+        txt_path = os.path.join(dir_path, f"file{index:06d}.txt")
+        with open(txt_path, 'w', encoding='utf-8') as f:
+            for segment in range(SEARCH_SEGMENTS):
+                words = " ".join(rng.choices(vocabulary, weights, k=12))
+                f.write(f"[{segment // 60:02d}:{segment % 60:02d}.000 --> {segment // 60:02d}:{segment % 60:02d}.900] "
+                        f"{words}\n")
+        transcripts.append((os.path.join("media", f"file{index:06d}.mp4"), txt_path))
+    index = TranscriptIndex(os.path.join(work_dir, "transcript_index.db"))
+    seconds, _ = timed(index.backfill, transcripts)
+    record(results, "search_backfill", size, seconds, size, "transcripts/s", segments=size * SEARCH_SEGMENTS)
+    for benchmark, words in (("search_common", vocabulary[:10]), ("search_rare", vocabulary[-10:]),
+                             ("search_phrase", [f'"{a} {b}"' for a, b in zip(vocabulary[:10], vocabulary[1:11])])):
+        queries = [words[query % len(words)] for query in range(SEARCH_QUERIES)]
+        seconds, _ = timed(lambda: [index.search(query) for query in queries])
+        record(results, benchmark, size, seconds, len(queries), "queries/s",
+               ms_per_query=round(seconds * 1000 / len(queries), 3))
+    index.close()
+
+
+def bench_gui(results, size, work_dir):
+    """Queue load time, sort time and event-loop latency of the GUI while a run updates it."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e: # No tkinter or no display
+        print(f"gui                    {size:>8}  skipped: {e}", flush=True)
+        results.append({'benchmark': 'gui', 'size': size, 'skipped': str(e)})
+        return
+    previous_dir = os.getcwd()
+    os.chdir(work_dir) # The app keeps settings.json and queue.db in the working directory
+    try:
+        from vt_queue_store import QueueStore
+        from vt_transcriber import VideoTranscriberApp
+        store = QueueStore()
+        items = queue_items(size)
+        store.add_items(items)
+        store.close()
+
+        started = time.perf_counter()
+        app = VideoTranscriberApp(root)
+        while app.queue_loading or len(app.queue_model) < size:
+            root.update()
+        record(results, "gui_queue_load", size, time.perf_counter() - started, size, "items/s")
+
+        seconds, _ = timed(lambda: (app.sort_queue_view("Filename"), app.refresh_queue_view()))
+        record(results, "gui_sort", size, seconds, size, "items/s")
+        app.sort_queue_view("Filename") # Back to queue order
+        app.sort_queue_view("Filename")
+
+        # A worker-like thread posts status changes and console lines while a timer measures how
+        # late its callbacks run; the lag is what a user feels as a sluggish window
+        stop = threading.Event()
+        paths = [path for path, _, _ in items]
+
+        def simulate_run():
+            index = 0
+            while not stop.is_set():
+                path = paths[index % len(paths)]
+                root.after(0, app.update_file_status, path, f"Processing (W{index % 4 + 1})")
+                app.update_console(f"[W1] [00:{index % 60:02d}.000 --> 00:{index % 60:02d}.900] simulated line")
+                index += 1
+                time.sleep(0.001)
+
+        lags = []
+
+        def tick(expected):
+            now = time.perf_counter()
+            lags.append(max(0.0, now - expected))
+            root.after(GUI_TICK_MS, tick, time.perf_counter() + GUI_TICK_MS / 1000)
+
+        worker = threading.Thread(target=simulate_run, daemon=True)
+        worker.start()
+        root.after(GUI_TICK_MS, tick, time.perf_counter() + GUI_TICK_MS / 1000)
+        end = time.perf_counter() + GUI_SAMPLE_SECONDS
+        while time.perf_counter() < end:
+            root.update()
+        stop.set()
+        worker.join()
+        lags.sort()
+        results.append({'benchmark': 'gui_event_latency', 'size': size, 'samples': len(lags),
+                        'mean_ms': round(1000 * sum(lags) / max(1, len(lags)), 3),
+                        'p95_ms': round(1000 * lags[int(len(lags) * 0.95)], 3) if lags else None,
+                        'max_ms': round(1000 * lags[-1], 3) if lags else None})
+        print(f"gui_event_latency      {size:>8}  p95 {results[-1]['p95_ms']} ms, max {results[-1]['max_ms']} ms",
+              flush=True)
+        app.queue_store.close()
+    finally:
+        root.destroy()
+        os.chdir(previous_dir)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(old_path, new_path):
+    """Prints the time ratio new/old for every benchmark and size present in both result files."""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = {(row['benchmark'], row['size']): row for row in json.load(f)['results']}
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)['results']
+    print(f"{'benchmark':<22} {'size':>8}  {'old s':>10}  {'new s':>10}  new/old")
+    for row in new:
+        previous = old.get((row['benchmark'], row['size']))
+        if not previous or 'seconds' not in row or 'seconds' not in previous:
+            continue
+        ratio = row['seconds'] / previous['seconds'] if previous['seconds'] else float('inf')
+        print(f"{row['benchmark']:<22} {row['size']:>8}  {previous['seconds']:>10.4f}  {row['seconds']:>10.4f}  {ratio:.2f}x")
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the transcriber's own overhead with a stand-in engine.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated queue sizes (default: %(default)s)")
+    parser.add_argument("--only", help="comma separated subset of: scan, queue, render, search, e2e, gui")
+    parser.add_argument("--e2e-max", type=int, default=DEFAULT_E2E_MAX,
+                        help="largest queue size run end to end (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=2, help="pipeline workers for the end-to-end run")
+    parser.add_argument("--fake-lines", type=int, default=DEFAULT_FAKE_LINES, help="lines per stand-in transcript")
+    parser.add_argument("--fake-line-delay", type=float, default=0.0, help="stand-in engine seconds per line")
+    parser.add_argument("--output", help="results file (default: benchmark_results/bench-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        return compare(*args.compare)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    selected = set(args.only.split(",")) if args.only else {"scan", "queue", "render", "search", "e2e", "gui"}
+
+    results = []
+    started = datetime.now()
+    for size in sizes:
+        for name, bench in (("scan", bench_scan), ("queue", bench_queue_store), ("render", bench_render),
+                            ("search", bench_search), ("e2e", bench_end_to_end), ("gui", bench_gui)):
+            if name not in selected or (name == "e2e" and size > args.e2e_max):
+                continue
+            work_dir = tempfile.mkdtemp(prefix=f"vt_bench_{name}_")
+            try:
+                if name == "e2e":
+                    bench(results, size, work_dir, args.workers, args.fake_lines, args.fake_line_delay)
+                else:
+                    bench(results, size, work_dir)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'meta': {'started': started.isoformat(timespec='seconds'), 'revision': git_revision(),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpu_count': os.cpu_count(), 'sizes': sizes, 'workers': args.workers,
+                 'fake_lines': args.fake_lines, 'fake_line_delay': args.fake_line_delay},
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    if "--fake-engine" in sys.argv:
+        sys.exit(fake_engine_main([arg for arg in sys.argv[1:] if arg != "--fake-engine"]))
+    multiprocessing.freeze_support() # Needed for the render process pool
+    sys.exit(main())
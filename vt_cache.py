@@ -0,0 +1,127 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import time
+
+# Constants
+DEFAULT_CACHE_DIR = 'transcript_cache'
+DEFAULT_CACHE_MB = 1024 # Size cap of the transcript cache
+FINGERPRINT_SAMPLES = 8 # Number of chunks hashed across the file
+FINGERPRINT_CHUNK_SIZE = 256 * 1024 # Bytes read per sampled chunk
+CACHE_INDEX_FILE = 'index.json'
+
+
+def media_fingerprint(file_path, samples=FINGERPRINT_SAMPLES, chunk_size=FINGERPRINT_CHUNK_SIZE):
+    """Returns a fast content fingerprint of a media file.
+
+    Only the file size and a few evenly spaced chunks are hashed, so multi-GB
+    videos are identified without being read in full.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(size).encode('ascii'))
+    with open(file_path, 'rb') as f:
+        if size <= samples * chunk_size:
+            digest.update(f.read())
+        else:
+            step = (size - chunk_size) // (samples - 1)
+            for index in range(samples):
+                f.seek(index * step)
+                digest.update(f.read(chunk_size))
+    return f"{size:x}-{digest.hexdigest()}"
+
+
+def transcript_cache_key(fingerprint, model, engine_options):
+    """Combines a media fingerprint with the model and engine options into a cache key."""
+    payload = json.dumps([fingerprint, model, list(engine_options)])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class TranscriptCache:
+    """Persistent, size-capped LRU cache of engine transcripts keyed by media content."""
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.entries = {} # key -> {'size': bytes, 'last_used': timestamp}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.load_index()
+
+    def load_index(self):
+        """Loads the cache index, dropping entries whose transcript file is gone."""
+        index_path = os.path.join(self.cache_dir, CACHE_INDEX_FILE)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        self.entries = {key: entry for key, entry in entries.items()
+                        if os.path.exists(self.entry_path(key))}
+
+    def save_index(self):
+        """Writes the cache index atomically."""
+        index_path = os.path.join(self.cache_dir, CACHE_INDEX_FILE)
+        temp_path = index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(temp_path, index_path)
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def total_bytes(self):
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def get(self, key, destination_path):
+        """Copies a cached transcript to destination_path (one job's own file). Returns True on a hit."""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return False
+            try:
+                # Copied under a temporary name, so the destination is never seen half written
+                shutil.copyfile(self.entry_path(key), destination_path + '.part')
+                os.replace(destination_path + '.part', destination_path)
+            except OSError:
+                del self.entries[key]
+                self.misses += 1
+                return False
+            self.entries[key]['last_used'] = time.time()
+            self.hits += 1
+            self.save_index()
+            return True
+
+    def put(self, key, transcript_path):
+        """Stores a transcript under key and evicts least recently used entries over the cap."""
+        size = os.path.getsize(transcript_path)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            shutil.copyfile(transcript_path, self.entry_path(key) + '.part')
+            os.replace(self.entry_path(key) + '.part', self.entry_path(key))
+            self.entries[key] = {'size': size, 'last_used': time.time()}
+            self.evict()
+            self.save_index()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        total = self.total_bytes()
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries.pop(key)['size']
+            try:
+                os.remove(self.entry_path(key))
+            except OSError:
+                pass
+
+    def stats_message(self):
+        """Returns a one-line summary of the cache counters for the console."""
+        with self.lock:
+            return (f"Transcript cache: {self.hits} hits, {self.misses} misses, "
+                    f"{len(self.entries)} entries, {self.total_bytes() / (1024 * 1024):.1f} MB used.")
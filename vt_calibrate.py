@@ -0,0 +1,203 @@
+"""Engine calibration.
+
+Runs a short reference clip through faster-whisper-xxl with each candidate
+compute type and thread count, and stores the fastest working combination
+per model in a per-host profile that the GUI and headless mode pick up.
+
+Usage:
+    python vt_calibrate.py CLIP [--models turbo,small] [--compute-types int8,float32] [--threads 4,8]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from vt_engine import SubprocessEngine, COMPUTE_TYPES, FALLBACK_COMPUTE_TYPE, engine_options
+from vt_chunking import ffmpeg_available, probe_duration, extract_chunk
+from vt_pipeline import MODEL_OPTIONS, engine_thread_count
+
+# Constants
+ENGINE_PROFILE_FILE = 'engine_profile.json'
+CALIBRATION_CLIP_SECONDS = 60 # Length of the reference clip cut from the given media file
+EXIT_ENGINE_MISSING = 3 # faster-whisper-xxl.exe could not be started, as in vt_headless
+
+
+def thread_candidates(cpu_count=None):
+    """Returns the thread counts tried by default: a quarter, half and all of the cores."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return sorted({max(1, cpu_count // 4), max(1, cpu_count // 2), cpu_count})
+
+
+class EngineProfile:
+    """Per-host engine settings chosen by calibration, kept in engine_profile.json under the host name."""
+
+    def __init__(self, path=ENGINE_PROFILE_FILE, host=None):
+        self.path = path
+        self.host = host or socket.gethostname()
+        self.lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.hosts = json.load(f)
+        except (OSError, ValueError):
+            self.hosts = {}
+
+    def settings(self, model):
+        """Returns the calibrated {'compute_type', 'threads', 'rtf', 'peak_memory'} of a model, or None."""
+        with self.lock:
+            return self.hosts.get(self.host, {}).get('models', {}).get(model)
+
+    def update(self, model, best, results):
+        """Stores the chosen settings of a model along with all calibration results."""
+        with self.lock:
+            host = self.hosts.setdefault(self.host, {'models': {}})
+            host['cpu_count'] = os.cpu_count()
+            host['models'][model] = {**best, 'calibrated': datetime.now().isoformat(timespec='seconds'),
+                                     'results': results}
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.hosts, f, indent=4)
+            os.replace(temp_path, self.path)
+
+    def engine_settings(self, model, worker_count, threads_per_worker=0):
+        """Returns (compute_type, engine_threads) for a run.
+
+        An explicit threads_per_worker wins; otherwise the calibrated thread
+        count is used, capped to an even slice of the cores when several
+        workers share them.
+        """
+        settings = self.settings(model)
+        compute_type = settings['compute_type'] if settings else FALLBACK_COMPUTE_TYPE
+        engine_threads = engine_thread_count(worker_count, threads_per_worker)
+        if settings and threads_per_worker <= 0:
+            engine_threads = min(settings['threads'], engine_threads) if engine_threads else settings['threads']
+        return compute_type, engine_threads
+
+    def describe(self, model):
+        """Returns a one-line description of the settings used for a model, for the Settings frame."""
+        settings = self.settings(model)
+        if not settings:
+            return f"{FALLBACK_COMPUTE_TYPE} (not calibrated)"
+        details = []
+        if settings.get('rtf') is not None: # Unknown when the clip length couldn't be probed
+            details.append(f"RTF {settings['rtf']:.3f}")
+        if settings.get('peak_memory'):
+            details.append(f"{settings['peak_memory'] / (1024 * 1024):.0f} MB")
+        description = f"{settings['compute_type']}, {settings['threads']} threads"
+        return description + (f" ({', '.join(details)})" if details else "")
+
+
+def prepare_clip(media_path, work_dir, seconds=CALIBRATION_CLIP_SECONDS):
+    """Returns (clip_path, clip_seconds): the first seconds of media_path, or the whole file without ffmpeg."""
+    duration = probe_duration(media_path) if ffmpeg_available() else None
+    if duration is None:
+        return media_path, None
+    if duration <= seconds:
+        return media_path, duration
+    clip_path = os.path.join(work_dir, "calibration_clip.wav")
+    extract_chunk(media_path, 0.0, seconds, 0.0, clip_path)
+    return clip_path, float(seconds)
+
+
+def calibrate(clip_path, clip_seconds, models, log, compute_types=COMPUTE_TYPES, thread_counts=None,
+              profile=None, stop_flag=None, engine_command=None):
+    """Times every compute type and thread count for each model and stores the fastest in profile.
+
+    Each model gets an untimed warm-up run first, so a model download or the
+    engine unpacking itself doesn't count against the first candidate.
+    Returns {model: best result or None}.
+    """
+    thread_counts = thread_counts or thread_candidates()
+    stop_flag = stop_flag or threading.Event()
+    best_by_model = {}
+    output_dir = tempfile.mkdtemp(prefix="vt_calibrate_")
+    try:
+        for model in models:
+            log(f"[INFO] Calibrating '{model}' on {os.path.basename(clip_path)}...", "blue")
+            engine = SubprocessEngine(model, thread_counts[-1], log, engine_command=engine_command)
+            engine.run_engine(clip_path, output_dir, lambda output: None, stop_flag, None)
+            results = []
+            for compute_type in compute_types:
+                for threads in thread_counts:
+                    if stop_flag.is_set():
+                        return best_by_model
+                    engine = SubprocessEngine(model, threads, log, options=engine_options(compute_type),
+                                              engine_command=engine_command)
+                    result = engine.run_engine(clip_path, output_dir, lambda output: None, stop_flag, None)
+                    # Model load time is paid once per run, not per second of audio; leave it out of the RTF
+                    engine_seconds = result.wall_time - (result.load_time or 0.0)
+                    record = {'compute_type': compute_type, 'threads': threads, 'ok': result.returncode == 0,
+                              'wall_time': round(result.wall_time, 3), 'peak_memory': result.peak_memory,
+                              'rtf': round(engine_seconds / clip_seconds, 4) if clip_seconds else None}
+                    results.append(record)
+                    if record['ok']:
+                        memory = f", peak {result.peak_memory / (1024 * 1024):.0f} MB" if result.peak_memory else ""
+                        log(f"[INFO] {model} {compute_type} x{threads}: {result.wall_time:.1f} s{memory}.", "blue")
+                    else:
+                        log(f"[WARNING] {model} {compute_type} x{threads} failed (Exit Code: {result.returncode}).",
+                            "orange")
+            working = [record for record in results if record['ok']]
+            if not working:
+                log(f"[ERROR] No compute type worked for '{model}'; keeping '{FALLBACK_COMPUTE_TYPE}'.", "red")
+                best_by_model[model] = None
+                continue
+            best = min(working, key=lambda record: (record['wall_time'], record['peak_memory'] or 0))
+            best = {key: best[key] for key in ('compute_type', 'threads', 'rtf', 'peak_memory')}
+            best_by_model[model] = best
+            if profile is not None:
+                profile.update(model, best, results)
+            log(f"[SUCCESS] '{model}' uses {best['compute_type']} with {best['threads']} threads.", "green")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return best_by_model
+
+
+def log_to_stderr(message, color="black"):
+    sys.stderr.write(f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n")
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the fastest engine compute type and thread count for this host.")
+    parser.add_argument("clip", help="media file the reference clip is cut from")
+    parser.add_argument("--models", default=",".join(MODEL_OPTIONS), help="comma separated models (default: all)")
+    parser.add_argument("--compute-types", default=",".join(COMPUTE_TYPES), help="comma separated compute types")
+    parser.add_argument("--threads", help="comma separated thread counts (default: a quarter, half and all cores)")
+    parser.add_argument("--seconds", type=int, default=CALIBRATION_CLIP_SECONDS, help="length of the reference clip")
+    parser.add_argument("--profile", default=ENGINE_PROFILE_FILE, help="profile file to update (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    compute_types = [compute_type.strip() for compute_type in args.compute_types.split(",") if compute_type.strip()]
+    thread_counts = sorted({int(count) for count in args.threads.split(",")}) if args.threads else None
+    unknown = [model for model in models if model not in MODEL_OPTIONS]
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+    if not os.path.isfile(args.clip):
+        parser.error(f"clip not found: {args.clip}")
+
+    work_dir = tempfile.mkdtemp(prefix="vt_clip_")
+    try:
+        clip_path, clip_seconds = prepare_clip(args.clip, work_dir, args.seconds)
+        profile = EngineProfile(args.profile)
+        started = time.time()
+        best_by_model = calibrate(clip_path, clip_seconds, models, log_to_stderr, compute_types, thread_counts,
+                                  profile)
+    except FileNotFoundError as e:
+        log_to_stderr(f"[ERROR] 'faster-whisper-xxl.exe' not found. Please ensure it's in your system PATH. ({e})",
+                      "red")
+        return EXIT_ENGINE_MISSING
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    log_to_stderr(f"[INFO] Calibration finished in {time.time() - started:.0f} s.")
+    for model in models:
+        print(f"{model}: {profile.describe(model)}")
+    return 0 if any(best_by_model.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
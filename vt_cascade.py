@@ -0,0 +1,184 @@
+import os
+import json
+import shutil
+from vt_chunking import SEGMENT_PATTERN, parse_timestamp, format_timestamp, extract_chunk
+
+# Constants
+CASCADE_OFF = "Off"
+CASCADE_DRAFT_MODELS = ("tiny", "small")
+CASCADE_WORK_DIR = '.cascade' # Created inside the destination folder; the draft and redone ranges survive a restart
+CASCADE_PLAN_FILE = 'plan.json'
+DRAFT_FILE = 'draft.json'
+DEFAULT_MIN_LOGPROB = -0.6 # Draft segments with a lower average log-probability are redone
+MAX_NO_SPEECH_PROB = 0.6 # Draft segments the draft model doubted were speech at all are redone too
+MAX_COMPRESSION_RATIO = 2.4 # Repetitive draft text, the sign of a hallucination loop
+MERGE_GAP_SECONDS = 3.0 # Low-confidence segments closer than this are redone as one range
+RANGE_PAD_SECONDS = 1.0 # Audio added on both sides of a range so the cut doesn't clip words
+FULL_PASS_FRACTION = 0.6 # Above this share of low-confidence audio, one pass over the whole file is cheaper
+
+
+def read_draft(json_path):
+    """Returns the segments of an engine JSON transcript as dicts, in time order.
+
+    'scored' tells whether the engine reported an average log-probability;
+    missing confidence fields default to values that count as confident.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    segments = []
+    for segment in data.get('segments', []):
+        try:
+            segments.append({'start': float(segment['start']), 'end': float(segment['end']),
+                             'text': segment.get('text', '').strip(),
+                             'avg_logprob': float(segment.get('avg_logprob', 0.0)),
+                             'no_speech_prob': float(segment.get('no_speech_prob', 0.0)),
+                             'compression_ratio': float(segment.get('compression_ratio', 0.0)),
+                             'scored': segment.get('avg_logprob') is not None})
+        except (KeyError, TypeError, ValueError):
+            continue # A segment without times can't be placed
+    segments.sort(key=lambda segment: segment['start'])
+    return segments
+
+
+def has_confidence(segments):
+    """Returns True if any draft segment carries confidence data to plan ranges from."""
+    return any(segment['scored'] for segment in segments)
+
+
+def low_confidence(segment, min_logprob=DEFAULT_MIN_LOGPROB):
+    return (segment['avg_logprob'] < min_logprob or segment['no_speech_prob'] > MAX_NO_SPEECH_PROB
+            or segment['compression_ratio'] > MAX_COMPRESSION_RATIO)
+
+
+def plan_ranges(segments, min_logprob=DEFAULT_MIN_LOGPROB):
+    """Returns the (start, end) ranges of the low-confidence draft segments, nearby ones merged."""
+    ranges = []
+    for segment in segments:
+        if not low_confidence(segment, min_logprob):
+            continue
+        if ranges and segment['start'] - ranges[-1][1] <= MERGE_GAP_SECONDS:
+            ranges[-1][1] = max(ranges[-1][1], segment['end'])
+        else:
+            ranges.append([segment['start'], segment['end']])
+    return [tuple(time_range) for time_range in ranges]
+
+
+class CascadeJob:
+    """Two-pass transcript of one file: a draft of the whole file and redone low-confidence ranges.
+
+    The draft, the range plan and each finished range are kept in a work
+    directory keyed by the transcript cache key and the file's path, so a
+    stopped run only redoes the range that was running.
+    """
+
+    def __init__(self, file_path, filename, work_dir, media_path=None):
+        self.file_path = file_path
+        self.filename = filename
+        self.work_dir = work_dir
+        self.media_path = media_path or file_path # Where the draft and the ranges are taken from
+        self.segments = []
+        self.ranges = []
+        self.remaining = set()
+
+    @property
+    def draft_path(self):
+        return os.path.join(self.work_dir, DRAFT_FILE)
+
+    def has_draft(self):
+        return os.path.exists(self.draft_path)
+
+    def keep_draft(self, output_dir):
+        """Moves the engine JSON of the draft run into place. Returns False if the engine wrote none."""
+        base_filename = os.path.splitext(os.path.basename(self.media_path))[0]
+        engine_json_path = os.path.join(output_dir, f"{base_filename}.json")
+        if not os.path.exists(engine_json_path):
+            return False
+        os.replace(engine_json_path, self.draft_path)
+        return True
+
+    def plan(self, min_logprob=DEFAULT_MIN_LOGPROB):
+        """Reads the draft and picks the ranges to redo, reusing the ranges finished by an earlier run."""
+        self.segments = read_draft(self.draft_path)
+        plan_path = os.path.join(self.work_dir, CASCADE_PLAN_FILE)
+        try:
+            with open(plan_path, 'r', encoding='utf-8') as f:
+                saved_plan = json.load(f)
+        except (OSError, ValueError):
+            saved_plan = None
+        if saved_plan and saved_plan.get('min_logprob') == min_logprob:
+            self.ranges = [tuple(time_range) for time_range in saved_plan['ranges']]
+        else:
+            # Ranges redone for another threshold don't line up with this plan
+            for name in os.listdir(self.work_dir):
+                if name.startswith("range_"):
+                    os.remove(os.path.join(self.work_dir, name))
+            self.ranges = plan_ranges(self.segments, min_logprob)
+            with open(plan_path, 'w', encoding='utf-8') as f:
+                json.dump({'min_logprob': min_logprob, 'ranges': self.ranges}, f)
+        self.remaining = {index for index in range(len(self.ranges)) if not os.path.exists(self.done_path(index))}
+        return self.ranges
+
+    def range_seconds(self):
+        return sum(end - start for start, end in self.ranges)
+
+    def range_name(self, index):
+        return f"range_{index:04d}"
+
+    def audio_path(self, index):
+        return os.path.join(self.work_dir, f"{self.range_name(index)}.wav")
+
+    def done_path(self, index):
+        return os.path.join(self.work_dir, f"{self.range_name(index)}.done.txt")
+
+    def extract(self, index):
+        start, end = self.ranges[index]
+        return extract_chunk(self.media_path, start, end, RANGE_PAD_SECONDS, self.audio_path(index))
+
+    def complete(self, index, engine_txt_path):
+        """Keeps the engine transcript of a range (missing means nothing was said)."""
+        if os.path.exists(engine_txt_path):
+            os.replace(engine_txt_path, self.done_path(index))
+        else:
+            open(self.done_path(index), 'w', encoding='utf-8').close()
+        try:
+            os.remove(self.audio_path(index))
+        except OSError:
+            pass
+        self.remaining.discard(index)
+
+    def merge(self, txt_output_path):
+        """Writes the draft with its low-confidence ranges replaced by their second pass, as an engine-style TXT.
+
+        A segment of the second pass is kept if its midpoint lies in its
+        range; a draft segment is kept if its midpoint lies in none.
+        """
+        merged = []
+        for index, (start, end) in enumerate(self.ranges):
+            offset = max(0.0, start - RANGE_PAD_SECONDS)
+            with open(self.done_path(index), 'r', encoding='utf-8') as f:
+                for line in f:
+                    match = SEGMENT_PATTERN.match(line.strip())
+                    if not match:
+                        continue
+                    segment_start = parse_timestamp(match.group(1)) + offset
+                    segment_end = parse_timestamp(match.group(2)) + offset
+                    if start <= (segment_start + segment_end) / 2 <= end:
+                        merged.append((segment_start, segment_end, match.group(3)))
+        for segment in self.segments:
+            midpoint = (segment['start'] + segment['end']) / 2
+            if segment['text'] and not any(start <= midpoint <= end for start, end in self.ranges):
+                merged.append((segment['start'], segment['end'], segment['text']))
+        merged.sort()
+
+        temp_path = txt_output_path + '.part'
+        last_end = 0.0
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            for segment_start, segment_end, text in merged:
+                segment_start = max(segment_start, last_end) # Never start before the previous segment ended
+                segment_end = max(segment_end, segment_start) # ...nor end before it starts
+                last_end = segment_end
+                out.write(f"[{format_timestamp(segment_start)} --> {format_timestamp(segment_end)}] {text}\n")
+        os.replace(temp_path, txt_output_path)
+
+    def cleanup(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
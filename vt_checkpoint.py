@@ -0,0 +1,111 @@
+import os
+import shutil
+import threading
+from vt_chunking import SEGMENT_PATTERN, parse_timestamp, format_timestamp, extract_chunk
+from vt_schedule import format_duration
+
+# Constants
+CHECKPOINT_DIR = '.checkpoints' # Created inside the destination folder, next to CHUNK_WORK_DIR
+CHECKPOINT_SEGMENTS_FILE = 'segments.txt'
+REMAINDER_NAME = 'remainder' # Audio after the checkpoint, and the engine transcript of it
+MIN_RESUME_SECONDS = 30 # Checkpoints covering less audio are thrown away and the file starts over
+
+
+def progress_status(position, duration):
+    """Returns the partial progress shown in the queue, e.g. '42% / 01:12:30'."""
+    if duration:
+        return f"{min(100, int(position * 100 / duration))}% / {format_duration(position)}"
+    return format_duration(position)
+
+
+class TranscriptCheckpoint:
+    """Segments of a whole-file transcription, saved as the engine streams them.
+
+    A stopped or crashed file is resumed by transcribing only the audio after
+    the last saved segment and appending it, shifted to file time, to the
+    saved segments. The work folder is keyed by the transcript cache key and
+    the file's path, so a checkpoint is only reused for the same media, model
+    and engine options, and identical copies transcribed at once never share one.
+    """
+
+    def __init__(self, work_root, checkpoint_key):
+        self.work_dir = os.path.join(work_root, checkpoint_key)
+        self.segments_path = os.path.join(self.work_dir, CHECKPOINT_SEGMENTS_FILE)
+        self.lock = threading.Lock()
+        self.file = None
+        self.offset = 0.0 # File time of the audio the engine is given
+        self.remainder_path = None
+        self.saved_lines = [] # Segments saved by earlier runs
+        self.last_end = 0.0
+        self.load()
+
+    def load(self):
+        """Reads saved segments, dropping a line cut off by a crash."""
+        try:
+            with open(self.segments_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    match = SEGMENT_PATTERN.match(line.strip())
+                    if match and line.endswith("\n"):
+                        self.saved_lines.append(line)
+                        self.last_end = max(self.last_end, parse_timestamp(match.group(2)))
+        except OSError:
+            pass
+
+    def resume_offset(self):
+        """Returns where a resumed run starts, or 0.0 if the file has to start over."""
+        return self.last_end if self.last_end >= MIN_RESUME_SECONDS else 0.0
+
+    def cut_remainder(self, media_path, duration):
+        """Extracts the audio after the checkpoint into remainder_path, for the engine to resume from."""
+        remainder_path = os.path.join(self.work_dir, f"{REMAINDER_NAME}.wav")
+        extract_chunk(media_path, self.last_end, duration, 0.0, remainder_path)
+        self.offset = self.last_end
+        self.remainder_path = remainder_path
+
+    def begin(self):
+        """Starts saving segments; without a resume, earlier segments are discarded."""
+        if not self.offset:
+            self.saved_lines = []
+            self.last_end = 0.0
+        os.makedirs(self.work_dir, exist_ok=True)
+        with open(self.segments_path, 'w', encoding='utf-8') as f:
+            f.writelines(self.saved_lines)
+        self.file = open(self.segments_path, 'a', encoding='utf-8')
+
+    def record(self, output):
+        """Saves an engine output line if it is a segment. Returns the segment's end in file time, else None."""
+        match = SEGMENT_PATTERN.match(output.strip())
+        if not match or self.file is None:
+            return None
+        start = parse_timestamp(match.group(1)) + self.offset
+        end = parse_timestamp(match.group(2)) + self.offset
+        with self.lock:
+            if end <= self.last_end: # Already saved, e.g. by an attempt the engine retried from the start
+                return end
+            self.file.write(f"[{format_timestamp(start)} --> {format_timestamp(end)}] {match.group(3)}\n")
+            self.file.flush() # Survives a crash of the app, not just of the engine
+            self.last_end = max(self.last_end, end)
+        return end
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def finish(self, engine_txt_path, txt_output_path):
+        """Writes the saved segments plus the shifted engine transcript of the remainder as the final TXT."""
+        temp_path = txt_output_path + '.part'
+        with open(temp_path, 'w', encoding='utf-8') as out, open(engine_txt_path, 'r', encoding='utf-8') as f:
+            out.writelines(self.saved_lines)
+            for line in f:
+                match = SEGMENT_PATTERN.match(line.strip())
+                if match:
+                    start = parse_timestamp(match.group(1)) + self.offset
+                    end = parse_timestamp(match.group(2)) + self.offset
+                    out.write(f"[{format_timestamp(start)} --> {format_timestamp(end)}] {match.group(3)}\n")
+        os.replace(temp_path, txt_output_path)
+
+    def discard(self):
+        self.close()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
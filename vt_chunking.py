@@ -0,0 +1,227 @@
+import os
+import re
+import json
+import shutil
+import threading
+import subprocess
+from vt_engine import CREATION_FLAGS
+
+# Constants
+FFMPEG_EXE = "ffmpeg"
+FFPROBE_EXE = "ffprobe"
+CHUNK_WORK_DIR = '.chunks' # Created inside the destination folder; completed chunks survive a restart
+CHUNK_PLAN_FILE = 'plan.json'
+CHUNK_RETRIES = 2 # Extra attempts for a failed chunk before the whole file is marked "Failed"
+DEFAULT_CHUNK_MINUTES = 0 # 0 = chunking off
+DEFAULT_CHUNK_OVERLAP = 2 # Seconds of audio shared by neighbouring chunks
+MIN_CHUNKS = 2 # Files shorter than this many chunk lengths are transcribed whole
+SILENCE_NOISE = "-30dB" # silencedetect threshold
+SILENCE_MIN_SECONDS = 0.5
+SILENCE_SEARCH_FRACTION = 0.25 # A cut may move this fraction of a chunk length to reach a silence
+
+SILENCE_PATTERN = re.compile(r'silence_(start|end): (-?\d+(?:\.\d+)?)')
+SEGMENT_PATTERN = re.compile(r'^\[((?:\d{2}:)?\d{2}:\d{2}\.\d{3})\s*-->\s*((?:\d{2}:)?\d{2}:\d{2}\.\d{3})\]\s*(.*)$')
+
+
+def parse_timestamp(text):
+    """Parses MM:SS.mmm or HH:MM:SS.mmm into seconds."""
+    seconds = 0.0
+    for part in text.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_timestamp(seconds):
+    """Formats seconds like faster-whisper-xxl: MM:SS.mmm, or HH:MM:SS.mmm past an hour."""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    if hours:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+    return f"{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
+def ffmpeg_available():
+    return shutil.which(FFMPEG_EXE) is not None and shutil.which(FFPROBE_EXE) is not None
+
+
+def probe_duration(media_path):
+    """Returns the media duration in seconds, or None if ffprobe can't tell."""
+    try:
+        output = subprocess.run(
+            [FFPROBE_EXE, "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", media_path],
+            capture_output=True, text=True, creationflags=CREATION_FLAGS).stdout
+        return float(output.strip())
+    except (OSError, ValueError):
+        return None
+
+
+def detect_silences(media_path):
+    """Returns the midpoints (seconds) of the silent stretches ffmpeg finds in the audio track."""
+    process = subprocess.run(
+        [FFMPEG_EXE, "-hide_banner", "-nostats", "-i", media_path, "-vn",
+         "-af", f"silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_SECONDS}", "-f", "null", "-"],
+        capture_output=True, text=True, creationflags=CREATION_FLAGS)
+    midpoints = []
+    silence_start = None
+    for kind, value in SILENCE_PATTERN.findall(process.stderr):
+        if kind == 'start':
+            silence_start = max(0.0, float(value))
+        elif silence_start is not None:
+            midpoints.append((silence_start + float(value)) / 2)
+            silence_start = None
+    return midpoints
+
+
+def plan_chunks(duration, silences, chunk_seconds):
+    """Splits [0, duration] into (start, end) ranges of about chunk_seconds, cutting at silences when possible."""
+    boundaries = [0.0]
+    search = chunk_seconds * SILENCE_SEARCH_FRACTION
+    while duration - boundaries[-1] > chunk_seconds * 1.5:
+        target = boundaries[-1] + chunk_seconds
+        nearby = [s for s in silences if abs(s - target) <= search and s > boundaries[-1]]
+        boundaries.append(min(nearby, key=lambda s: abs(s - target)) if nearby else target)
+    boundaries.append(duration)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def extract_chunk(media_path, start, end, overlap, chunk_path):
+    """Writes [start - overlap, end + overlap] of the audio track as 16 kHz mono WAV."""
+    clip_start = max(0.0, start - overlap)
+    temp_path = chunk_path + '.part.wav'
+    subprocess.run(
+        [FFMPEG_EXE, "-hide_banner", "-loglevel", "error", "-y", "-ss", f"{clip_start:.3f}",
+         "-t", f"{end + overlap - clip_start:.3f}", "-i", media_path, "-vn", "-ac", "1", "-ar", "16000",
+         temp_path],
+        check=True, capture_output=True, creationflags=CREATION_FLAGS)
+    os.replace(temp_path, chunk_path)
+    return clip_start
+
+
+class ChunkedJob:
+    """Tracks the chunks of one long file while workers transcribe them in parallel.
+
+    Chunk audio and finished chunk transcripts live in a work directory keyed
+    by the transcript cache key, so a stop or crash only loses the chunks that
+    were still running.
+    """
+
+    def __init__(self, file_path, filename, work_dir, chunks, overlap, media_path=None):
+        self.file_path = file_path
+        self.media_path = media_path or file_path # Where the chunk audio is cut from
+        self.filename = filename
+        self.work_dir = work_dir
+        self.chunks = chunks # [(start, end), ...]
+        self.overlap = overlap
+        self.lock = threading.Lock()
+        self.remaining = set(range(len(chunks)))
+        self.attempts = {}
+        self.failed = False
+
+    @classmethod
+    def prepare(cls, file_path, filename, work_root, cache_key, chunk_seconds, overlap, log, media_path=None):
+        """Returns a ChunkedJob for a long file, or None if it should be transcribed whole."""
+        media_path = media_path or file_path
+        duration = probe_duration(media_path)
+        if duration is None or duration < chunk_seconds * MIN_CHUNKS:
+            return None
+        work_dir = os.path.join(work_root, cache_key)
+        plan_path = os.path.join(work_dir, CHUNK_PLAN_FILE)
+        plan = {'chunk_seconds': chunk_seconds, 'overlap': overlap}
+        try:
+            with open(plan_path, 'r', encoding='utf-8') as f:
+                saved_plan = json.load(f)
+        except (OSError, ValueError):
+            saved_plan = None
+        if saved_plan and all(saved_plan.get(key) == value for key, value in plan.items()):
+            chunks = [tuple(chunk) for chunk in saved_plan['chunks']]
+        else:
+            # No plan yet, or it was made with other settings: its chunks can't be reused
+            shutil.rmtree(work_dir, ignore_errors=True)
+            os.makedirs(work_dir, exist_ok=True)
+            chunks = plan_chunks(duration, detect_silences(media_path), chunk_seconds)
+            plan['chunks'] = chunks
+            with open(plan_path, 'w', encoding='utf-8') as f:
+                json.dump(plan, f)
+        job = cls(file_path, filename, work_dir, chunks, overlap, media_path)
+        job.remaining = {index for index in range(len(chunks)) if not os.path.exists(job.done_path(index))}
+        reused = len(chunks) - len(job.remaining)
+        log(f"[INFO] Split '{filename}' ({format_timestamp(duration)}) into {len(chunks)} chunks"
+            + (f", {reused} already done." if reused else "."), "blue")
+        return job
+
+    def chunk_name(self, index):
+        return f"chunk_{index:04d}"
+
+    def audio_path(self, index):
+        return os.path.join(self.work_dir, f"{self.chunk_name(index)}.wav")
+
+    def done_path(self, index):
+        return os.path.join(self.work_dir, f"{self.chunk_name(index)}.done.txt")
+
+    def extract(self, index):
+        """Extracts the audio of one chunk. Returns the clip start used for timestamp offsets."""
+        start, end = self.chunks[index]
+        return extract_chunk(self.media_path, start, end, self.overlap, self.audio_path(index))
+
+    def complete(self, index, engine_txt_path):
+        """Keeps the engine transcript of a chunk (missing means silence). Returns True when all chunks are done."""
+        if os.path.exists(engine_txt_path):
+            os.replace(engine_txt_path, self.done_path(index))
+        else:
+            open(self.done_path(index), 'w', encoding='utf-8').close()
+        try:
+            os.remove(self.audio_path(index))
+        except OSError:
+            pass
+        with self.lock:
+            self.remaining.discard(index)
+            return not self.remaining and not self.failed
+
+    def retry(self, index):
+        """Counts a failed attempt. Returns True if the chunk may be tried again."""
+        with self.lock:
+            self.attempts[index] = self.attempts.get(index, 0) + 1
+            if self.attempts[index] > CHUNK_RETRIES:
+                self.failed = True
+                return False
+            return True
+
+    def progress(self):
+        with self.lock:
+            return len(self.chunks) - len(self.remaining), len(self.chunks)
+
+    def stitch(self, txt_output_path):
+        """Writes the chunk transcripts in order, shifted to file time, into one engine-style TXT.
+
+        Neighbouring chunks overlap, so each segment is kept only by the chunk
+        whose own range contains the segment's midpoint, and a segment is never
+        allowed to start before the previous one ended (nor to end before it starts).
+        """
+        temp_path = txt_output_path + '.part'
+        last_end = 0.0
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            for index, (start, end) in enumerate(self.chunks):
+                offset = max(0.0, start - self.overlap)
+                last_chunk = index == len(self.chunks) - 1
+                with open(self.done_path(index), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        match = SEGMENT_PATTERN.match(line.strip())
+                        if not match:
+                            continue
+                        segment_start = parse_timestamp(match.group(1)) + offset
+                        segment_end = parse_timestamp(match.group(2)) + offset
+                        midpoint = (segment_start + segment_end) / 2
+                        if midpoint < start or (midpoint >= end and not last_chunk):
+                            continue
+                        segment_start = max(segment_start, last_end)
+                        segment_end = max(segment_end, segment_start)
+                        last_end = segment_end
+                        out.write(f"[{format_timestamp(segment_start)} --> {format_timestamp(segment_end)}] "
+                                  f"{match.group(3)}\n")
+        os.replace(temp_path, txt_output_path)
+
+    def cleanup(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
@@ -0,0 +1,353 @@
+"""Job coordinator for remote workers.
+
+Exposes the transcription queue over a small JSON-over-HTTP API. Remote
+worker processes (vt_worker.py) pull jobs, hold them under a lease that they
+renew with heartbeats, download the media, run their own engine and upload
+the transcript. A job whose lease runs out (e.g. the worker died) goes back
+to the queue for another worker.
+
+API (all POST bodies and replies are JSON unless noted):
+    POST /lease                {"worker"} -> 200 job | 204 nothing to do
+    GET  /media/<lease>        media file bytes
+    POST /heartbeat/<lease>    {"output": [lines]} -> {"pause"} | 410 lease lost
+    POST /complete/<lease>     {"transcript", "wall_time", ...} -> {} | 410
+    POST /fail/<lease>         {"returncode", "stderr"} -> {} | 410
+    POST /release/<lease>      {} -> {} (the job goes back to the queue)
+    GET  /status               pending and leased jobs, workers last seen
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from vt_engine import EngineResult, FALLBACK_COMPUTE_TYPE
+
+# Constants
+DEFAULT_COORDINATOR_ADDRESS = "127.0.0.1:8765" # Loopback only; bind to 0.0.0.0 to accept workers on the network
+DEFAULT_REMOTE_SLOTS = 8 # Files handed out at the same time; chunks of long files count separately
+LEASE_SECONDS = 60 # A job is re-leased when its worker hasn't sent a heartbeat for this long
+HEARTBEAT_SECONDS = 10 # How often workers renew their lease; sent to them with every job
+LEASE_WAIT_SECONDS = 10 # A lease request waits this long for a job before answering 204
+MAX_LEASES = 3 # Leases of one job that may run out before it is marked failed
+TOKEN_HEADER = "X-VT-Token"
+
+
+def parse_address(address):
+    """Returns (host, port) from 'host:port'."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class RemoteJob:
+    """One engine run handed to a remote worker: a whole file, a chunk or a checkpoint remainder."""
+
+    def __init__(self, media_path, output_dir, model, compute_type, pause_flag):
+        self.id = uuid.uuid4().hex
+        self.media_path = media_path
+        self.output_dir = output_dir
+        self.model = model
+        self.compute_type = compute_type
+        self.pause_flag = pause_flag
+        self.lease_id = None
+        self.worker = None
+        self.expires = 0.0
+        self.leases = 0
+        self.output = deque() # Engine lines from heartbeats, drained by the waiting pipeline thread
+        self.result = None
+        self.done = threading.Event()
+        self.started = time.time()
+
+
+class Coordinator:
+    """Hands engine runs of the pipeline to remote workers.
+
+    Pipeline workers call RemoteEngine.transcribe, which submits a RemoteJob
+    and blocks until a remote worker completes or fails it, so caching,
+    checkpoints, chunking, rendering and the status column work exactly as
+    with local engines. With a token set, requests must carry it in the
+    X-VT-Token header.
+    """
+
+    def __init__(self, address, log, token=None, lease_seconds=LEASE_SECONDS, max_leases=MAX_LEASES):
+        self.host, self.port = parse_address(address)
+        self.log = log
+        self.token = token
+        self.lease_seconds = lease_seconds
+        self.max_leases = max_leases
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.leased = {} # lease id -> RemoteJob
+        self.workers = {} # worker name -> time last seen
+        self.server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.server.server_port if self.server else self.port}"
+
+    def start(self):
+        """Starts serving in a background thread. Raises OSError if the port is taken."""
+        self.server = ThreadingHTTPServer((self.host, self.port), CoordinatorRequestHandler)
+        self.server.daemon_threads = True
+        self.server.coordinator = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.log(f"[INFO] Coordinator listening on {self.url}. Start workers with: "
+                 f"python vt_worker.py --coordinator {self.url}", "blue")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def engine(self, model, compute_type=FALLBACK_COMPUTE_TYPE):
+        """Returns an engine backend whose runs are done by remote workers."""
+        return RemoteEngine(self, model, compute_type)
+
+    def submit(self, job):
+        with self.condition:
+            self.pending.append(job)
+            self.condition.notify()
+
+    def lease(self, worker, wait=LEASE_WAIT_SECONDS):
+        """Leases the next pending job to worker, waiting up to wait seconds for one. Returns the job or None."""
+        deadline = time.time() + wait
+        with self.condition:
+            self.workers[worker] = time.time()
+            while not self.pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+            job = self.pending.popleft()
+            job.lease_id = uuid.uuid4().hex
+            job.worker = worker
+            job.expires = time.time() + self.lease_seconds
+            job.leases += 1
+            self.leased[job.lease_id] = job
+        self.log(f"[INFO] Leased '{os.path.basename(job.media_path)}' to worker '{worker}'.", "blue")
+        return job
+
+    def heartbeat(self, lease_id, output=()):
+        """Renews a lease and passes on engine output. Returns the job, or None if the lease is gone."""
+        with self.condition:
+            job = self.leased.get(lease_id)
+            if job is None:
+                return None
+            job.expires = time.time() + self.lease_seconds
+            self.workers[job.worker] = time.time()
+            job.output.extend(output)
+            return job
+
+    def take(self, lease_id):
+        """Ends a lease and returns its job, or None if it already ended."""
+        with self.condition:
+            job = self.leased.pop(lease_id, None)
+            if job is not None:
+                self.workers[job.worker] = time.time()
+            return job
+
+    def complete(self, lease_id, transcript, timings):
+        """Writes the uploaded transcript where the engine would have and finishes the job."""
+        job = self.take(lease_id)
+        if job is None:
+            return False
+        base_filename = os.path.splitext(os.path.basename(job.media_path))[0]
+        txt_path = os.path.join(job.output_dir, f"{base_filename}.txt")
+        temp_path = txt_path + '.part'
+        # The worker's own wall time, so time spent waiting for a worker doesn't count as engine time
+        wall_time = timings.get('wall_time') or time.time() - job.started
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(transcript)
+            os.replace(temp_path, txt_path)
+            job.result = EngineResult(0, "", timings.get('load_time'), timings.get('inference_time'),
+                                      wall_time, timings.get('peak_memory'), timings.get('compute_type'))
+        except OSError as e:
+            job.result = EngineResult(1, f"Could not save the transcript from '{job.worker}': {e}", wall_time=wall_time)
+        job.done.set()
+        return True
+
+    def fail(self, lease_id, returncode, stderr):
+        job = self.take(lease_id)
+        if job is None:
+            return False
+        job.result = EngineResult(returncode or 1, f"Worker '{job.worker}': {stderr}", wall_time=time.time() - job.started)
+        job.done.set()
+        return True
+
+    def release(self, lease_id):
+        """Puts a job back in the queue, e.g. when its worker shuts down."""
+        job = self.take(lease_id)
+        if job is None:
+            return False
+        self.log(f"[INFO] Worker '{job.worker}' released '{os.path.basename(job.media_path)}'.", "blue")
+        job.leases -= 1 # A clean release doesn't count against the job
+        self.submit(job)
+        return True
+
+    def expire(self, job):
+        """Re-leases a job whose lease ran out, or fails it after max_leases. Returns True if it was expired."""
+        with self.condition:
+            if job.lease_id not in self.leased or time.time() < job.expires:
+                return False
+            del self.leased[job.lease_id]
+            worker = job.worker
+            job.lease_id = None
+        name = os.path.basename(job.media_path)
+        if job.leases >= self.max_leases:
+            self.log(f"[ERROR] Lease of '{name}' ran out {job.leases} times; giving up.", "red")
+            job.result = EngineResult(1, f"Lease ran out {job.leases} times (last worker '{worker}')",
+                                      wall_time=time.time() - job.started)
+            job.done.set()
+        else:
+            self.log(f"[WARNING] Worker '{worker}' stopped sending heartbeats for '{name}'. Re-leasing it.", "orange")
+            self.submit(job)
+        return True
+
+    def cancel(self, job):
+        """Withdraws a job that the pipeline no longer waits for; its worker learns at the next heartbeat."""
+        with self.condition:
+            if job in self.pending:
+                self.pending.remove(job)
+            if job.lease_id is not None:
+                self.leased.pop(job.lease_id, None)
+
+    def media_path(self, lease_id):
+        with self.condition:
+            job = self.leased.get(lease_id)
+            return job.media_path if job else None
+
+    def status(self):
+        with self.condition:
+            now = time.time()
+            return {
+                'pending': len(self.pending),
+                'leased': [{'media': os.path.basename(job.media_path), 'worker': job.worker,
+                            'expires_in': round(job.expires - now, 1)} for job in self.leased.values()],
+                'workers': {worker: round(now - seen, 1) for worker, seen in self.workers.items()},
+            }
+
+
+class RemoteEngine:
+    """Engine backend for one pipeline worker: each run is a RemoteJob done by a remote worker."""
+
+    def __init__(self, coordinator, model, compute_type=FALLBACK_COMPUTE_TYPE):
+        self.coordinator = coordinator
+        self.model = model
+        self.compute_type = compute_type
+
+    def transcribe(self, media_path, output_dir, on_output, stop_flag, pause_flag=None):
+        """Submits the run and relays the worker's output until it is done, re-leasing it if the worker dies."""
+        job = RemoteJob(media_path, output_dir, self.model, self.compute_type, pause_flag)
+        self.coordinator.submit(job)
+        while not job.done.wait(0.5):
+            while job.output:
+                on_output(job.output.popleft())
+            if stop_flag.is_set():
+                self.coordinator.cancel(job)
+                return EngineResult(-1, "Stopped", wall_time=time.time() - job.started)
+            self.coordinator.expire(job)
+        while job.output:
+            on_output(job.output.popleft())
+        return job.result
+
+    def close(self):
+        pass
+
+
+class CoordinatorRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass # Requests are too frequent for the console; job events are logged by the coordinator
+
+    def send_json(self, status, body=None):
+        data = json.dumps(body if body is not None else {}).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def authorized(self):
+        token = self.server.coordinator.token
+        if token and self.headers.get(TOKEN_HEADER) != token:
+            self.send_json(403, {'error': "bad token"})
+            return False
+        return True
+
+    def route(self):
+        """Returns (action, lease id) of the request path."""
+        parts = self.path.strip("/").split("/")
+        return parts[0], parts[1] if len(parts) > 1 else None
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        coordinator = self.server.coordinator
+        action, lease_id = self.route()
+        if action == "status":
+            self.send_json(200, coordinator.status())
+        elif action == "media":
+            media_path = coordinator.media_path(lease_id)
+            if media_path is None:
+                self.send_json(410, {'error': "lease not found"})
+                return
+            try:
+                f = open(media_path, 'rb')
+            except OSError as e:
+                self.send_json(404, {'error': str(e)})
+                return
+            with f:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                self.end_headers()
+                shutil.copyfileobj(f, self.wfile, 1024 * 1024)
+        else:
+            self.send_json(404, {'error': "unknown endpoint"})
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        coordinator = self.server.coordinator
+        action, lease_id = self.route()
+        try:
+            body = self.read_json()
+        except ValueError:
+            self.send_json(400, {'error': "invalid JSON"})
+            return
+        if action == "lease":
+            job = coordinator.lease(str(body.get('worker') or self.client_address[0]))
+            if job is None:
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_json(200, {'lease': job.lease_id, 'media_name': os.path.basename(job.media_path),
+                                 'media_path': job.media_path, 'model': job.model,
+                                 'compute_type': job.compute_type, 'lease_seconds': coordinator.lease_seconds,
+                                 'heartbeat_seconds': HEARTBEAT_SECONDS})
+        elif action == "heartbeat":
+            job = coordinator.heartbeat(lease_id, body.get('output') or [])
+            if job is None:
+                self.send_json(410, {'error': "lease lost"})
+            else:
+                self.send_json(200, {'pause': bool(job.pause_flag and job.pause_flag.is_set())})
+        elif action in ("complete", "fail", "release"):
+            if action == "complete":
+                ok = coordinator.complete(lease_id, body.get('transcript', ""), body)
+            elif action == "fail":
+                ok = coordinator.fail(lease_id, body.get('returncode'), body.get('stderr', ""))
+            else:
+                ok = coordinator.release(lease_id)
+            self.send_json(200 if ok else 410)
+        else:
+            self.send_json(404, {'error': "unknown endpoint"})
@@ -0,0 +1,441 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import threading
+import subprocess
+from collections import deque
+
+# Constants
+ENGINE_EXE = "faster-whisper-xxl.exe"
+COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+FALLBACK_COMPUTE_TYPE = "float32" # Works on every CPU; used when no profile exists or a faster type fails
+# Engine arguments that shape the transcript; they are part of the transcript cache key
+ENGINE_OPTIONS = (
+    "--output_format", "txt", # Ensure text output for PDF conversion
+    "--compute_type", FALLBACK_COMPUTE_TYPE,
+    "--vad_filter", "true",
+    "--task", "transcribe",
+    "--word_timestamps", "false", # Disable word timestamps
+    "--beep_off",
+)
+ENGINE_PROBE_CACHE = 'engine_probe.json' # Result of the last '--version' run of the engine
+ENGINE_PROBE_TIMEOUT = 120 # Seconds; the first run of the self-extracting engine is slow
+PROCESS_CONTROL_INTERVAL = 0.2 # Seconds between checks of the pause and stop flags while the engine runs
+ENGINE_MODE_SUBPROCESS = "One-shot process"
+ENGINE_MODE_SERVER = "Warm model server"
+ENGINE_MODE_REMOTE = "Remote workers" # Runs are pulled by vt_worker.py processes from the coordinator
+ENGINE_MODES = (ENGINE_MODE_SUBPROCESS, ENGINE_MODE_SERVER, ENGINE_MODE_REMOTE)
+SERVER_STDERR_LINES = 50 # Lines of server stderr kept for error messages
+# Use creationflags for Windows to prevent console window from popping up
+CREATION_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+
+def engine_options(compute_type=FALLBACK_COMPUTE_TYPE, output_format="txt", options=ENGINE_OPTIONS):
+    """Returns options (ENGINE_OPTIONS by default) with another --compute_type and --output_format."""
+    options = list(options)
+    options[options.index("--compute_type") + 1] = compute_type
+    options[options.index("--output_format") + 1] = output_format
+    return tuple(options)
+
+
+def default_server_command():
+    """Returns the command that starts vt_engine_server, for source and frozen builds."""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, "--engine-server"]
+    return [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "vt_engine_server.py")]
+
+
+def probe_engine(cache_path=ENGINE_PROBE_CACHE, engine_exe=ENGINE_EXE):
+    """Checks that the engine runs. Returns (found, version, cached).
+
+    Running the engine with --version takes seconds while it unpacks, so the
+    result is cached keyed on the executable's path, size and mtime and only
+    redone after the engine was installed or updated.
+    """
+    exe_path = shutil.which(engine_exe)
+    if exe_path is None:
+        return False, None, False
+    stat = os.stat(exe_path)
+    key = {'path': os.path.abspath(exe_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached['found'], cached.get('version'), True
+    except (OSError, ValueError, KeyError):
+        pass # No usable cache; probe below
+
+    try:
+        completed = subprocess.run([exe_path, "--version"], capture_output=True, text=True,
+                                   timeout=ENGINE_PROBE_TIMEOUT, creationflags=CREATION_FLAGS)
+        found = completed.returncode == 0
+        output = (completed.stdout or completed.stderr or "").strip()
+        version = output.splitlines()[0] if found and output else None
+    except (OSError, subprocess.TimeoutExpired):
+        found, version = False, None
+    try:
+        temp_path = cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'found': found, 'version': version}, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass # Probed again on the next start
+    return found, version, False
+
+
+def suspend_process(process):
+    """Freezes a running process without losing its state."""
+    if sys.platform == "win32":
+        import ctypes
+        ctypes.windll.ntdll.NtSuspendProcess(int(process._handle))
+    else:
+        os.kill(process.pid, signal.SIGSTOP)
+
+
+def resume_process(process):
+    if sys.platform == "win32":
+        import ctypes
+        ctypes.windll.ntdll.NtResumeProcess(int(process._handle))
+    else:
+        os.kill(process.pid, signal.SIGCONT)
+
+
+def process_peak_memory(process):
+    """Returns the peak memory (bytes) a process used so far, or None where it can't be read."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t), ("PagefileUsage", ctypes.c_size_t),
+                            ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            # Still works after the process exited, as long as its handle is open
+            if ctypes.windll.psapi.GetProcessMemoryInfo(int(process._handle), ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize
+            return None
+        with open(f"/proc/{process.pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def control_process(process, stop_flag, pause_flag, finished, on_stop, log, usage):
+    """Suspends process while pause_flag is set and calls on_stop once stop_flag is set.
+
+    Runs on its own thread until finished is set, so a pause or stop takes
+    effect right away even while the engine prints nothing. The peak memory
+    seen is kept in usage['peak_memory'].
+    """
+    suspended = False
+    while not finished.wait(PROCESS_CONTROL_INTERVAL):
+        peak_memory = process_peak_memory(process)
+        if peak_memory:
+            usage['peak_memory'] = max(usage.get('peak_memory') or 0, peak_memory)
+        try:
+            if stop_flag.is_set():
+                if suspended:
+                    resume_process(process) # A suspended process can't act on the termination
+                on_stop()
+                return
+            if pause_flag is not None and pause_flag.is_set() != suspended:
+                if suspended:
+                    resume_process(process)
+                    log(f"[INFO] Resumed engine process {process.pid}.", "blue")
+                else:
+                    suspend_process(process)
+                    log(f"[INFO] Suspended engine process {process.pid}.", "blue")
+                suspended = not suspended
+        except OSError:
+            return # The process exited in between
+
+
+def start_process_control(process, stop_flag, pause_flag, on_stop, log):
+    """Starts control_process on a daemon thread.
+
+    Returns (finished, usage): set finished once the process is done; usage
+    holds the sampled peak memory.
+    """
+    finished = threading.Event()
+    usage = {'peak_memory': None}
+    thread = threading.Thread(target=control_process,
+                              args=(process, stop_flag, pause_flag, finished, on_stop, log, usage))
+    thread.daemon = True
+    thread.start()
+    return finished, usage
+
+
+class EngineResult:
+    """Outcome of one engine run. Times are in seconds, memory in bytes; None when the backend can't tell.
+
+    compute_type is the one the transcript was made with, which differs from
+    the requested one after a fallback to float32.
+    """
+    __slots__ = ('returncode', 'stderr', 'load_time', 'inference_time', 'wall_time', 'peak_memory', 'compute_type')
+
+    def __init__(self, returncode, stderr="", load_time=None, inference_time=None, wall_time=0.0, peak_memory=None,
+                 compute_type=None):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.load_time = load_time
+        self.inference_time = inference_time
+        self.wall_time = wall_time
+        self.peak_memory = peak_memory
+        self.compute_type = compute_type
+
+    def timing_message(self):
+        """Returns e.g. 'in 12.3 s (model load 4.1 s, inference 8.2 s)'."""
+        message = f"in {self.wall_time:.1f} s"
+        if self.inference_time is not None:
+            message += f" (model load {self.load_time or 0.0:.1f} s, inference {self.inference_time:.1f} s)"
+        return message
+
+
+class SubprocessEngine:
+    """One-shot backend: a fresh faster-whisper-xxl process per file.
+
+    The model is loaded again for every file, so load and inference time can't
+    be told apart; only the wall time is reported. If a run with a compute type
+    other than float32 fails, it is retried with float32, which this engine
+    then keeps using. With output_format "json" the engine writes <media>.json
+    with per-segment confidence instead of the TXT.
+    """
+
+    def __init__(self, model, engine_threads, log, options=ENGINE_OPTIONS, engine_command=None,
+                 compute_type=None, output_format="txt"):
+        self.model = model
+        self.engine_threads = engine_threads
+        self.log = log
+        self.output_format = output_format
+        if compute_type or output_format != "txt":
+            options = engine_options(compute_type or FALLBACK_COMPUTE_TYPE, output_format, options)
+        self.options = options
+        self.engine_command = engine_command or [ENGINE_EXE] # e.g. a stand-in engine script for benchmarks
+
+    def transcribe(self, media_path, output_dir, on_output, stop_flag, pause_flag=None):
+        """Runs the engine on one file. Raises FileNotFoundError if the executable is missing.
+
+        While pause_flag is set the engine process is suspended; a stop
+        terminates it.
+        """
+        result = self.run_engine(media_path, output_dir, on_output, stop_flag, pause_flag)
+        compute_type = self.options[self.options.index("--compute_type") + 1]
+        if result.returncode != 0 and not stop_flag.is_set() and compute_type != FALLBACK_COMPUTE_TYPE:
+            self.log(f"[WARNING] Engine failed with compute type '{compute_type}' (Exit Code: {result.returncode}). "
+                     f"Retrying with '{FALLBACK_COMPUTE_TYPE}'.", "orange")
+            self.options = engine_options(FALLBACK_COMPUTE_TYPE, self.output_format, self.options)
+            result = self.run_engine(media_path, output_dir, on_output, stop_flag, pause_flag)
+        result.compute_type = self.options[self.options.index("--compute_type") + 1]
+        return result
+
+    def run_engine(self, media_path, output_dir, on_output, stop_flag, pause_flag):
+        # Note: --output_dir is where the .txt file will be saved.
+        command = [
+            *self.engine_command,
+            media_path,
+            "--model", self.model,
+            "--output_dir", output_dir,
+            *self.options,
+        ]
+        if self.engine_threads > 0:
+            command += ["--threads", str(self.engine_threads)] # Slice of cores for this worker
+        self.log(f"[DEBUG] Executing: {' '.join(command)}")
+
+        started = time.time()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, bufsize=1, universal_newlines=True,
+                                   creationflags=CREATION_FLAGS)
+        # If stop requested, terminate the subprocess
+        finished, usage = start_process_control(process, stop_flag, pause_flag, process.terminate, self.log)
+
+        # Monitor process output in real-time
+        while True:
+            output = process.stdout.readline()
+            if output == '' and process.poll() is not None:
+                break
+            if output:
+                on_output(output.strip())
+            if stop_flag.is_set():
+                break
+
+        process.wait() # Wait for the process to truly finish/terminate
+        finished.set()
+        peak_memory = max(filter(None, (usage['peak_memory'], process_peak_memory(process))), default=None)
+        stderr_output = process.stderr.read() if process.returncode != 0 else ""
+        return EngineResult(process.returncode, stderr_output, wall_time=time.time() - started, peak_memory=peak_memory)
+
+    def close(self):
+        pass
+
+
+class PersistentEngine:
+    """Warm-model backend: a long-lived vt_engine_server process that keeps the model loaded.
+
+    Jobs and replies are JSON lines over the server's stdin/stdout. If the
+    server can't be started (e.g. faster_whisper is not installed), the
+    one-shot subprocess backend is used instead. A model that fails to load
+    with the requested compute type is loaded again with float32.
+    """
+
+    def __init__(self, model, engine_threads, log, server_command=None, compute_type=FALLBACK_COMPUTE_TYPE,
+                 output_format="txt", engine_command=None, options=ENGINE_OPTIONS):
+        self.model = model
+        self.engine_threads = engine_threads
+        self.log = log
+        self.compute_type = compute_type
+        self.output_format = output_format
+        self.server_command = server_command or default_server_command()
+        self.engine_command = engine_command # Passed on to the one-shot fallback, like options
+        self.options = options
+        self.process = None
+        self.stderr_tail = deque(maxlen=SERVER_STDERR_LINES)
+        self.fallback = None
+        self.next_job_id = 1
+
+    def start(self):
+        """Starts the server and waits for the model to load. Returns the load time, or None on failure."""
+        command = [*self.server_command, "--model", self.model, "--threads", str(self.engine_threads),
+                   "--compute_type", self.compute_type]
+        self.log(f"[DEBUG] Starting engine server: {' '.join(command)}")
+        self.stderr_tail.clear()
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.PIPE, text=True, bufsize=1,
+                                            creationflags=CREATION_FLAGS)
+        except OSError as e:
+            self.log(f"[WARNING] Could not start engine server: {e}", "orange")
+            self.process = None
+            return None
+        # Drain stderr in the background so a chatty server never blocks on a full pipe
+        threading.Thread(target=self.read_stderr, args=(self.process,), daemon=True).start()
+
+        event = self.read_event()
+        if not event or event.get('event') != 'ready':
+            message = (event or {}).get('message') or "\n".join(self.stderr_tail) or "no response"
+            self.log(f"[WARNING] Engine server failed to start: {message}", "orange")
+            self.stop_server()
+            if self.compute_type != FALLBACK_COMPUTE_TYPE:
+                self.log(f"[WARNING] Retrying the engine server with compute type '{FALLBACK_COMPUTE_TYPE}'.", "orange")
+                self.compute_type = FALLBACK_COMPUTE_TYPE
+                return self.start()
+            return None
+        self.log(f"[INFO] Engine server loaded '{self.model}' in {event['load_time']:.1f} s.", "blue")
+        return event['load_time']
+
+    def read_stderr(self, process):
+        for line in process.stderr:
+            self.stderr_tail.append(line.rstrip())
+
+    def read_event(self):
+        """Returns the next JSON event from the server, or None if it exited."""
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                return None
+            try:
+                return json.loads(line)
+            except ValueError:
+                continue # Ignore stray non-protocol output
+
+    def transcribe(self, media_path, output_dir, on_output, stop_flag, pause_flag=None):
+        """Sends one file to the server, (re)starting it if needed. The server is suspended while paused."""
+        if self.fallback:
+            return self.fallback.transcribe(media_path, output_dir, on_output, stop_flag, pause_flag)
+
+        started = time.time()
+        load_time = 0.0
+        if self.process is None or self.process.poll() is not None:
+            load_time = self.start()
+            if load_time is None:
+                self.log("[WARNING] Falling back to one-shot engine processes.", "orange")
+                self.fallback = SubprocessEngine(self.model, self.engine_threads, self.log, options=self.options,
+                                                 engine_command=self.engine_command, compute_type=self.compute_type,
+                                                 output_format=self.output_format)
+                return self.fallback.transcribe(media_path, output_dir, on_output, stop_flag, pause_flag)
+
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        try:
+            self.process.stdin.write(json.dumps({'id': job_id, 'media': media_path, 'output_dir': output_dir,
+                                                 'output_format': self.output_format}) + "\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            self.stop_server()
+            return EngineResult(1, f"Engine server closed the connection: {e}", load_time, wall_time=time.time() - started)
+
+        # A stop kills the server, which ends the read_event() below
+        finished, _ = start_process_control(self.process, stop_flag, pause_flag, self.process.kill, self.log)
+        try:
+            return self.read_job_events(job_id, on_output, stop_flag, load_time, started)
+        finally:
+            finished.set()
+
+    def read_job_events(self, job_id, on_output, stop_flag, load_time, started):
+        """Relays server events until job_id is done, fails or is stopped."""
+        while True:
+            if stop_flag.is_set():
+                # The model is lost with the server; it is reloaded on the next run
+                self.stop_server()
+                return EngineResult(-1, "Stopped", load_time, wall_time=time.time() - started)
+            event = self.read_event()
+            if event is None:
+                if stop_flag.is_set():
+                    continue # Killed by the stop
+                returncode = self.process.wait()
+                stderr_output = "\n".join(self.stderr_tail)
+                self.process = None
+                return EngineResult(returncode or 1, stderr_output, load_time, wall_time=time.time() - started)
+            if event.get('event') == 'log':
+                on_output(event.get('message', ''))
+            elif event.get('event') == 'done' and event.get('id') == job_id:
+                return EngineResult(0, "", load_time, event.get('inference_time'), time.time() - started,
+                                    compute_type=self.compute_type)
+            elif event.get('event') == 'error' and event.get('id') == job_id:
+                return EngineResult(1, event.get('message', ''), load_time, event.get('inference_time'),
+                                    time.time() - started)
+
+    def stop_server(self):
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+
+    def close(self):
+        """Asks the server to exit by closing its stdin."""
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.stop_server()
+
+
+def create_engine(engine_mode, model, engine_threads, log, server_command=None, engine_command=None,
+                  compute_type=FALLBACK_COMPUTE_TYPE, coordinator=None, output_format="txt"):
+    """Returns the engine backend for engine_mode (one of ENGINE_MODES).
+
+    ENGINE_MODE_REMOTE needs the vt_coordinator.Coordinator the remote workers
+    pull from; remote workers always return TXT transcripts.
+    """
+    if engine_mode == ENGINE_MODE_REMOTE:
+        return coordinator.engine(model, compute_type)
+    if engine_mode == ENGINE_MODE_SERVER:
+        return PersistentEngine(model, engine_threads, log, server_command, compute_type, output_format,
+                                engine_command)
+    return SubprocessEngine(model, engine_threads, log, engine_command=engine_command, compute_type=compute_type,
+                            output_format=output_format)
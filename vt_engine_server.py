@@ -0,0 +1,85 @@
+"""Warm-model engine server.
+
+Loads a faster-whisper model once and transcribes jobs read from stdin, one
+JSON object per line:
+    {"id": 1, "media": "...", "output_dir": "...", "output_format": "txt"}
+Replies are JSON lines on stdout:
+    {"event": "ready", "load_time": 4.2}
+    {"event": "log", "id": 1, "message": "[00:00.000 --> 00:02.000] Hello"}
+    {"event": "done", "id": 1, "inference_time": 8.1, "txt": "..."}
+    {"event": "error", "id": 1, "message": "..."}
+The server exits when stdin is closed. Transcripts are written as
+<output_dir>/<media name>.txt in the same format as faster-whisper-xxl; with
+"output_format": "json" a <media name>.json with the segments and their
+confidence (avg_logprob, no_speech_prob, compression_ratio) is written too.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from vt_chunking import format_timestamp
+
+
+def send(event, **fields):
+    sys.stdout.write(json.dumps({'event': event, **fields}) + "\n")
+    sys.stdout.flush()
+
+
+def run_job(whisper_model, job):
+    """Transcribes one job, streaming segments as log events and writing the TXT file."""
+    started = time.time()
+    base_filename = os.path.splitext(os.path.basename(job['media']))[0]
+    txt_path = os.path.join(job['output_dir'], f"{base_filename}.txt")
+    segments, _ = whisper_model.transcribe(job['media'], task="transcribe", vad_filter=True,
+                                           word_timestamps=False)
+    json_segments = []
+    temp_path = txt_path + '.part'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for segment in segments:
+            line = f"[{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}] {segment.text.strip()}"
+            f.write(line + "\n")
+            send('log', id=job['id'], message=line)
+            json_segments.append({'start': segment.start, 'end': segment.end, 'text': segment.text,
+                                  'avg_logprob': segment.avg_logprob, 'no_speech_prob': segment.no_speech_prob,
+                                  'compression_ratio': segment.compression_ratio})
+    os.replace(temp_path, txt_path)
+    if job.get('output_format') == "json":
+        json_path = os.path.join(job['output_dir'], f"{base_filename}.json")
+        with open(json_path + '.part', 'w', encoding='utf-8') as f:
+            json.dump({'segments': json_segments}, f)
+        os.replace(json_path + '.part', json_path)
+    send('done', id=job['id'], inference_time=round(time.time() - started, 3), txt=txt_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve transcription jobs from a resident faster-whisper model.")
+    parser.add_argument("--model", default="turbo")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads (0 = library default)")
+    parser.add_argument("--compute_type", default="float32")
+    parser.add_argument("--device", default="auto")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    try:
+        from faster_whisper import WhisperModel
+        whisper_model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type,
+                                     cpu_threads=args.threads)
+    except Exception as e: # ImportError when faster_whisper isn't installed, or a model load failure
+        send('error', message=f"Could not load model '{args.model}': {e}")
+        return 2
+    send('ready', load_time=round(time.time() - started, 3))
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        try:
+            run_job(whisper_model, job)
+        except Exception as e:
+            send('error', id=job.get('id'), message=str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""Headless transcription runner.
+
+Processes the transcription queue without Tkinter, for machines without a
+display. Progress is written to stdout as one JSON object per line; console
+style log messages go to stderr.
+
+Usage:
+    python vt_headless.py --destination OUT [--model turbo] [--workers N] [folder ...]
+    python vt_headless.py --destination OUT --queue-file files.json
+    python vt_headless.py --destination OUT --engine remote --listen 127.0.0.1:8765 [folder ...]
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import signal
+import argparse
+import threading
+import multiprocessing
+from datetime import datetime
+from vt_cache import TranscriptCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MB
+from vt_pipeline import TranscriptionPipeline, SUPPORTED_EXTENSIONS, MODEL_OPTIONS, DEFAULT_MODEL
+from vt_engine import ENGINE_MODE_SUBPROCESS, ENGINE_MODE_SERVER, ENGINE_MODE_REMOTE, COMPUTE_TYPES
+from vt_calibrate import EngineProfile, ENGINE_PROFILE_FILE
+from vt_chunking import DEFAULT_CHUNK_MINUTES, DEFAULT_CHUNK_OVERLAP
+from vt_prefetch import DEFAULT_PREFETCH_FILES, DEFAULT_SCRATCH_MB
+from vt_writers import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMATS
+from vt_schedule import (SCHEDULE_BOTTOM_UP, SCHEDULE_SHORTEST_FIRST, SCHEDULE_LONGEST_FIRST, RtfTracker,
+                         DurationProber)
+from vt_queue import QueueModel, DONE_STATUSES
+from vt_metrics import MetricsCollector, export_csv, export_prometheus
+from vt_queue_store import QueueStore, QUEUE_DB_FILE
+from vt_scanner import FolderScanner
+from vt_search import TranscriptIndex, SEARCH_INDEX_FILE
+from vt_speech import DEFAULT_SPEECH_THRESHOLD, SUGGESTED_SPEECH_THRESHOLD
+from vt_cascade import CASCADE_DRAFT_MODELS, DEFAULT_MIN_LOGPROB
+from vt_coordinator import Coordinator, DEFAULT_COORDINATOR_ADDRESS, DEFAULT_REMOTE_SLOTS, LEASE_SECONDS
+
+ENGINES = {"oneshot": ENGINE_MODE_SUBPROCESS, "server": ENGINE_MODE_SERVER, "remote": ENGINE_MODE_REMOTE}
+SCHEDULES = {"bottom-up": SCHEDULE_BOTTOM_UP, "shortest": SCHEDULE_SHORTEST_FIRST, "longest": SCHEDULE_LONGEST_FIRST}
+
+# Exit codes
+EXIT_OK = 0 # Every queued file has its outputs or has no speech
+EXIT_FAILURES = 1 # Some files failed or were left unfinished
+EXIT_USAGE = 2 # Bad arguments or unreadable queue file
+EXIT_ENGINE_MISSING = 3 # faster-whisper-xxl.exe could not be started
+EXIT_INTERRUPTED = 130 # Stopped by SIGINT/SIGTERM
+
+
+class JsonProgress:
+    """Writes machine-readable progress events to stdout, one JSON object per line."""
+
+    def __init__(self, stream=sys.stdout):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        record = {'event': event, 'time': time.time(), **fields}
+        with self.lock:
+            self.stream.write(json.dumps(record) + "\n")
+            self.stream.flush()
+
+
+def log_to_stderr(message, color="black"):
+    """Console-style log callback for the pipeline."""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    sys.stderr.write(f"[{timestamp}] {message}\n")
+    sys.stderr.flush()
+
+
+def load_queue_file(queue_file):
+    """Reads queued files from JSON: a list of paths, a list of queue dicts, or a settings.json."""
+    with open(queue_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('file_queue', [])
+    items = []
+    for item in data:
+        if isinstance(item, str):
+            items.append((item, os.path.basename(item), "No"))
+        else:
+            items.append((item['path'], item.get('filename') or os.path.basename(item['path']),
+                          item.get('processed', "No")))
+    return items
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Transcribe queued media files without the GUI.")
+    parser.add_argument("folders", nargs="*", help="folders to scan for supported media files")
+    parser.add_argument("--queue-file", help="JSON list of media paths or queue entries (settings.json also works)")
+    parser.add_argument("--queue-db", default=QUEUE_DB_FILE, help="queue store to read and update (default: %(default)s)")
+    parser.add_argument("--destination", required=True, help="folder for the transcripts")
+    parser.add_argument("--formats", default=",".join(DEFAULT_OUTPUT_FORMATS),
+                        help=f"comma separated output formats out of {', '.join(OUTPUT_FORMATS)} (default: %(default)s)")
+    parser.add_argument("--pdf-font", help="TrueType font for PDFs (default: DejaVu Sans or Arial, if found)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, choices=MODEL_OPTIONS)
+    parser.add_argument("--workers", type=int, default=1, help="parallel engine processes")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads per engine process (0 = auto)")
+    parser.add_argument("--compute-type", choices=("auto",) + COMPUTE_TYPES, default="auto",
+                        help="engine compute type; auto uses the calibrated profile of this host, else float32")
+    parser.add_argument("--profile", default=ENGINE_PROFILE_FILE, help="engine profile written by vt_calibrate.py")
+    parser.add_argument("--schedule", choices=tuple(SCHEDULES), default="bottom-up",
+                        help="processing order: queue order from the bottom, shortest first or longest first")
+    parser.add_argument("--engine", choices=tuple(ENGINES), default="oneshot",
+                        help="one engine process per file, a warm model server per worker, "
+                             "or remote vt_worker.py processes pulling jobs")
+    parser.add_argument("--engine-server-cmd", help="command line of the engine server (default: vt_engine_server.py)")
+    parser.add_argument("--listen", default=DEFAULT_COORDINATOR_ADDRESS,
+                        help="address the coordinator serves remote workers on (default: %(default)s)")
+    parser.add_argument("--slots", type=int, default=DEFAULT_REMOTE_SLOTS,
+                        help="jobs handed to remote workers at the same time (default: %(default)s)")
+    parser.add_argument("--token", help="token remote workers must send")
+    parser.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS,
+                        help="re-lease a job when its worker sent no heartbeat for this long (default: %(default)s)")
+    parser.add_argument("--chunk-minutes", type=float, default=DEFAULT_CHUNK_MINUTES,
+                        help="split files longer than this into chunks transcribed in parallel (0 = off)")
+    parser.add_argument("--chunk-overlap", type=float, default=DEFAULT_CHUNK_OVERLAP,
+                        help="seconds of audio shared by neighbouring chunks")
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH_FILES,
+                        help="files whose audio is extracted ahead of the workers (0 = off)")
+    parser.add_argument("--scratch-mb", type=int, default=DEFAULT_SCRATCH_MB, help="disk budget of the extracted audio")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB, help="transcript cache size cap")
+    parser.add_argument("--speech-threshold", type=float, default=DEFAULT_SPEECH_THRESHOLD,
+                        help="mark files with less speech than this percent of their sampled audio 'No speech' "
+                             f"without running the engine (default: %(default)s = off; try {SUGGESTED_SPEECH_THRESHOLD:g})")
+    parser.add_argument("--force-speech", action="append", default=[], metavar="FILE",
+                        help="transcribe FILE even if the no-speech check would skip it or skipped it before "
+                             "(repeatable)")
+    parser.add_argument("--draft-model", choices=CASCADE_DRAFT_MODELS,
+                        help="draft each file with this fast model and redo only its low-confidence ranges "
+                             "with --model (default: off)")
+    parser.add_argument("--min-logprob", type=float, default=DEFAULT_MIN_LOGPROB,
+                        help="draft segments with a lower average log-probability are redone (default: %(default)s)")
+    parser.add_argument("--search-index", default=SEARCH_INDEX_FILE,
+                        help="full-text index finished transcripts are added to (default: %(default)s)")
+    parser.add_argument("--no-search-index", action="store_true", help="don't add transcripts to the search index")
+    parser.add_argument("--metrics-csv", help="write the per-file metrics of the queue store to this CSV file")
+    parser.add_argument("--metrics-prom", help="write metric totals in the Prometheus text format to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    progress = JsonProgress()
+
+    if args.workers < 1:
+        log_to_stderr("[ERROR] --workers must be at least 1.", "red")
+        return EXIT_USAGE
+    output_formats = tuple(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    unknown_formats = [f for f in output_formats if f not in OUTPUT_FORMATS]
+    if unknown_formats or not output_formats:
+        log_to_stderr(f"[ERROR] Unknown output format(s): {', '.join(unknown_formats) or args.formats}.", "red")
+        return EXIT_USAGE
+    os.makedirs(args.destination, exist_ok=True)
+
+    queue_store = QueueStore(args.queue_db)
+    queue_model = QueueModel()
+    for batch in queue_store.iter_batches():
+        queue_model.extend((item['path'], item['filename'], item['processed'], item['duration'], item['eta'])
+                           for item in batch)
+
+    if args.queue_file:
+        try:
+            queue_store.add_items(queue_model.extend(load_queue_file(args.queue_file)))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log_to_stderr(f"[ERROR] Could not read queue file '{args.queue_file}': {e}", "red")
+            return EXIT_USAGE
+
+    if args.folders:
+        scanner = FolderScanner(SUPPORTED_EXTENSIONS)
+        for folder in args.folders:
+            scanner.scan(folder, lambda batch: queue_store.add_items(
+                queue_model.extend((path, filename, "No") for path, filename in batch)), threading.Event())
+            log_to_stderr(f"[INFO] Found {scanner.files_matched} files in {folder}.")
+
+    # Forced files are found by their queued path, whichever way it was given
+    queued_paths = {os.path.normcase(os.path.abspath(path)): path for path in queue_model.paths()}
+    speech_overrides = set()
+    for forced in args.force_speech:
+        path = queued_paths.get(os.path.normcase(os.path.abspath(forced)))
+        if path is None:
+            log_to_stderr(f"[WARNING] --force-speech: '{forced}' is not queued.", "orange")
+            continue
+        speech_overrides.add(path)
+        if queue_model.get(path).processed == "No speech":
+            queue_model.update_status(path, "No")
+            queue_store.update_status(path, "No")
+
+    # Durations drive the schedule and the ETA; probe the files that don't have one yet
+    rtf_tracker = RtfTracker(queue_store)
+
+    def store_durations(batch):
+        estimates = [(path, duration, rtf_tracker.estimate(args.model, duration)) for path, duration in batch]
+        queue_model.update_estimates(estimates)
+        queue_store.update_estimates(estimates)
+
+    prober = DurationProber([entry.path for entry in queue_model.view() if entry.processed not in DONE_STATUSES
+                             and entry.duration is None], store_durations)
+    if prober.start():
+        prober.thread.join()
+    store_durations([(entry.path, entry.duration) for entry in queue_model.view() if entry.duration is not None])
+
+    pending = sum(1 for entry in queue_model.view() if entry.processed not in DONE_STATUSES)
+    progress.emit("queued", total=len(queue_model), pending=pending)
+
+    def set_status(file_path, processed_status):
+        queue_model.update_status(file_path, processed_status)
+        queue_store.update_status(file_path, processed_status)
+        eta = pipeline.eta_seconds() # Only called while the pipeline below runs
+        progress.emit("status", path=file_path, status=processed_status,
+                      eta=None if eta is None else round(eta, 1))
+
+    stop_flag = threading.Event()
+    interrupted = []
+
+    def request_stop(signum, frame):
+        interrupted.append(signum)
+        stop_flag.set()
+        log_to_stderr("[INFO] Stop requested. Waiting for running transcriptions to end...")
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    compute_type, engine_threads = EngineProfile(args.profile).engine_settings(args.model, args.workers, args.threads)
+    if args.compute_type != "auto":
+        compute_type = args.compute_type
+
+    coordinator = None
+    worker_count = args.workers
+    if args.engine == "remote":
+        coordinator = Coordinator(args.listen, log_to_stderr, args.token, args.lease_seconds)
+        try:
+            coordinator.start()
+        except (OSError, ValueError) as e:
+            log_to_stderr(f"[ERROR] Could not listen on '{args.listen}': {e}", "red")
+            return EXIT_USAGE
+        worker_count = max(1, args.slots)
+
+    search_index = None if args.no_search_index else TranscriptIndex(args.search_index)
+
+    started = time.time()
+    pipeline = TranscriptionPipeline(
+        queue_model, args.model, args.destination,
+        TranscriptCache(DEFAULT_CACHE_DIR, args.cache_mb * 1024 * 1024),
+        log=log_to_stderr, set_status=set_status,
+        worker_count=worker_count, engine_threads=engine_threads, compute_type=compute_type,
+        stop_flag=stop_flag, engine_mode=ENGINES[args.engine], coordinator=coordinator,
+        server_command=shlex.split(args.engine_server_cmd) if args.engine_server_cmd else None,
+        chunk_seconds=args.chunk_minutes * 60, chunk_overlap=args.chunk_overlap,
+        prefetch_files=args.prefetch, scratch_bytes=args.scratch_mb * 1024 * 1024,
+        output_formats=output_formats, pdf_font=args.pdf_font,
+        schedule_policy=SCHEDULES[args.schedule], rtf_tracker=rtf_tracker, metrics=MetricsCollector(queue_store),
+        search_index=search_index, speech_threshold=args.speech_threshold, speech_overrides=speech_overrides,
+        draft_model=args.draft_model, min_logprob=args.min_logprob)
+    pipeline.run()
+    if search_index is not None:
+        search_index.close()
+    if coordinator is not None:
+        coordinator.stop()
+    try:
+        if args.metrics_csv:
+            export_csv(queue_store.metrics(), args.metrics_csv)
+        if args.metrics_prom:
+            export_prometheus(queue_store.metrics(), args.metrics_prom, queue_store.status_counts())
+    except OSError as e:
+        log_to_stderr(f"[WARNING] Could not write metrics: {e}", "orange")
+    queue_store.close()
+
+    statuses = [entry.processed for entry in queue_model.view()]
+    done = statuses.count("Yes")
+    no_speech = statuses.count("No speech")
+    failed = statuses.count("Failed")
+    progress.emit("summary", total=len(statuses), done=done, no_speech=no_speech, failed=failed,
+                  unfinished=len(statuses) - done - no_speech - failed, elapsed=round(time.time() - started, 3),
+                  rtf=round(rtf_tracker.rtf(args.model), 4))
+
+    if pipeline.engine_missing:
+        return EXIT_ENGINE_MISSING
+    if interrupted:
+        return EXIT_INTERRUPTED
+    return EXIT_OK if done + no_speech == len(statuses) else EXIT_FAILURES
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Needed for the PDF process pool in frozen builds
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import re
+import queue
+import logging
+import logging.handlers
+from datetime import datetime
+
+# Constants
+LOG_FILE = 'vt_transcriber.log'
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024 # Rotate the on-disk log at this size
+LOG_FILE_BACKUPS = 3
+LOG_LEVELS = ("ERROR", "WARNING", "SUCCESS", "INFO", "DEBUG", "ENGINE")
+LEVEL_PATTERN = re.compile(r'^\[(ERROR|WARNING|SUCCESS|INFO|DEBUG)\]')
+
+
+def message_level(message):
+    """Returns the level named by a message's '[LEVEL]' prefix; engine output has none."""
+    match = LEVEL_PATTERN.match(message)
+    return match.group(1) if match else "ENGINE"
+
+
+class ConsoleLog:
+    """Thread-safe log buffer between worker threads and the console widget.
+
+    Any thread may call log(); the GUI drains pending records in batches on a
+    timer. Every record is also written to a size-rotated log file, so the
+    widget only needs to keep the most recent lines.
+    """
+
+    def __init__(self, log_file=LOG_FILE):
+        self.pending = queue.Queue()
+        self.file_logger = logging.getLogger("vt_transcriber.console")
+        self.file_logger.setLevel(logging.INFO)
+        self.file_logger.propagate = False
+        if log_file and not self.file_logger.handlers:
+            try:
+                handler = logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.file_logger.addHandler(handler)
+            except OSError:
+                pass # Console still works without the on-disk copy
+
+    def log(self, message, color="black"):
+        """Queues a message for the console and writes it to the log file."""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        level = message_level(message)
+        self.pending.put((timestamp, message, color, level))
+        self.file_logger.info(message)
+
+    def drain(self, max_records):
+        """Returns up to max_records queued (timestamp, message, color, level) tuples."""
+        records = []
+        while len(records) < max_records:
+            try:
+                records.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        return records
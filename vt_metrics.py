@@ -0,0 +1,176 @@
+import os
+import csv
+import time
+import threading
+
+# Constants
+# Per-file record fields, in CSV column order. Times are seconds, sizes bytes.
+METRIC_FIELDS = (
+    "path", "model", "status", "finished_at", "queue_wait", "engine_seconds", "load_seconds",
+    "inference_seconds", "audio_seconds", "rtf", "bytes_in", "transcript_bytes", "render_seconds",
+    "exit_code", "cache_hit", "chunks",
+)
+SUMMED_FIELDS = ("engine_seconds", "load_seconds", "inference_seconds") # Added up over the chunks of a file
+PROMETHEUS_PREFIX = "vt_transcriber"
+# Queue statuses exported as a fixed label set; progress text like "Processing (W1) 42%" is in_progress
+PROMETHEUS_QUEUE_STATUSES = {"Yes": "done", "No speech": "no_speech", "Failed": "failed",
+                             "Transcribed": "transcribed", "No": "pending", "": "pending"}
+
+
+class MetricsCollector:
+    """Collects one timing record per transcribed file and persists it in the queue store.
+
+    A record is started when a worker picks the file up, filled in as the
+    engine and render stages finish, and written when the file reaches its
+    final status. Methods are called from worker threads.
+    """
+
+    def __init__(self, queue_store=None):
+        self.queue_store = queue_store
+        self.lock = threading.Lock()
+        self.records = {} # path -> record of files in flight
+        self.finished = [] # Records finished during this session
+
+    def start(self, path, model, queue_wait, **values):
+        with self.lock:
+            record = dict.fromkeys(METRIC_FIELDS)
+            record.update(path=path, model=model, queue_wait=round(queue_wait, 3), cache_hit=0, chunks=0, **values)
+            self.records[path] = record
+
+    def update(self, path, **values):
+        """Sets fields of an in-flight record; SUMMED_FIELDS are added to the current value."""
+        with self.lock:
+            record = self.records.get(path)
+            if record is None:
+                return
+            for field, value in values.items():
+                if field in SUMMED_FIELDS:
+                    if value is None: # Not reported by this engine
+                        continue
+                    value = round((record[field] or 0.0) + value, 3)
+                record[field] = value
+
+    def finish(self, path, status):
+        """Completes a record with the file's final status and stores it."""
+        with self.lock:
+            record = self.records.pop(path, None)
+            if record is None:
+                return
+            record['status'] = status
+            record['finished_at'] = round(time.time(), 3)
+            if record['audio_seconds'] and record['engine_seconds'] is not None:
+                record['rtf'] = round(record['engine_seconds'] / record['audio_seconds'], 4)
+            self.finished.append(record)
+        if self.queue_store:
+            self.queue_store.save_metrics(record)
+
+    def discard(self, path):
+        """Drops the record of a file that was stopped before reaching a final status."""
+        with self.lock:
+            self.records.pop(path, None)
+
+
+def summarize(records):
+    """Returns totals over metric records for the stats panel and exports."""
+    summary = {'files': len(records), 'succeeded': 0, 'failed': 0, 'no_speech': 0, 'cache_hits': 0, 'queue_wait': 0.0,
+               'engine_seconds': 0.0, 'load_seconds': 0.0, 'inference_seconds': 0.0, 'audio_seconds': 0.0,
+               'render_seconds': 0.0, 'bytes_in': 0, 'transcript_bytes': 0}
+    for record in records:
+        if record['status'] == "Yes":
+            summary['succeeded'] += 1
+        elif record['status'] == "Failed":
+            summary['failed'] += 1
+        elif record['status'] == "No speech":
+            summary['no_speech'] += 1
+        summary['cache_hits'] += record['cache_hit'] or 0
+        for field in ('queue_wait', 'engine_seconds', 'load_seconds', 'inference_seconds', 'render_seconds',
+                      'bytes_in', 'transcript_bytes'):
+            summary[field] += record[field] or 0
+        if not record['cache_hit'] and record['status'] != "No speech":
+            summary['audio_seconds'] += record['audio_seconds'] or 0
+    # Real-time factor over the files that actually ran the engine and have a known duration
+    timed = [r for r in records if r['audio_seconds'] and r['engine_seconds'] and not r['cache_hit']]
+    audio = sum(r['audio_seconds'] for r in timed)
+    summary['rtf'] = sum(r['engine_seconds'] for r in timed) / audio if audio else None
+    return summary
+
+
+def summary_lines(summary):
+    """Formats a summary as 'label: value' lines."""
+    rtf = f"{summary['rtf']:.3f}" if summary['rtf'] is not None else "n/a"
+    return [
+        f"Files: {summary['files']} ({summary['succeeded']} done, {summary['failed']} failed, "
+        f"{summary['no_speech']} without speech, {summary['cache_hits']} from cache)",
+        f"Engine time: {summary['engine_seconds']:.1f} s (model load {summary['load_seconds']:.1f} s, "
+        f"inference {summary['inference_seconds']:.1f} s)",
+        f"Audio transcribed: {summary['audio_seconds'] / 3600:.2f} h, real-time factor {rtf}",
+        f"Render time: {summary['render_seconds']:.1f} s",
+        f"Queue wait: {summary['queue_wait']:.1f} s total",
+        f"Read: {summary['bytes_in'] / (1024 * 1024):.1f} MB, transcripts: "
+        f"{summary['transcript_bytes'] / 1024:.1f} KB",
+    ]
+
+
+def export_csv(records, csv_path):
+    """Writes one CSV row per record."""
+    temp_path = csv_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=METRIC_FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    os.replace(temp_path, csv_path)
+
+
+def prometheus_label(value):
+    """Escapes a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def queue_status_counts(queue_counts):
+    """Groups queue store status counts into the fixed PROMETHEUS_QUEUE_STATUSES labels."""
+    grouped = dict.fromkeys(sorted(set(PROMETHEUS_QUEUE_STATUSES.values()) | {"in_progress"}), 0)
+    for status, count in queue_counts.items():
+        grouped[PROMETHEUS_QUEUE_STATUSES.get(status or "", "in_progress")] += count
+    return grouped
+
+
+def export_prometheus(records, prom_path, queue_counts=None):
+    """Writes totals in the Prometheus text format, e.g. for the node exporter's textfile collector.
+
+    The totals cover the stored records, which are replaced when a file is
+    processed again, so they are exported as gauges. The file is replaced
+    atomically so a scrape never sees half of it.
+    """
+    summary = summarize(records)
+    lines = []
+
+    def metric(name, metric_type, help_text, samples):
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {metric_type}")
+        for labels, value in samples:
+            label_text = ("{" + ",".join(f'{key}="{prometheus_label(val)}"' for key, val in labels.items()) + "}"
+                          if labels else "")
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{label_text} {value}")
+
+    metric("files", "gauge", "Files that reached a final status.",
+           [({'status': "done"}, summary['succeeded']), ({'status': "failed"}, summary['failed']),
+            ({'status': "no_speech"}, summary['no_speech'])])
+    metric("cache_hits", "gauge", "Files served from the transcript cache.", [({}, summary['cache_hits'])])
+    for field, help_text in (("engine_seconds", "Engine wall time."), ("load_seconds", "Model load time."),
+                             ("inference_seconds", "Inference time."), ("render_seconds", "Output rendering time."),
+                             ("queue_wait", "Time files waited in the queue before a worker took them."),
+                             ("audio_seconds", "Duration of the transcribed media.")):
+        name = field if field.endswith("seconds") else f"{field}_seconds"
+        metric(name, "gauge", help_text, [({}, round(summary[field], 3))])
+    metric("media_read_bytes", "gauge", "Bytes of media read.", [({}, summary['bytes_in'])])
+    metric("transcript_bytes", "gauge", "Bytes of transcripts written.", [({}, summary['transcript_bytes'])])
+    if summary['rtf'] is not None:
+        metric("real_time_factor", "gauge", "Engine seconds per second of audio.", [({}, round(summary['rtf'], 4))])
+    if queue_counts:
+        metric("queue_files", "gauge", "Queued files by status.",
+               [({'status': status}, count) for status, count in queue_status_counts(queue_counts).items()])
+
+    temp_path = prom_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temp_path, prom_path)
@@ -0,0 +1,858 @@
+import os
+import time
+import shutil
+import hashlib
+import queue
+import threading
+import subprocess
+import multiprocessing
+import concurrent.futures
+from vt_cache import media_fingerprint, transcript_cache_key
+from vt_engine import ENGINE_MODE_SUBPROCESS, ENGINE_MODE_REMOTE, FALLBACK_COMPUTE_TYPE, create_engine, engine_options
+from vt_chunking import ChunkedJob, ffmpeg_available, probe_duration, CHUNK_WORK_DIR, DEFAULT_CHUNK_OVERLAP
+from vt_checkpoint import TranscriptCheckpoint, progress_status, CHECKPOINT_DIR
+from vt_writers import render_transcript, find_unicode_font, DEFAULT_OUTPUT_FORMATS, FORMAT_LABELS
+from vt_schedule import schedule_order, format_duration, RtfTracker, SCHEDULE_BOTTOM_UP
+from vt_prefetch import AudioPrefetcher, DEFAULT_SCRATCH_DIR, DEFAULT_SCRATCH_MB
+from vt_metrics import MetricsCollector, summarize, summary_lines
+from vt_speech import check_speech
+from vt_cascade import CascadeJob, CASCADE_WORK_DIR, DEFAULT_MIN_LOGPROB, FULL_PASS_FRACTION, has_confidence
+from vt_queue import DONE_STATUSES
+
+# Constants
+MODEL_OPTIONS = ("tiny", "small", "medium", "large", "turbo")
+DEFAULT_MODEL = "turbo"
+SUPPORTED_EXTENSIONS = (
+    '.mp4', '.avi', '.mkv', '.mov', '.flv', '.wmv', '.webm', # Video
+    '.mp3', '.wav', '.aac', '.flac', '.ogg' # Audio
+)
+PDF_RENDER_PROCESSES = 1 # Size of the process pool used by the output rendering stage
+# Statuses of files whose TXT was written but whose PDF is not finished yet
+PENDING_RENDER_STATUSES = ("Transcribed", "Rendering", "Failed")
+# Statuses reported once the engine is done with a file
+ENGINE_DONE_STATUSES = ("Transcribed", "Rendering", "Yes", "No speech", "Failed")
+WHOLE_FILE = -1 # Chunk index of a job that covers a whole queued file
+PROGRESS_REPORT_SECONDS = 2 # Minimum time between partial progress updates of a file
+ENGINE_WORK_DIR = '.engine' # Created inside the destination folder; each job's engine writes into its own subfolder
+
+
+def engine_thread_count(worker_count, threads_per_worker=0):
+    """Returns the --threads value for each engine process, or 0 to let the engine decide."""
+    if threads_per_worker > 0:
+        return threads_per_worker
+    if worker_count > 1:
+        # Give each worker an even slice of the cores so they don't compete
+        return max(1, (os.cpu_count() or 1) // worker_count)
+    return 0
+
+
+def job_key(file_path):
+    """Returns a short name unique to a queued file's full path, for its transcript and work folders."""
+    return hashlib.sha1(os.path.normcase(os.path.abspath(file_path)).encode('utf-8')).hexdigest()[:12]
+
+
+def work_key(cache_key, file_path):
+    """Returns the work folder name of a file's resumable state.
+
+    The cache key ties it to the media, model and engine options; the path
+    part keeps identical copies queued in different folders from sharing it.
+    """
+    return f"{cache_key}-{job_key(file_path)}"
+
+
+def output_paths(file_path, filename, destination_folder, output_formats=DEFAULT_OUTPUT_FORMATS):
+    """Returns the engine TXT path and a {format: path} dict of the final outputs for a queued file."""
+    # The engine TXT is named after the full path, so files with the same name in
+    # different folders never share one
+    base_filename = os.path.splitext(filename)[0]
+    txt_output_path = os.path.join(destination_folder, f"{base_filename}.{job_key(file_path)}.txt")
+
+    # Construct output filenames with prepended folder name
+    parent_folder_name = os.path.basename(os.path.dirname(file_path))
+    if not parent_folder_name: # Fallback if file is directly in root
+        parent_folder_name = "Transcribed"
+    outputs = {output_format: os.path.join(destination_folder, f"{parent_folder_name}_{base_filename}.{output_format}")
+               for output_format in output_formats}
+    return txt_output_path, outputs
+
+
+class TranscriptionPipeline:
+    """Runs a transcription queue: engine workers feeding a PDF rendering stage.
+
+    The pipeline has no GUI dependencies. Progress is reported through two
+    callbacks, both invoked from worker threads:
+      log(message, color) - console style messages ("[INFO] ...", "[ERROR] ...")
+      set_status(path, status) - the new 'Processed' value of a queued file
+
+    With chunk_seconds > 0, long files are split at silences and their chunks
+    are queued as separate jobs right behind the file, so all workers share them.
+    With prefetch_files > 0, audio of the next files is extracted ahead of the
+    workers and the engine is given the compact WAV instead of the source.
+    Segments of whole-file runs are checkpointed as the engine prints them, so
+    a stopped or crashed file resumes after its last saved segment; pause_flag
+    suspends the running engines.
+    Files are taken in schedule_policy order, and engine times are fed to
+    rtf_tracker so eta_seconds() can estimate the rest of the run. Stage timings
+    of each file are recorded in metrics.
+    Finished transcripts are added to search_index, if given.
+    With speech_threshold > 0 (percent), a sample of each file's audio is
+    checked first and files with less speech are marked "No speech" without
+    running the engine, except for the paths in speech_overrides.
+    With a draft_model, each file is first transcribed with that fast model
+    and only its low-confidence ranges are transcribed again with model.
+    With ENGINE_MODE_REMOTE, each worker hands its engine runs to remote
+    workers through coordinator, so worker_count is the number of runs out at
+    once.
+    """
+
+    def __init__(self, queue_model, model, destination_folder, transcript_cache, log, set_status,
+                 worker_count=1, engine_threads=0, stop_flag=None, pause_flag=None,
+                 engine_mode=ENGINE_MODE_SUBPROCESS, server_command=None,
+                 chunk_seconds=0, chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+                 prefetch_files=0, scratch_bytes=DEFAULT_SCRATCH_MB * 1024 * 1024, scratch_dir=DEFAULT_SCRATCH_DIR,
+                 output_formats=DEFAULT_OUTPUT_FORMATS, pdf_font=None,
+                 schedule_policy=SCHEDULE_BOTTOM_UP, rtf_tracker=None, engine_command=None, metrics=None,
+                 compute_type=FALLBACK_COMPUTE_TYPE, coordinator=None, search_index=None,
+                 speech_threshold=0, speech_overrides=(), draft_model=None, min_logprob=DEFAULT_MIN_LOGPROB):
+        self.queue_model = queue_model
+        self.model = model
+        self.destination_folder = destination_folder
+        self.transcript_cache = transcript_cache
+        self.log = log
+        self.set_status = set_status
+        self.worker_count = worker_count
+        self.engine_threads = engine_threads
+        self.engine_mode = engine_mode
+        self.server_command = server_command
+        self.engine_command = engine_command
+        self.compute_type = compute_type
+        self.coordinator = coordinator
+        self.search_index = search_index
+        self.speech_threshold = speech_threshold
+        self.speech_overrides = set(speech_overrides)
+        self.speech_lock = threading.Lock()
+        self.speech_stats = {'checked': 0, 'skipped': 0, 'check_seconds': 0.0, 'saved_seconds': 0.0}
+        self.draft_model = draft_model if draft_model != model else None
+        self.min_logprob = min_logprob
+        self.cascade_lock = threading.Lock()
+        self.cascade_stats = {'files': 0, 'audio_seconds': 0.0, 'redone_seconds': 0.0, 'engine_seconds': 0.0,
+                              'single_pass_seconds': 0.0}
+        self.output_formats = tuple(output_formats) or DEFAULT_OUTPUT_FORMATS
+        self.schedule_policy = schedule_policy
+        self.rtf_tracker = rtf_tracker or RtfTracker()
+        self.metrics = metrics or MetricsCollector()
+        self.run_started = time.time() # Files are queued when the run starts; queue wait is measured from here
+        self.scheduled = [] # Paths of this run, in processing order
+        self.engine_started = {} # path -> time its engine run started, for files being transcribed
+        self.font_path = find_unicode_font(pdf_font) if "pdf" in self.output_formats else None
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap = chunk_overlap
+        self.chunked_jobs = {} # path -> (ChunkedJob, priority, cache_key, audio_path, txt_output_path, outputs)
+        self.fallback_paths = set() # Files the engine transcribed with another compute type than the cache key says
+        self.prefetcher = AudioPrefetcher(scratch_dir, scratch_bytes, prefetch_files, log)
+        self.splitting = 0 # Files being split into chunks; idle workers wait for their chunk jobs
+        self.splitting_lock = threading.Lock()
+        self.stop_flag = stop_flag or threading.Event()
+        self.pause_flag = pause_flag or threading.Event()
+        self.engine_missing = False
+        self.final_statuses = {} # path -> last status reported during this run
+        self.job_queue = queue.PriorityQueue()
+        self.render_queue = queue.Queue(maxsize=worker_count * 2)
+
+    def report_status(self, file_path, processed_status):
+        self.final_statuses[file_path] = processed_status
+        self.set_status(file_path, processed_status)
+        if processed_status in ("Yes", "No speech", "Failed"):
+            self.metrics.finish(file_path, processed_status)
+        elif processed_status == "No": # Stopped part way
+            self.metrics.discard(file_path)
+
+    def start_metrics(self, file_path, entry):
+        """Starts the metrics record of a file a worker has picked up."""
+        try:
+            bytes_in = os.path.getsize(file_path)
+        except OSError:
+            bytes_in = None
+        self.metrics.start(file_path, self.model, time.time() - self.run_started,
+                           audio_seconds=entry.duration, bytes_in=bytes_in)
+
+    def record_engine_result(self, file_path, result):
+        self.metrics.update(file_path, engine_seconds=result.wall_time, load_seconds=result.load_time,
+                            inference_seconds=result.inference_time, exit_code=result.returncode)
+        if result.compute_type and result.compute_type != self.compute_type:
+            self.fallback_paths.add(file_path)
+
+    def cache_transcript(self, file_path, filename, cache_key, txt_output_path):
+        """Stores a finished transcript in the cache, unless the engine fell back to another compute type."""
+        if file_path in self.fallback_paths:
+            # Cached under the requested compute type, it would be served as if made with it
+            self.fallback_paths.discard(file_path)
+            self.log(f"[INFO] Not caching the transcript of '{filename}'; the engine fell back to another compute type.")
+            return
+        try:
+            self.transcript_cache.put(cache_key, txt_output_path)
+        except OSError as e:
+            self.log(f"[WARNING] Could not cache transcript for '{filename}': {e}", "orange")
+
+    def run(self):
+        """Processes the whole queue and returns when it is finished or stopped."""
+        # The default policy takes items in reverse order (descending) as per request. The
+        # position in the schedule is the job priority, so the pool picks files in that order.
+        self.run_started = time.time()
+        all_paths = schedule_order(self.queue_model.view(), self.schedule_policy)
+        self.scheduled = all_paths
+        if self.schedule_policy != SCHEDULE_BOTTOM_UP:
+            self.log(f"[INFO] Scheduling: {self.schedule_policy}.", "blue")
+        for priority, file_path in enumerate(all_paths):
+            self.job_queue.put((priority, WHOLE_FILE, file_path))
+        self.prefetcher.start(path for path in all_paths
+                              if getattr(self.queue_model.get(path), 'processed', "Yes") not in DONE_STATUSES)
+
+        if self.chunk_seconds > 0 and not ffmpeg_available():
+            self.log("[WARNING] ffmpeg/ffprobe not found. Long files will be transcribed without chunking.", "orange")
+            self.chunk_seconds = 0
+        if self.draft_model and self.engine_mode == ENGINE_MODE_REMOTE:
+            self.log("[WARNING] Remote workers return no segment confidence. Files get a single pass.", "orange")
+            self.draft_model = None
+        elif self.draft_model and not ffmpeg_available():
+            self.log("[WARNING] ffmpeg/ffprobe not found. Files get a single pass without a draft model.", "orange")
+            self.draft_model = None
+        if self.draft_model:
+            self.log(f"[INFO] Cascade: drafting with '{self.draft_model}', low-confidence ranges "
+                     f"(avg log-prob below {self.min_logprob:g}) redone with '{self.model}'.", "blue")
+        if self.speech_threshold > 0 and not ffmpeg_available():
+            self.log("[WARNING] ffmpeg/ffprobe not found. Files are transcribed without the no-speech check.", "orange")
+            self.speech_threshold = 0
+
+        if "pdf" in self.output_formats and self.font_path is None:
+            self.log("[WARNING] No Unicode TrueType font found. PDFs use Arial; characters outside latin-1 become '?'.", "orange")
+        self.log(f"[INFO] Output formats: {', '.join(FORMAT_LABELS[f] for f in self.output_formats)}.", "blue")
+
+        if self.engine_mode == ENGINE_MODE_REMOTE:
+            self.log(f"[INFO] Handing up to {self.worker_count} jobs at a time to remote workers.", "blue")
+        elif self.worker_count > 1:
+            self.log(f"[INFO] Starting {self.worker_count} workers"
+                     f" ({self.engine_threads} threads each).", "blue")
+        if self.compute_type != FALLBACK_COMPUTE_TYPE:
+            self.log(f"[INFO] Engine compute type: {self.compute_type}"
+                     f"{f', {self.engine_threads} threads' if self.engine_threads else ''}.", "blue")
+
+        # PDF rendering runs as a separate stage fed through a bounded queue, so the
+        # engine moves on to the next file while the previous transcript is laid out
+        render_thread = threading.Thread(target=self.render_stage_worker)
+        render_thread.daemon = True
+        render_thread.start()
+
+        workers = []
+        for worker_index in range(1, self.worker_count + 1):
+            worker = threading.Thread(target=self.worker_loop, args=(worker_index,))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        while any(worker.is_alive() for worker in workers):
+            if self.stop_flag.wait(0.5):
+                self.prefetcher.stop() # Kill a running extraction now rather than after the workers exit
+                break
+        for worker in workers:
+            worker.join()
+
+        self.prefetcher.stop()
+        self.render_queue.put(None) # No more transcripts; let the render stage drain and exit
+        render_thread.join()
+
+        for file_path, (job, *_) in self.chunked_jobs.items():
+            if not job.failed: # Stopped part way; the finished chunks are picked up next run
+                self.report_status(file_path, "No")
+
+        self.log(f"[INFO] {self.transcript_cache.stats_message()}", "blue")
+        if self.prefetcher.thread is not None:
+            self.log(f"[INFO] {self.prefetcher.stats_message()}", "blue")
+        if self.speech_stats['checked']:
+            self.log(f"[INFO] {self.speech_stats_message()}", "blue")
+        if self.cascade_stats['files']:
+            self.log(f"[INFO] {self.cascade_stats_message()}", "blue")
+        run_records = [record for record in self.metrics.finished if record['finished_at'] >= self.run_started]
+        if run_records:
+            for line in summary_lines(summarize(run_records)):
+                self.log(f"[INFO] {line}", "blue")
+
+    def speech_stats_message(self):
+        """Returns a one-line summary of the no-speech check for the console."""
+        with self.speech_lock:
+            stats = dict(self.speech_stats)
+        return (f"No-speech check: {stats['checked']} files checked in {stats['check_seconds']:.1f} s, "
+                f"{stats['skipped']} skipped, saving about {format_duration(stats['saved_seconds']) or '0:00'} "
+                f"of engine time.")
+
+    def cascade_stats_message(self):
+        """Returns a one-line summary of the draft/refine cascade for the console."""
+        with self.cascade_lock:
+            stats = dict(self.cascade_stats)
+        message = f"Cascade: {stats['files']} files"
+        if stats['audio_seconds']:
+            message += f", {100.0 * stats['redone_seconds'] / stats['audio_seconds']:.0f}% of the audio redone"
+        message += f", {stats['engine_seconds']:.1f} s of engine time"
+        if stats['single_pass_seconds'] and stats['engine_seconds']:
+            message += (f" vs. about {stats['single_pass_seconds']:.1f} s in one pass"
+                        f" ({stats['single_pass_seconds'] / stats['engine_seconds']:.1f}x)")
+        return message + "."
+
+    def lacks_speech(self, file_path, entry, media_path):
+        """Runs the no-speech check on a file. Returns True if it was marked "No speech"."""
+        check = check_speech(media_path, entry.duration)
+        threshold = self.speech_threshold
+        skip = check.no_speech(threshold)
+        # Engine time the skip saves, at the model's observed speed, minus the check itself
+        saved = self.rtf_tracker.estimate(self.model, entry.duration) if skip else None
+        with self.speech_lock:
+            self.speech_stats['checked'] += 1
+            self.speech_stats['check_seconds'] += check.elapsed
+            if skip:
+                self.speech_stats['skipped'] += 1
+                self.speech_stats['saved_seconds'] += max(0.0, (saved or 0.0) - check.elapsed)
+        if not skip:
+            self.log(f"[DEBUG] Speech check of '{entry.filename}': {check.describe()} ({check.elapsed:.1f} s).")
+            return False
+        saving = f", saving about {format_duration(saved)} of engine time" if saved else ""
+        self.log(f"[INFO] No speech in '{entry.filename}' ({check.describe()}, threshold {threshold:g}%). "
+                 f"Skipping the engine{saving}.", "blue")
+        self.report_status(file_path, "No speech")
+        return True
+
+    def eta_seconds(self):
+        """Estimates the engine time left in this run from file durations and the model's RTF.
+
+        Files of unknown duration count as the average known one. Returns None
+        if no duration is known.
+        """
+        rtf = self.rtf_tracker.rtf(self.model)
+        durations, unknown, running = [], 0, 0.0
+        now = time.time()
+        for file_path in self.scheduled:
+            status = self.final_statuses.get(file_path)
+            if status in ENGINE_DONE_STATUSES:
+                continue
+            entry = self.queue_model.get(file_path)
+            if entry is None or (status is None and entry.processed in DONE_STATUSES):
+                continue
+            if entry.duration is None:
+                unknown += 1
+            else:
+                durations.append(entry.duration)
+            started = self.engine_started.get(file_path)
+            if started:
+                running += now - started
+        if not durations:
+            return None
+        total = (sum(durations) + unknown * sum(durations) / len(durations)) * rtf
+        return max(0.0, total - running) / self.worker_count
+
+    def worker_loop(self, worker_index):
+        """Pulls files from the shared job queue until it is empty or a stop is requested."""
+        # Each worker owns its engine, so a warm model stays loaded across its files
+        engine = create_engine(self.engine_mode, self.model, self.engine_threads, self.log, self.server_command,
+                               self.engine_command, self.compute_type, self.coordinator)
+        draft_engine = None
+        if self.draft_model:
+            draft_engine = create_engine(self.engine_mode, self.draft_model, self.engine_threads, self.log,
+                                         self.server_command, self.engine_command, self.compute_type,
+                                         output_format="json")
+        try:
+            self.process_jobs(worker_index, engine, draft_engine)
+        finally:
+            engine.close()
+            if draft_engine is not None:
+                draft_engine.close()
+
+    def process_jobs(self, worker_index, engine, draft_engine=None):
+        while True:
+            if self.stop_flag.is_set():
+                self.log(f"[INFO] Transcription stopped by user (worker {worker_index}).", "blue")
+                break
+
+            while self.pause_flag.is_set():
+                self.log(f"[INFO] Transcription paused. Worker {worker_index} waiting to resume...", "blue")
+                time.sleep(1) # Wait for 1 second before checking pause_flag again
+                if self.stop_flag.is_set(): # Allow stopping even while paused
+                    self.log("[INFO] Transcription stopped while paused.", "blue")
+                    break
+
+            if self.stop_flag.is_set(): # Re-check after pause loop
+                break
+
+            try:
+                priority, chunk_index, file_path = self.job_queue.get_nowait()
+            except queue.Empty:
+                with self.splitting_lock:
+                    splitting = self.splitting
+                if splitting:
+                    time.sleep(0.2) # Another worker is about to queue chunk jobs
+                    continue
+                break
+
+            if chunk_index == WHOLE_FILE:
+                self.transcribe_item(file_path, worker_index, engine, priority, draft_engine)
+                self.prefetcher.discard(file_path) # Frees its slot if the file was skipped
+            else:
+                self.transcribe_chunk(file_path, chunk_index, worker_index, engine)
+
+    def render_stage_worker(self):
+        """Renders finished transcripts to the output formats in a process pool until a None job arrives."""
+        # Spawned (not forked) so the pool never inherits engine pipes or worker thread state
+        spawn_context = multiprocessing.get_context("spawn")
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=PDF_RENDER_PROCESSES, mp_context=spawn_context)
+        pool_restarted = False
+        try:
+            while True:
+                job = self.render_queue.get()
+                if job is None:
+                    break
+                file_path, filename, txt_output_path, outputs = job # The TXT its worker wrote, never recomputed
+                if self.stop_flag.is_set():
+                    # Leave it as "Transcribed"; the next run picks it up from the existing TXT
+                    self.metrics.discard(file_path)
+                    continue
+
+                self.report_status(file_path, "Rendering")
+                started = time.time()
+                try:
+                    warnings = None
+                    if executor is not None:
+                        try:
+                            warnings = executor.submit(render_transcript, txt_output_path, outputs,
+                                                       self.font_path).result()
+                        except concurrent.futures.process.BrokenProcessPool:
+                            # A broken pool fails every later submit, so it is replaced once, then given up on
+                            executor.shutdown(wait=False)
+                            executor = None
+                            if not pool_restarted:
+                                pool_restarted = True
+                                executor = concurrent.futures.ProcessPoolExecutor(max_workers=PDF_RENDER_PROCESSES,
+                                                                                  mp_context=spawn_context)
+                            self.log("[WARNING] PDF process pool failed. Rendering this file in-process"
+                                     f"{' and restarting the pool' if executor else ', and the rest too'}.", "orange")
+                    if warnings is None:
+                        warnings = render_transcript(txt_output_path, outputs, self.font_path)
+                    for warning in warnings:
+                        self.log(f"[WARNING] {warning}", "orange")
+                    self.metrics.update(file_path, render_seconds=round(time.time() - started, 3))
+                    self.index_transcript(file_path, txt_output_path)
+                    self.report_status(file_path, "Yes")
+                    self.log(f"[SUCCESS] Converted '{os.path.basename(txt_output_path)}' to "
+                             f"{', '.join(repr(os.path.basename(path)) for path in outputs.values())}", "green")
+                except Exception as e:
+                    self.log(f"[ERROR] Failed to convert '{txt_output_path}' for '{filename}': {e}", "red")
+                    self.metrics.update(file_path, render_seconds=round(time.time() - started, 3))
+                    self.report_status(file_path, "Failed")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def index_transcript(self, file_path, txt_output_path):
+        """Adds a finished transcript to the search index; a failure only costs searchability."""
+        if self.search_index is None:
+            return
+        try:
+            self.search_index.add_transcript(file_path, txt_output_path)
+        except Exception as e:
+            self.log(f"[WARNING] Could not add '{os.path.basename(txt_output_path)}' to the search index: {e}", "orange")
+
+    def queue_for_rendering(self, file_path, filename, txt_output_path, outputs):
+        """Hands a finished transcript to the render stage, blocking while the stage is full."""
+        self.metrics.update(file_path, transcript_bytes=os.path.getsize(txt_output_path))
+        self.report_status(file_path, "Transcribed")
+        self.render_queue.put((file_path, filename, txt_output_path, outputs))
+
+    def transcribe_item(self, file_path, worker_index, engine, priority=0, draft_engine=None):
+        """Transcribes a single queue item and hands the result to the PDF render stage."""
+        entry = self.queue_model.get(file_path)
+        if entry is None: # Removed from the queue since the run started
+            return
+        processed_status = entry.processed
+        filename = entry.filename
+
+        model = self.model
+        destination_folder = self.destination_folder
+        txt_output_path, outputs = output_paths(file_path, filename, destination_folder, self.output_formats)
+
+        # --- Check if already processed or can be retried ---
+        if processed_status == "Yes":
+            self.log(f"[INFO] Skipping '{filename}' - already processed.", "blue")
+            return
+        if processed_status == "No speech" and file_path not in self.speech_overrides:
+            self.log(f"[INFO] Skipping '{filename}' - no speech found in an earlier run.", "blue")
+            return
+
+        # If failed or interrupted before rendering, but TXT exists and is not empty,
+        # send it straight to the PDF stage
+        if processed_status in PENDING_RENDER_STATUSES and os.path.exists(txt_output_path) and os.path.getsize(txt_output_path) > 0:
+            self.log(f"[INFO] Detected existing TXT for '{filename}' ({processed_status}). Queuing PDF conversion.", "blue")
+            self.start_metrics(file_path, entry)
+            self.queue_for_rendering(file_path, filename, txt_output_path, outputs)
+            return # Move to next file while the PDF is rendered
+
+
+        # Check if the outputs already exist (even if 'Processed' status is 'No' due to manual deletion)
+        if all(os.path.exists(path) for path in outputs.values()):
+            self.log(f"[INFO] Outputs for '{filename}' already exist. Marking as processed.", "blue")
+            if os.path.exists(txt_output_path):
+                self.index_transcript(file_path, txt_output_path)
+            self.report_status(file_path, "Yes")
+            return
+
+        self.start_metrics(file_path, entry)
+        # Same recording seen before (e.g. copied to another folder): reuse its transcript
+        cache_key = None
+        try:
+            options = engine_options(self.compute_type)
+            if draft_engine is not None: # A cascade transcript differs from a single pass
+                options += ("--cascade_draft", self.draft_model, "--cascade_min_logprob", str(self.min_logprob))
+            cache_key = transcript_cache_key(media_fingerprint(file_path), model, options)
+            # The cache is only read into and written from this file's own TXT (named after its full path)
+            if self.transcript_cache.get(cache_key, txt_output_path):
+                self.log(f"[INFO] Cache hit for '{filename}'. Skipping transcription.", "green")
+                self.metrics.update(file_path, cache_hit=1)
+                self.queue_for_rendering(file_path, filename, txt_output_path, outputs)
+                return
+        except OSError as e:
+            self.log(f"[WARNING] Transcript cache unavailable for '{filename}': {e}", "orange")
+
+        # Local 16 kHz audio extracted ahead of time, if the prefetcher got to this file
+        audio_path = self.prefetcher.acquire(file_path)
+        if self.speech_threshold > 0 and file_path not in self.speech_overrides:
+            if self.lacks_speech(file_path, entry, audio_path or file_path):
+                self.prefetcher.release(audio_path)
+                return
+        if draft_engine is not None and cache_key:
+            if self.transcribe_cascade(file_path, entry, worker_index, engine, draft_engine, cache_key,
+                                       audio_path or file_path, txt_output_path, outputs):
+                self.prefetcher.release(audio_path)
+                return
+        elif self.chunk_seconds > 0 and cache_key and self.split_into_chunks(file_path, filename, cache_key, priority,
+                                                                           audio_path, txt_output_path, outputs):
+            return # The chunks are transcribed as separate jobs
+
+        self.log(f"[INFO] Worker {worker_index}: transcribing '{filename}' using '{model}' model...", "blue")
+        self.report_status(file_path, f"Processing (W{worker_index})") # Update GUI immediately
+
+        media_path = audio_path or file_path
+        # The engine writes into a folder of its own; the TXT is moved into place once it is complete
+        job_dir = os.path.join(destination_folder, ENGINE_WORK_DIR, job_key(file_path))
+        engine_media_path, engine_output_dir = media_path, job_dir
+        checkpoint = self.open_checkpoint(filename, work_key(cache_key, file_path), media_path,
+                                          entry.duration) if cache_key else None
+        if checkpoint and checkpoint.offset:
+            # Only the audio after the checkpoint is transcribed, into the checkpoint folder
+            engine_media_path, engine_output_dir = checkpoint.remainder_path, checkpoint.work_dir
+        last_report = [0.0]
+
+        def on_output(output):
+            self.log(f"[W{worker_index}] {output}", "blue")
+            position = checkpoint.record(output) if checkpoint else None
+            if position is not None and time.time() - last_report[0] >= PROGRESS_REPORT_SECONDS:
+                last_report[0] = time.time()
+                self.report_status(file_path, f"Processing (W{worker_index}) {progress_status(position, entry.duration)}")
+
+        try:
+            os.makedirs(job_dir, exist_ok=True)
+            self.engine_started[file_path] = time.time()
+            result = engine.transcribe(engine_media_path, engine_output_dir, on_output, self.stop_flag, self.pause_flag)
+            self.record_engine_result(file_path, result)
+            if checkpoint:
+                checkpoint.close()
+            if self.stop_flag.is_set() and result.returncode != 0:
+                # Saved segments stay in the checkpoint; the next run resumes after them
+                self.log(f"[INFO] Terminated transcription for '{filename}'.", "orange")
+                self.report_status(file_path, "No")
+                return
+
+            engine_txt_path = os.path.join(engine_output_dir, f"{os.path.splitext(os.path.basename(engine_media_path))[0]}.txt")
+            if checkpoint and checkpoint.offset and os.path.exists(engine_txt_path):
+                checkpoint.finish(engine_txt_path, txt_output_path) # Saved segments + the remainder, in file time
+            elif os.path.exists(engine_txt_path):
+                os.replace(engine_txt_path, txt_output_path)
+
+            if result.returncode == 0:
+                self.log(f"[SUCCESS] Transcription of '{filename}' completed {result.timing_message()}.", "green")
+                if entry.duration:
+                    self.rtf_tracker.observe(model, entry.duration - (checkpoint.offset if checkpoint else 0.0),
+                                             result.inference_time or result.wall_time)
+                # Ensure the TXT file is in the expected place before conversion
+                if os.path.exists(txt_output_path) and os.path.getsize(txt_output_path) > 0:
+                    if checkpoint:
+                        checkpoint.discard()
+                    if cache_key:
+                        self.cache_transcript(file_path, filename, cache_key, txt_output_path)
+                    self.queue_for_rendering(file_path, filename, txt_output_path, outputs)
+                else:
+                    self.log(f"[ERROR] Expected TXT file '{txt_output_path}' not found or is empty after successful transcription process. (Check faster-whisper-xxl.exe output)", "red")
+                    self.report_status(file_path, "Failed")
+            else:
+                self.log(f"[ERROR] Transcription of '{filename}' failed. Exit Code: {result.returncode}", "red")
+                if result.stderr:
+                    self.log(f"[ERROR] Subprocess Error: {result.stderr.strip()}", "red")
+
+                # Special handling for Exit Code 3221226505
+                if result.returncode == 3221226505 and os.path.exists(txt_output_path) and os.path.getsize(txt_output_path) > 0:
+                    self.log(f"[INFO] Despite Exit Code {result.returncode}, TXT file exists. Queuing PDF conversion for '{filename}'.", "orange")
+                    if checkpoint:
+                        checkpoint.discard()
+                    self.queue_for_rendering(file_path, filename, txt_output_path, outputs)
+                else:
+                    self.report_status(file_path, "Failed")
+
+        except FileNotFoundError:
+            self.log(f"[ERROR] 'faster-whisper-xxl.exe' not found. "
+                     f"Please ensure it's in your system PATH.", "red")
+            self.report_status(file_path, "Failed")
+            self.engine_missing = True
+            self.stop_flag.set() # Stop the entire process, including the other workers
+        except Exception as e:
+            self.log(f"[ERROR] An unexpected error occurred during transcription for '{filename}': {e}", "red")
+            self.report_status(file_path, "Failed")
+            # Continue to next file or stop, depending on desired behavior
+            # For now, let's continue to the next file but mark current as failed.
+        finally:
+            if checkpoint:
+                checkpoint.close()
+            self.engine_started.pop(file_path, None)
+            self.prefetcher.release(audio_path)
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def transcribe_cascade(self, file_path, entry, worker_index, engine, draft_engine, cache_key, media_path,
+                           txt_output_path, outputs):
+        """Drafts a file with the draft model and redoes its low-confidence ranges with the main model.
+
+        Returns False if the file should get a single pass instead (no draft
+        confidence, or too much of it to redo).
+        """
+        filename = entry.filename
+        job = CascadeJob(file_path, filename,
+                         os.path.join(self.destination_folder, CASCADE_WORK_DIR, work_key(cache_key, file_path)),
+                         media_path)
+        engine_seconds = 0.0
+
+        def on_output(output):
+            self.log(f"[W{worker_index}] {output}", "blue")
+
+        try:
+            os.makedirs(job.work_dir, exist_ok=True)
+            duration = entry.duration or probe_duration(media_path)
+            self.engine_started[file_path] = time.time()
+            if not job.has_draft():
+                self.log(f"[INFO] Worker {worker_index}: drafting '{filename}' using '{self.draft_model}' model...", "blue")
+                self.report_status(file_path, f"Drafting (W{worker_index})")
+                result = draft_engine.transcribe(media_path, job.work_dir, on_output, self.stop_flag, self.pause_flag)
+                self.record_engine_result(file_path, result)
+                if self.stop_flag.is_set() and result.returncode != 0:
+                    self.log(f"[INFO] Terminated the draft of '{filename}'.", "orange")
+                    self.report_status(file_path, "No")
+                    return True
+                if result.returncode != 0 or not job.keep_draft(job.work_dir):
+                    self.log(f"[WARNING] The '{self.draft_model}' draft of '{filename}' failed "
+                             f"(Exit Code: {result.returncode}). Transcribing it in one pass.", "orange")
+                    job.cleanup()
+                    return False
+                engine_seconds += result.inference_time or result.wall_time
+                if duration:
+                    self.rtf_tracker.observe(self.draft_model, duration, result.inference_time or result.wall_time)
+
+            ranges = job.plan(self.min_logprob)
+            if job.segments and not has_confidence(job.segments):
+                self.log(f"[WARNING] The '{self.draft_model}' draft of '{filename}' has no segment confidence. "
+                         f"Transcribing it in one pass.", "orange")
+                job.cleanup()
+                return False
+            redone = job.range_seconds()
+            if duration and redone > FULL_PASS_FRACTION * duration:
+                self.log(f"[INFO] {100.0 * redone / duration:.0f}% of the '{self.draft_model}' draft of '{filename}' "
+                         f"is low-confidence. Transcribing it in one pass.", "blue")
+                job.cleanup()
+                return False
+
+            for index in sorted(job.remaining):
+                done = len(ranges) - len(job.remaining)
+                self.report_status(file_path, f"Refining (W{worker_index}) {done}/{len(ranges)}")
+                job.extract(index)
+                result = engine.transcribe(job.audio_path(index), job.work_dir, on_output,
+                                           self.stop_flag, self.pause_flag)
+                self.record_engine_result(file_path, result)
+                if self.stop_flag.is_set() and result.returncode != 0:
+                    # The draft and the finished ranges stay in the work folder for the next run
+                    self.log(f"[INFO] Terminated transcription for '{filename}'.", "orange")
+                    self.report_status(file_path, "No")
+                    return True
+                if result.returncode != 0:
+                    self.log(f"[ERROR] Refining {job.range_name(index)} of '{filename}' failed. "
+                             f"Exit Code: {result.returncode}", "red")
+                    if result.stderr:
+                        self.log(f"[ERROR] Subprocess Error: {result.stderr.strip()}", "red")
+                    self.report_status(file_path, "Failed")
+                    return True
+                engine_seconds += result.inference_time or result.wall_time
+                start, end = ranges[index]
+                self.rtf_tracker.observe(self.model, end - start, result.inference_time or result.wall_time)
+                job.complete(index, os.path.join(job.work_dir, f"{job.range_name(index)}.txt"))
+
+            job.merge(txt_output_path)
+        except FileNotFoundError:
+            self.log(f"[ERROR] 'faster-whisper-xxl.exe' not found. "
+                     f"Please ensure it's in your system PATH.", "red")
+            self.report_status(file_path, "Failed")
+            self.engine_missing = True
+            self.stop_flag.set()
+            return True
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            self.log(f"[WARNING] Cascade of '{filename}' failed: {e}. Transcribing it in one pass.", "orange")
+            return False
+        finally:
+            self.engine_started.pop(file_path, None)
+
+        if os.path.getsize(txt_output_path) == 0:
+            self.log(f"[ERROR] The merged transcript of '{filename}' is empty.", "red")
+            self.report_status(file_path, "Failed")
+            return True
+        single_pass = self.rtf_tracker.estimate(self.model, duration)
+        message = f"{len(ranges)} ranges, {100.0 * redone / duration:.0f}% of the audio redone" if duration \
+            else f"{len(ranges)} ranges redone"
+        if single_pass and engine_seconds:
+            message += f", {engine_seconds:.1f} s of engine time vs. about {single_pass:.1f} s in one pass" \
+                       f" ({single_pass / engine_seconds:.1f}x)"
+        self.log(f"[SUCCESS] Cascade of '{filename}' completed: {message}.", "green")
+        with self.cascade_lock:
+            self.cascade_stats['files'] += 1
+            self.cascade_stats['audio_seconds'] += duration or 0.0
+            self.cascade_stats['redone_seconds'] += redone
+            self.cascade_stats['engine_seconds'] += engine_seconds
+            self.cascade_stats['single_pass_seconds'] += single_pass or 0.0
+        self.cache_transcript(file_path, filename, cache_key, txt_output_path)
+        job.cleanup()
+        self.queue_for_rendering(file_path, filename, txt_output_path, outputs)
+        return True
+
+    def open_checkpoint(self, filename, checkpoint_key, media_path, duration):
+        """Returns the segment checkpoint of a whole-file run, or None if checkpoints can't be written.
+
+        When an earlier run of the file was stopped or crashed, the audio after
+        its last saved segment is cut out for the engine to resume from.
+        """
+        checkpoint = TranscriptCheckpoint(os.path.join(self.destination_folder, CHECKPOINT_DIR), checkpoint_key)
+        if checkpoint.resume_offset() and ffmpeg_available():
+            try:
+                duration = duration or probe_duration(media_path)
+                if duration and checkpoint.resume_offset() < duration:
+                    checkpoint.cut_remainder(media_path, duration)
+                    self.log(f"[INFO] Resuming '{filename}' from {progress_status(checkpoint.offset, duration)}.", "blue")
+            except (OSError, subprocess.CalledProcessError) as e:
+                self.log(f"[WARNING] Could not resume '{filename}' from its checkpoint: {e}. Starting over.", "orange")
+        try:
+            checkpoint.begin()
+        except OSError as e:
+            self.log(f"[WARNING] Could not write a checkpoint for '{filename}': {e}", "orange")
+            return None
+        return checkpoint
+
+    def split_into_chunks(self, file_path, filename, cache_key, priority, audio_path, txt_output_path, outputs):
+        """Queues the chunks of a long file as jobs. Returns False if the file should be transcribed whole."""
+        with self.splitting_lock:
+            self.splitting += 1
+        try:
+            # Chunks are cut from the prefetched audio when there is some, which is much cheaper to seek
+            job = ChunkedJob.prepare(file_path, filename, os.path.join(self.destination_folder, CHUNK_WORK_DIR),
+                                     work_key(cache_key, file_path), self.chunk_seconds, self.chunk_overlap, self.log,
+                                     media_path=audio_path)
+            if job is None:
+                return False
+            self.chunked_jobs[file_path] = (job, priority, cache_key, audio_path, txt_output_path, outputs)
+            self.metrics.update(file_path, chunks=len(job.chunks), audio_seconds=job.chunks[-1][1])
+            done, total = job.progress()
+            if done == total: # Every chunk finished in an earlier run
+                self.finish_chunked_file(file_path)
+                return True
+            self.report_status(file_path, f"Chunks {done}/{total}")
+            for chunk_index in sorted(job.remaining):
+                self.job_queue.put((priority, chunk_index, file_path))
+            return True
+        except (OSError, ValueError) as e:
+            self.log(f"[WARNING] Could not split '{filename}' into chunks: {e}. Transcribing it whole.", "orange")
+            return False
+        finally:
+            with self.splitting_lock:
+                self.splitting -= 1
+
+    def transcribe_chunk(self, file_path, chunk_index, worker_index, engine):
+        """Transcribes one chunk of a long file; the worker finishing the last chunk stitches the transcript."""
+        chunked_job = self.chunked_jobs.get(file_path)
+        if chunked_job is None or chunked_job[0].failed: # Another chunk of the file already failed for good
+            return
+        job, priority, *_ = chunked_job
+        name = job.chunk_name(chunk_index)
+        self.log(f"[INFO] Worker {worker_index}: transcribing {name} of '{job.filename}' using '{self.model}' model...", "blue")
+        try:
+            job.extract(chunk_index)
+            result = engine.transcribe(job.audio_path(chunk_index), job.work_dir,
+                                       lambda output: self.log(f"[W{worker_index}] {output}", "blue"),
+                                       self.stop_flag, self.pause_flag)
+        except FileNotFoundError:
+            self.log(f"[ERROR] 'faster-whisper-xxl.exe' not found. "
+                     f"Please ensure it's in your system PATH.", "red")
+            self.report_status(file_path, "Failed")
+            self.engine_missing = True
+            self.stop_flag.set()
+            return
+        except Exception as e: # ffmpeg failures (CalledProcessError) included
+            result = None
+            error_message = str(e)
+
+        if result is not None:
+            self.record_engine_result(file_path, result) # Engine times add up over the chunks
+        if self.stop_flag.is_set() and (result is None or result.returncode != 0):
+            # Finished chunks stay in the work folder and are reused on the next run
+            self.log(f"[INFO] Terminated {name} of '{job.filename}'.", "orange")
+            self.report_status(file_path, "No")
+            return
+
+        if result is not None and result.returncode == 0:
+            start, end = job.chunks[chunk_index]
+            self.rtf_tracker.observe(self.model, end - start, result.inference_time or result.wall_time)
+            if job.complete(chunk_index, os.path.join(job.work_dir, f"{name}.txt")):
+                self.finish_chunked_file(file_path)
+            else:
+                done, total = job.progress()
+                self.report_status(file_path, f"Chunks {done}/{total}")
+            return
+
+        if result is not None:
+            error_message = f"Exit Code: {result.returncode}"
+            if result.stderr:
+                error_message += f" ({result.stderr.strip()})"
+        if job.retry(chunk_index):
+            self.log(f"[WARNING] {name} of '{job.filename}' failed: {error_message}. Retrying.", "orange")
+            self.job_queue.put((priority, chunk_index, file_path))
+        else:
+            self.log(f"[ERROR] {name} of '{job.filename}' failed after {job.attempts[chunk_index]} attempts: "
+                     f"{error_message}", "red")
+            self.report_status(file_path, "Failed")
+            # Its other chunks are skipped; unpin the prefetched audio now rather than at the end of the run
+            if self.chunked_jobs.pop(file_path, None) is not None:
+                self.prefetcher.release(chunked_job[3])
+
+    def finish_chunked_file(self, file_path):
+        """Stitches the chunk transcripts of a file into its TXT and hands it to the render stage."""
+        # The TXT path is the one the job was queued with, never recomputed, so the render stage reads this job's text
+        job, _, cache_key, audio_path, txt_output_path, outputs = self.chunked_jobs.pop(file_path)
+        self.prefetcher.release(audio_path)
+        try:
+            job.stitch(txt_output_path)
+        except OSError as e:
+            self.log(f"[ERROR] Could not stitch the chunks of '{job.filename}': {e}", "red")
+            self.report_status(file_path, "Failed")
+            return
+        self.log(f"[SUCCESS] Transcription of '{job.filename}' completed ({len(job.chunks)} chunks).", "green")
+        if os.path.getsize(txt_output_path) == 0:
+            self.log(f"[ERROR] No speech found in the chunks of '{job.filename}'.", "red")
+            self.report_status(file_path, "Failed")
+            return
+        self.cache_transcript(file_path, job.filename, cache_key, txt_output_path)
+        job.cleanup()
+        self.queue_for_rendering(file_path, job.filename, txt_output_path, outputs)
@@ -0,0 +1,224 @@
+import os
+import time
+import shutil
+import hashlib
+import threading
+import subprocess
+from vt_engine import CREATION_FLAGS
+from vt_chunking import FFMPEG_EXE, ffmpeg_available, probe_duration
+
+# Constants
+DEFAULT_SCRATCH_DIR = 'audio_scratch'
+DEFAULT_SCRATCH_MB = 4096 # Disk budget of the extracted audio
+DEFAULT_PREFETCH_FILES = 2 # Files extracted ahead of the workers (0 = prefetch off)
+AUDIO_BYTES_PER_SECOND = 16000 * 2 # 16 kHz mono 16-bit PCM
+
+
+def scratch_key(file_path):
+    """Returns the scratch entry name for a media file; it changes when the file is modified."""
+    stat = os.stat(file_path)
+    payload = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20]
+
+
+class AudioPrefetcher:
+    """Extracts 16 kHz mono audio for upcoming queue files into a local scratch folder.
+
+    A background thread walks the queue order and keeps up to 'depth' files
+    extracted ahead of the workers, so the engine reads a small local WAV
+    instead of demuxing a multi-GB video from a possibly slow mount. Entries
+    not in use are evicted least recently used first to stay within max_bytes;
+    entries kept from earlier runs are reused while the source is unchanged.
+    """
+
+    def __init__(self, scratch_dir, max_bytes, depth, log):
+        self.scratch_dir = scratch_dir
+        self.max_bytes = max_bytes
+        self.depth = depth
+        self.log = log
+        self.condition = threading.Condition()
+        self.entries = {} # key -> {'size': bytes, 'last_used': timestamp}
+        self.ready = {} # path -> extracted audio path, for files not yet taken by a worker
+        self.extracting = None # Path currently being extracted
+        self.taken = set() # Paths a worker has started (with or without prefetched audio)
+        self.in_use = set() # Keys whose audio a worker is reading
+        self.stopped = False
+        self.thread = None
+        self.process = None # Running ffmpeg extraction
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.extract_seconds = 0.0
+        self.extracted = 0
+        self.reused = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.scratch_dir, exist_ok=True)
+        self.load_entries()
+
+    def load_entries(self):
+        """Picks up audio extracted by earlier runs."""
+        for entry in os.scandir(self.scratch_dir):
+            if not entry.is_dir():
+                continue
+            files = [f for f in os.scandir(entry.path) if f.is_file() and f.name.endswith('.wav')]
+            if files:
+                self.entries[entry.name] = {'size': sum(f.stat().st_size for f in files),
+                                            'last_used': max(f.stat().st_mtime for f in files)}
+            else: # Leftover of an interrupted extraction
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def total_bytes(self):
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def audio_path(self, key, file_path):
+        base_filename = os.path.splitext(os.path.basename(file_path))[0]
+        # Named after the source so the engine writes <base>.txt as usual
+        return os.path.join(self.scratch_dir, key, f"{base_filename}.wav")
+
+    def start(self, paths):
+        """Starts extracting ahead of the workers, following the given queue order."""
+        if self.depth <= 0:
+            return False
+        if not ffmpeg_available():
+            self.log("[INFO] ffmpeg not found. Audio prefetch is off; the engine reads the media files directly.")
+            return False
+        self.thread = threading.Thread(target=self.prefetch_loop, args=(list(paths),))
+        self.thread.daemon = True
+        self.thread.start()
+        return True
+
+    def prefetch_loop(self, paths):
+        for file_path in paths:
+            with self.condition:
+                # Stay at most 'depth' files ahead of the workers
+                while not self.stopped and len(self.ready) >= self.depth:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                if file_path in self.taken:
+                    continue # A worker already started it without prefetched audio
+                self.extracting = file_path
+            audio_path = None
+            try:
+                audio_path = self.prepare(file_path)
+            except (OSError, subprocess.CalledProcessError) as e:
+                self.log(f"[WARNING] Could not extract audio of '{os.path.basename(file_path)}': {e}", "orange")
+            with self.condition:
+                self.extracting = None
+                if audio_path and file_path not in self.taken:
+                    self.ready[file_path] = audio_path
+                self.condition.notify_all()
+
+    def prepare(self, file_path):
+        """Returns the scratch audio for file_path, extracting it if needed. None if it doesn't fit."""
+        key = scratch_key(file_path)
+        audio_path = self.audio_path(key, file_path)
+        with self.condition:
+            if key in self.entries and os.path.exists(audio_path):
+                self.entries[key]['last_used'] = time.time()
+                self.reused += 1
+                return audio_path
+
+        duration = probe_duration(file_path)
+        if duration is None: # No audio stream or unreadable; let the engine report it
+            return None
+        expected_size = int(duration * AUDIO_BYTES_PER_SECOND)
+        with self.condition:
+            if not self.make_room(expected_size):
+                self.log(f"[INFO] Not prefetching '{os.path.basename(file_path)}': "
+                         f"{expected_size / (1024 * 1024):.0f} MB of audio does not fit the scratch budget.")
+                return None
+
+        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+        temp_path = audio_path + '.part.wav'
+        started = time.time()
+        with self.condition:
+            if self.stopped:
+                return None
+            self.process = subprocess.Popen(
+                [FFMPEG_EXE, "-hide_banner", "-loglevel", "error", "-y", "-i", file_path,
+                 "-vn", "-ac", "1", "-ar", "16000", temp_path],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, creationflags=CREATION_FLAGS)
+        _, stderr_output = self.process.communicate()
+        if self.process.returncode != 0:
+            if self.stopped:
+                return None
+            raise subprocess.CalledProcessError(self.process.returncode, FFMPEG_EXE, stderr=stderr_output)
+        os.replace(temp_path, audio_path)
+        elapsed = time.time() - started
+        size = os.path.getsize(audio_path)
+        with self.condition:
+            self.entries[key] = {'size': size, 'last_used': time.time()}
+            self.bytes_read += os.path.getsize(file_path)
+            self.bytes_written += size
+            self.extract_seconds += elapsed
+            self.extracted += 1
+        self.log(f"[DEBUG] Prefetched audio of '{os.path.basename(file_path)}' "
+                 f"({size / (1024 * 1024):.1f} MB) in {elapsed:.1f} s.")
+        return audio_path
+
+    def make_room(self, size):
+        """Evicts unused entries, least recently used first, until size more bytes fit. Call with the lock held."""
+        pinned = self.in_use | {os.path.basename(os.path.dirname(path)) for path in self.ready.values()}
+        total = self.total_bytes()
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total + size <= self.max_bytes:
+                break
+            if key in pinned:
+                continue
+            total -= self.entries.pop(key)['size']
+            shutil.rmtree(os.path.join(self.scratch_dir, key), ignore_errors=True)
+        return total + size <= self.max_bytes
+
+    def acquire(self, file_path):
+        """Returns prefetched audio for a file a worker is about to transcribe, or None to use the source file.
+
+        Waits if the file is being extracted right now, but never for files the
+        prefetcher has not reached yet, and not at all once the prefetcher is stopped.
+        """
+        with self.condition:
+            while self.extracting == file_path and not self.stopped:
+                self.condition.wait()
+            self.taken.add(file_path)
+            audio_path = self.ready.pop(file_path, None)
+            if audio_path:
+                self.in_use.add(os.path.basename(os.path.dirname(audio_path)))
+                self.hits += 1
+            elif self.thread is not None:
+                self.misses += 1
+            self.condition.notify_all() # A slot ahead of the workers is free again
+            return audio_path
+
+    def discard(self, file_path):
+        """Drops a file from the look-ahead without using its audio (e.g. it was skipped or a cache hit)."""
+        with self.condition:
+            self.taken.add(file_path)
+            if self.ready.pop(file_path, None):
+                self.condition.notify_all()
+
+    def release(self, audio_path):
+        """Marks audio as no longer read by a worker; it stays cached until evicted."""
+        if not audio_path:
+            return
+        with self.condition:
+            key = os.path.basename(os.path.dirname(audio_path))
+            self.in_use.discard(key)
+            if key in self.entries:
+                self.entries[key]['last_used'] = time.time()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+            if self.process is not None and self.process.poll() is None:
+                self.process.kill() # Don't hold up a stop for a long extraction
+        if self.thread is not None:
+            self.thread.join()
+
+    def stats_message(self):
+        """Returns a one-line summary of the prefetch counters for the console."""
+        with self.condition:
+            return (f"Audio prefetch: {self.hits} hits, {self.misses} misses, {self.extracted} extracted "
+                    f"({self.bytes_read / (1024 * 1024):.1f} MB read, {self.extract_seconds:.1f} s), "
+                    f"{self.reused} reused, scratch {self.total_bytes() / (1024 * 1024):.1f}"
+                    f"/{self.max_bytes / (1024 * 1024):.0f} MB in {len(self.entries)} files.")
@@ -0,0 +1,164 @@
+import threading
+
+# Constants
+STATUS_FILTERS = ("All", "No", "Yes", "No speech", "Failed", "In progress")
+FINAL_STATUSES = ("No", "Yes", "No speech", "Failed") # Anything else counts as "In progress"
+DONE_STATUSES = ("Yes", "No speech") # Files a run skips
+SORT_ATTRIBUTES = {"Processed": "processed", "Duration": "duration", "ETA": "eta", "Path": "path", "Filename": "filename"}
+NUMERIC_SORT_COLUMNS = ("Duration", "ETA")
+
+
+class QueueEntry:
+    """One queued media file. duration and eta (expected engine time) are seconds, None until known."""
+    __slots__ = ('path', 'filename', 'processed', 'duration', 'eta')
+
+    def __init__(self, path, filename, processed="No", duration=None, eta=None):
+        self.path = path
+        self.filename = filename
+        self.processed = processed
+        self.duration = duration
+        self.eta = eta
+
+
+class QueueModel:
+    """In-memory transcription queue: the source of truth the Treeview renders from.
+
+    Entries are kept in queue order with a path -> position map, so lookups,
+    duplicate checks and status updates are O(1) regardless of queue size.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.entries = []
+        self.positions = {} # path -> index in entries
+        self.version = 0 # Bumped on every change so views know when to rebuild
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return path in self.positions
+
+    def get(self, path):
+        """Returns the entry for path, or None if it is not queued."""
+        with self.lock:
+            position = self.positions.get(path)
+            return self.entries[position] if position is not None else None
+
+    def paths(self):
+        """Returns a snapshot of all queued paths in queue order."""
+        with self.lock:
+            return [entry.path for entry in self.entries]
+
+    def reindex(self, start=0, end=None):
+        """Refreshes the path -> position map for entries[start:end]."""
+        end = len(self.entries) if end is None else end
+        for position in range(start, end):
+            self.positions[self.entries[position].path] = position
+
+    def extend(self, items):
+        """Appends (path, filename, processed[, duration, eta]) tuples, skipping queued paths.
+
+        Returns the added ones as (path, filename, processed) tuples.
+        """
+        added = []
+        with self.lock:
+            for item in items:
+                path, filename, processed = item[:3]
+                if path in self.positions:
+                    continue
+                self.positions[path] = len(self.entries)
+                self.entries.append(QueueEntry(*item))
+                added.append((path, filename, processed))
+            if added:
+                self.version += 1
+        return added
+
+    def update_status(self, path, processed):
+        """Sets the 'Processed' status of a queued file. Returns False if it is not queued."""
+        with self.lock:
+            entry = self.get(path)
+            if entry is None:
+                return False
+            entry.processed = processed
+            self.version += 1
+            return True
+
+    def update_estimates(self, estimates):
+        """Sets duration and eta from (path, duration, eta) tuples, skipping paths no longer queued."""
+        with self.lock:
+            for path, duration, eta in estimates:
+                entry = self.get(path)
+                if entry is not None:
+                    entry.duration, entry.eta = duration, eta
+            self.version += 1
+
+    def remove_paths(self, paths):
+        """Removes the given paths from the queue."""
+        with self.lock:
+            removed = {path for path in paths if path in self.positions}
+            if not removed:
+                return
+            self.entries = [entry for entry in self.entries if entry.path not in removed]
+            for path in removed:
+                del self.positions[path]
+            self.reindex()
+            self.version += 1
+
+    def move_block(self, paths, direction):
+        """Moves the given paths one place up or down, keeping each contiguous run together.
+
+        Returns the paths of the changed span in their new order (empty if
+        nothing moved), so the caller can persist just that span.
+        """
+        with self.lock:
+            selected = sorted(self.positions[path] for path in paths if path in self.positions)
+            # Group the selection into runs of consecutive positions
+            runs = []
+            for position in selected:
+                if runs and runs[-1][1] == position - 1:
+                    runs[-1][1] = position
+                else:
+                    runs.append([position, position])
+
+            low, high = None, None
+            for start, end in runs:
+                if direction == "up" and start > 0:
+                    # The entry above the run drops below it
+                    self.entries.insert(end, self.entries.pop(start - 1))
+                    span = (start - 1, end)
+                elif direction == "down" and end < len(self.entries) - 1:
+                    # The entry below the run rises above it
+                    self.entries.insert(start, self.entries.pop(end + 1))
+                    span = (start, end + 1)
+                else:
+                    continue
+                low = span[0] if low is None else min(low, span[0])
+                high = span[1] if high is None else max(high, span[1])
+
+            if low is None:
+                return []
+            self.reindex(low, high + 1)
+            self.version += 1
+            return [entry.path for entry in self.entries[low:high + 1]]
+
+    def view(self, status_filter="All", sort_column=None, descending=False):
+        """Returns the entries to display, filtered by status and optionally sorted by a column."""
+        with self.lock:
+            if status_filter == "All":
+                entries = self.entries
+            elif status_filter == "In progress":
+                entries = [entry for entry in self.entries if entry.processed not in FINAL_STATUSES]
+            else:
+                entries = [entry for entry in self.entries if entry.processed == status_filter]
+            if sort_column:
+                attribute = SORT_ATTRIBUTES[sort_column]
+                if sort_column in NUMERIC_SORT_COLUMNS:
+                    # Unknown values sort before every known one
+                    key = lambda entry: -1 if getattr(entry, attribute) is None else getattr(entry, attribute)
+                else:
+                    key = lambda entry: getattr(entry, attribute).lower()
+                entries = sorted(entries, key=key, reverse=descending)
+            elif entries is self.entries:
+                entries = list(entries)
+            return entries
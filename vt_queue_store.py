@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+from vt_metrics import METRIC_FIELDS
+
+# Constants
+QUEUE_DB_FILE = 'queue.db'
+LOAD_BATCH_SIZE = 1000 # Rows fetched per batch when loading the queue
+
+
+class QueueStore:
+    """SQLite-backed transcription queue.
+
+    Each queued file is one row ordered by 'position', so a status change,
+    addition or removal is a single indexed write instead of a rewrite of the
+    whole queue. SQLite transactions keep the file consistent if the app dies
+    mid-write.
+    """
+
+    def __init__(self, db_path=QUEUE_DB_FILE):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS queue (
+                path TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                processed TEXT NOT NULL DEFAULT 'No',
+                position INTEGER NOT NULL,
+                duration REAL,
+                eta REAL
+            )""")
+        # Queues created by older versions lack the estimate columns
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(queue)")}
+        for column in ("duration", "eta"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE queue ADD COLUMN {column} REAL")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS queue_position ON queue (position)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS model_stats (
+                model TEXT PRIMARY KEY,
+                audio_seconds REAL NOT NULL,
+                engine_seconds REAL NOT NULL
+            )""")
+        # Latest stage timings of each processed file (see vt_metrics)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_metrics (
+                path TEXT PRIMARY KEY,
+                model TEXT,
+                status TEXT,
+                finished_at REAL,
+                queue_wait REAL,
+                engine_seconds REAL,
+                load_seconds REAL,
+                inference_seconds REAL,
+                audio_seconds REAL,
+                rtf REAL,
+                bytes_in INTEGER,
+                transcript_bytes INTEGER,
+                render_seconds REAL,
+                exit_code INTEGER,
+                cache_hit INTEGER,
+                chunks INTEGER
+            )""")
+        self.conn.commit()
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    def iter_batches(self, batch_size=LOAD_BATCH_SIZE):
+        """Yields the queue in order as lists of dicts, batch_size rows at a time."""
+        last_position = None
+        while True:
+            with self.lock:
+                if last_position is None:
+                    rows = self.conn.execute(
+                        "SELECT processed, path, filename, position, duration, eta FROM queue "
+                        "ORDER BY position LIMIT ?", (batch_size,)).fetchall()
+                else:
+                    rows = self.conn.execute(
+                        "SELECT processed, path, filename, position, duration, eta FROM queue "
+                        "WHERE position > ? ORDER BY position LIMIT ?", (last_position, batch_size)).fetchall()
+            if not rows:
+                return
+            last_position = rows[-1][3]
+            yield [{'processed': processed, 'path': path, 'filename': filename, 'duration': duration, 'eta': eta}
+                   for processed, path, filename, _, duration, eta in rows]
+
+    def add_items(self, items):
+        """Appends (path, filename, processed) tuples to the end of the queue, ignoring known paths."""
+        with self.lock, self.conn:
+            next_position = self.conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM queue").fetchone()[0]
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO queue (path, filename, processed, position) VALUES (?, ?, ?, ?)",
+                [(path, filename, processed, next_position + offset)
+                 for offset, (path, filename, processed) in enumerate(items)])
+
+    def update_status(self, path, processed):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE queue SET processed = ? WHERE path = ?", (processed, path))
+
+    def update_estimates(self, estimates):
+        """Stores (path, duration, eta) tuples."""
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE queue SET duration = ?, eta = ? WHERE path = ?",
+                                  [(duration, eta, path) for path, duration, eta in estimates])
+
+    def model_stats(self):
+        """Returns {model: [audio_seconds, engine_seconds]} totals of past runs."""
+        with self.lock:
+            return {model: [audio_seconds, engine_seconds] for model, audio_seconds, engine_seconds
+                    in self.conn.execute("SELECT model, audio_seconds, engine_seconds FROM model_stats")}
+
+    def add_model_stats(self, model, audio_seconds, engine_seconds):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO model_stats (model, audio_seconds, engine_seconds) VALUES (?, ?, ?) "
+                "ON CONFLICT(model) DO UPDATE SET audio_seconds = audio_seconds + excluded.audio_seconds, "
+                "engine_seconds = engine_seconds + excluded.engine_seconds", (model, audio_seconds, engine_seconds))
+
+    def save_metrics(self, record):
+        """Stores a metrics record, replacing the one of an earlier run of the same file."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO file_metrics ({', '.join(METRIC_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(METRIC_FIELDS))})", [record[field] for field in METRIC_FIELDS])
+
+    def metrics(self):
+        """Returns all metrics records as dicts, most recently finished first."""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(METRIC_FIELDS)} FROM file_metrics ORDER BY finished_at DESC").fetchall()
+        return [dict(zip(METRIC_FIELDS, row)) for row in rows]
+
+    def status_counts(self):
+        """Returns {processed status: number of queued files}."""
+        with self.lock:
+            return dict(self.conn.execute("SELECT processed, COUNT(*) FROM queue GROUP BY processed"))
+
+    def remove_paths(self, paths):
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM queue WHERE path = ?", [(path,) for path in paths])
+
+    def reorder(self, paths):
+        """Reassigns the positions held by paths so they follow the given order."""
+        with self.lock, self.conn:
+            positions = sorted(self.conn.execute(
+                "SELECT position FROM queue WHERE path = ?", (path,)).fetchone()[0] for path in paths)
+            self.conn.executemany("UPDATE queue SET position = ? WHERE path = ?",
+                                  list(zip(positions, paths)))
+
+    def replace_all(self, file_queue_data):
+        """Replaces the whole queue with a list of settings.json style dicts (used for migration)."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM queue")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO queue (path, filename, processed, position) VALUES (?, ?, ?, ?)",
+                [(item['path'], item['filename'], item.get('processed', 'No'), position)
+                 for position, item in enumerate(file_queue_data)])
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
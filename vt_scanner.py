@@ -0,0 +1,131 @@
+import os
+import json
+import time
+
+# Constants
+SCAN_INDEX_FILE = 'scan_index.json'
+SCAN_BATCH_SIZE = 500 # Files handed to the queue per batch
+
+
+class FolderScanner:
+    """Incremental folder scanner backed by a persistent directory index.
+
+    The index remembers, per directory, its mtime, its subdirectories and the
+    supported files it contains (name, size, mtime). A directory whose mtime has
+    not changed since the last scan is not listed again; only its
+    subdirectories are checked.
+    """
+
+    def __init__(self, extensions, index_path=SCAN_INDEX_FILE):
+        self.extensions = extensions
+        self.index_path = index_path
+        self.index = {} # dir path -> {'mtime', 'subdirs', 'files'}
+        self.load_index()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.dirs_scanned = 0
+        self.dirs_listed = 0
+        self.files_matched = 0
+        self.start_time = time.time()
+        self.cancelled = False
+
+    def load_index(self):
+        """Loads the directory index saved by a previous scan."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def save_index(self):
+        """Writes the directory index atomically."""
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(temp_path, self.index_path)
+
+    def dirs_per_second(self):
+        elapsed = time.time() - self.start_time
+        return self.dirs_scanned / elapsed if elapsed > 0 else 0.0
+
+    def list_directory(self, dir_path):
+        """Lists a directory with os.scandir, returning (subdirs, matched files)."""
+        subdirs = []
+        files = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                        stat = entry.stat()
+                        files.append([entry.name, stat.st_size, stat.st_mtime])
+                except OSError:
+                    continue # Entry vanished or is unreadable
+        return subdirs, files
+
+    def scan(self, root_folder, on_batch, cancel_event, batch_size=SCAN_BATCH_SIZE, only_new=False):
+        """Walks root_folder top-down, passing lists of (full_path, filename) to on_batch.
+
+        With only_new, only files that were not in the index yet are passed on,
+        which makes a rescan report what appeared since the last one. Stops early
+        when cancel_event is set. The index is saved either way, since every
+        directory entry in it is complete on its own. Returns the set of
+        directories visited.
+        """
+        self.reset_stats()
+        changed = False
+        visited = set()
+        batch = []
+        stack = [root_folder]
+        while stack:
+            if cancel_event.is_set():
+                self.cancelled = True
+                break
+
+            dir_path = stack.pop()
+            try:
+                dir_mtime = os.stat(dir_path).st_mtime
+            except OSError:
+                continue
+
+            cached = self.index.get(dir_path)
+            if cached and cached['mtime'] == dir_mtime:
+                subdirs, files = cached['subdirs'], cached['files']
+                reported = [] if only_new else files
+            else:
+                try:
+                    subdirs, files = self.list_directory(dir_path)
+                except OSError:
+                    continue
+                self.index[dir_path] = {'mtime': dir_mtime, 'subdirs': subdirs, 'files': files}
+                self.dirs_listed += 1
+                changed = True
+                known = {name for name, _, _ in cached['files']} if cached and only_new else set()
+                reported = [file for file in files if file[0] not in known]
+            visited.add(dir_path)
+            self.dirs_scanned += 1
+
+            for name, _, _ in reported:
+                batch.append((os.path.join(dir_path, name), name))
+            self.files_matched += len(reported)
+            if len(batch) >= batch_size:
+                on_batch(batch)
+                batch = []
+
+            # Reversed so subdirectories come off the stack in listing order, like os.walk
+            stack.extend(os.path.join(dir_path, name) for name in reversed(subdirs))
+
+        if batch:
+            on_batch(batch)
+
+        if not self.cancelled:
+            # Forget directories under this root that no longer exist
+            prefix = os.path.join(root_folder, '')
+            for dir_path in [d for d in self.index if d.startswith(prefix) and d not in visited]:
+                del self.index[dir_path]
+                changed = True
+        if changed or not only_new: # Repeated polls of an unchanged tree don't rewrite the index
+            self.save_index()
+        return visited
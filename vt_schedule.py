@@ -0,0 +1,109 @@
+import threading
+import concurrent.futures
+from vt_chunking import probe_duration, ffmpeg_available
+
+# Constants
+SCHEDULE_BOTTOM_UP = "Bottom-up (queue order)"
+SCHEDULE_SHORTEST_FIRST = "Shortest first"
+SCHEDULE_LONGEST_FIRST = "Longest first"
+SCHEDULE_POLICIES = (SCHEDULE_BOTTOM_UP, SCHEDULE_SHORTEST_FIRST, SCHEDULE_LONGEST_FIRST)
+# Engine seconds per second of audio, used until enough audio was transcribed with a model
+DEFAULT_RTF = {"tiny": 0.05, "small": 0.1, "medium": 0.3, "large": 0.6, "turbo": 0.2}
+MIN_OBSERVED_AUDIO = 300 # Seconds of transcribed audio before the observed RTF replaces the default
+PROBE_THREADS = 4
+PROBE_BATCH_SIZE = 50 # Durations reported per callback
+
+
+def format_duration(seconds):
+    """Formats seconds as H:MM:SS, or M:SS under an hour. Empty for unknown."""
+    if seconds is None:
+        return ""
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def schedule_order(entries, policy=SCHEDULE_BOTTOM_UP):
+    """Returns the paths of queue entries (in queue order) in the order they should be processed.
+
+    Bottom-up keeps the original behaviour. Shortest first clears many small
+    files early; longest first starts the big files first so they don't end
+    up alone on one worker at the end of a run. Files of unknown duration
+    follow the known ones, bottom-up.
+    """
+    bottom_up = list(reversed(entries))
+    if policy == SCHEDULE_BOTTOM_UP:
+        return [entry.path for entry in bottom_up]
+    known = [entry for entry in bottom_up if entry.duration is not None]
+    unknown = [entry for entry in bottom_up if entry.duration is None]
+    known.sort(key=lambda entry: entry.duration, reverse=policy == SCHEDULE_LONGEST_FIRST)
+    return [entry.path for entry in known + unknown]
+
+
+class RtfTracker:
+    """Observed real-time factor (engine seconds per audio second) per model, persisted in the queue store."""
+
+    def __init__(self, queue_store=None):
+        self.queue_store = queue_store
+        self.lock = threading.Lock()
+        self.totals = queue_store.model_stats() if queue_store else {} # model -> [audio_seconds, engine_seconds]
+
+    def observe(self, model, audio_seconds, engine_seconds):
+        if not audio_seconds or audio_seconds <= 0:
+            return
+        with self.lock:
+            totals = self.totals.setdefault(model, [0.0, 0.0])
+            totals[0] += audio_seconds
+            totals[1] += engine_seconds
+        if self.queue_store:
+            self.queue_store.add_model_stats(model, audio_seconds, engine_seconds)
+
+    def rtf(self, model):
+        with self.lock:
+            audio_seconds, engine_seconds = self.totals.get(model, (0.0, 0.0))
+        if audio_seconds >= MIN_OBSERVED_AUDIO:
+            return engine_seconds / audio_seconds
+        return DEFAULT_RTF.get(model, 0.5)
+
+    def estimate(self, model, duration):
+        """Returns the expected engine time for a file of the given duration, or None if unknown."""
+        return None if duration is None else duration * self.rtf(model)
+
+
+class DurationProber:
+    """Probes media durations with ffprobe in the background and reports them in batches.
+
+    on_batch receives lists of (path, duration) from the prober thread;
+    duration is None when ffprobe can't read the file.
+    """
+
+    def __init__(self, paths, on_batch, cancel_event=None):
+        self.paths = list(paths)
+        self.on_batch = on_batch
+        self.cancel_event = cancel_event or threading.Event()
+        self.thread = None
+
+    def start(self):
+        if not self.paths or not ffmpeg_available():
+            return False
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+        return True
+
+    def run(self):
+        batch = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=PROBE_THREADS) as executor:
+            for path, duration in zip(self.paths, executor.map(probe_duration, self.paths)):
+                if self.cancel_event.is_set():
+                    executor.shutdown(cancel_futures=True)
+                    break
+                batch.append((path, duration))
+                if len(batch) >= PROBE_BATCH_SIZE:
+                    self.on_batch(batch)
+                    batch = []
+        if batch:
+            self.on_batch(batch)
@@ -0,0 +1,245 @@
+"""Full-text search over finished transcripts.
+
+Every transcript is stored segment by segment in a SQLite FTS5 index, with
+its time offsets and the source media path, so a search returns ranked
+segments that say where in which recording a term was said.
+
+Usage:
+    python vt_search.py query "budget review" [--limit 20]
+    python vt_search.py backfill --destination OUT [--queue-db queue.db]
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+from vt_writers import iter_segments
+from vt_schedule import format_duration
+from vt_pipeline import output_paths
+
+# Constants
+SEARCH_INDEX_FILE = 'transcript_index.db'
+DEFAULT_SEARCH_LIMIT = 50 # Hits returned per query
+SNIPPET_TOKENS = 12 # Words of context around a hit
+BACKFILL_COMMIT_DOCUMENTS = 200 # Transcripts indexed per transaction during a backfill
+RANKED_CANDIDATES = 2000 # Most recent matching segments ranked for terms said in nearly every recording
+
+
+def fts_query(text):
+    """Quotes each word of a plain search, so punctuation isn't read as FTS5 syntax."""
+    words = text.split()
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+class TranscriptIndex:
+    """SQLite FTS5 index of transcript segments.
+
+    Segments live in a plain table with an index on their document, and the
+    FTS5 table uses it as external content, so replacing the transcript of a
+    re-processed file only touches that file's rows. A document remembers the
+    size and mtime of the transcript it was built from, so backfills skip
+    transcripts that haven't changed.
+    """
+
+    def __init__(self, db_path=SEARCH_INDEX_FILE):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                media_path TEXT UNIQUE NOT NULL,
+                transcript_path TEXT NOT NULL,
+                transcript_size INTEGER,
+                transcript_mtime REAL,
+                indexed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                document_id INTEGER NOT NULL,
+                start REAL,
+                end REAL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS segments_document ON segments (document_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN
+                INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN
+                INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        """)
+        self.conn.commit()
+
+    def count(self):
+        """Returns (documents, segments) in the index."""
+        with self.lock:
+            documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            segments = self.conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return documents, segments
+
+    def add_transcript(self, media_path, transcript_path, commit=True):
+        """(Re)indexes the engine transcript of media_path. Returns False if it was already up to date."""
+        stat = os.stat(transcript_path)
+        with self.lock:
+            row = self.conn.execute("SELECT id, transcript_path, transcript_size, transcript_mtime FROM documents "
+                                    "WHERE media_path = ?", (media_path,)).fetchone()
+            if row and row[1:] == (transcript_path, stat.st_size, stat.st_mtime):
+                return False
+            segments = list(iter_segments(transcript_path))
+            if row:
+                document_id = row[0]
+                self.conn.execute("DELETE FROM segments WHERE document_id = ?", (document_id,))
+                self.conn.execute("UPDATE documents SET transcript_path = ?, transcript_size = ?, "
+                                  "transcript_mtime = ?, indexed_at = ? WHERE id = ?",
+                                  (transcript_path, stat.st_size, stat.st_mtime, time.time(), document_id))
+            else:
+                document_id = self.conn.execute(
+                    "INSERT INTO documents (media_path, transcript_path, transcript_size, transcript_mtime, "
+                    "indexed_at) VALUES (?, ?, ?, ?, ?)",
+                    (media_path, transcript_path, stat.st_size, stat.st_mtime, time.time())).lastrowid
+            self.conn.executemany("INSERT INTO segments (document_id, start, end, text) VALUES (?, ?, ?, ?)",
+                                  ((document_id, start, end, text) for start, end, text in segments))
+            if commit:
+                self.conn.commit()
+        return True
+
+    def remove(self, media_path):
+        with self.lock:
+            row = self.conn.execute("SELECT id FROM documents WHERE media_path = ?", (media_path,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM segments WHERE document_id = ?", (row[0],))
+                self.conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+                self.conn.commit()
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+    def backfill(self, transcripts, cancel_event=None, log=None):
+        """Indexes (media_path, transcript_path) pairs whose transcript is new or changed.
+
+        Missing transcripts are skipped. Returns (indexed, unchanged, missing).
+        """
+        indexed = unchanged = missing = 0
+        for media_path, transcript_path in transcripts:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            try:
+                if self.add_transcript(media_path, transcript_path, commit=False):
+                    indexed += 1
+                    if indexed % BACKFILL_COMMIT_DOCUMENTS == 0:
+                        self.commit()
+                        if log:
+                            log(f"[INFO] Search index: {indexed} transcripts indexed so far...", "blue")
+                else:
+                    unchanged += 1
+            except (OSError, UnicodeDecodeError):
+                missing += 1
+        self.commit()
+        return indexed, unchanged, missing
+
+    def search(self, text, limit=DEFAULT_SEARCH_LIMIT):
+        """Returns up to limit hits, best first, as dicts with media_path, start, end, snippet and score.
+
+        text is an FTS5 query (e.g. 'NEAR(budget review)', '"exact phrase"',
+        'transcri*'); input that isn't valid FTS5 syntax is searched as plain words.
+        bm25 has to score every match before it can sort, so a term that occurs
+        in more than RANKED_CANDIDATES segments is only ranked among its most
+        recent matches, which keeps such queries in the milliseconds too.
+        """
+        if not text.strip():
+            return []
+        with self.lock:
+            try:
+                rows = self.ranked_matches(text, limit)
+            except sqlite3.OperationalError:
+                rows = self.ranked_matches(fts_query(text), limit)
+            if not rows:
+                return []
+            placeholders = ",".join("?" * len(rows))
+            sources = {segment_id: (media_path, start, end) for segment_id, media_path, start, end in self.conn.execute(
+                "SELECT s.id, d.media_path, s.start, s.end FROM segments s JOIN documents d ON d.id = s.document_id "
+                f"WHERE s.id IN ({placeholders})", [row[0] for row in rows])}
+        hits = []
+        for segment_id, snippet, score in rows:
+            media_path, start, end = sources[segment_id]
+            hits.append({'media_path': media_path, 'start': start, 'end': end, 'snippet': snippet, 'score': -score})
+        return hits
+
+    def ranked_matches(self, query, limit):
+        """Returns (segment id, snippet, bm25) rows of the best matches. Expects self.lock to be held."""
+        boundary = self.conn.execute("SELECT rowid FROM segments_fts WHERE segments_fts MATCH ? "
+                                     "ORDER BY rowid DESC LIMIT 1 OFFSET ?", (query, RANKED_CANDIDATES)).fetchone()
+        return self.conn.execute(
+            f"SELECT rowid, snippet(segments_fts, 0, '[', ']', '...', {SNIPPET_TOKENS}), bm25(segments_fts) "
+            "FROM segments_fts WHERE segments_fts MATCH ? AND rowid > ? ORDER BY rank LIMIT ?",
+            (query, boundary[0] if boundary else 0, limit)).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def transcript_paths(files, destination_folder):
+    """Yields (media_path, engine transcript path) for (media_path, filename) pairs, for a backfill."""
+    for media_path, filename in files:
+        txt_output_path, _ = output_paths(media_path, filename, destination_folder, ())
+        legacy_path = os.path.join(destination_folder, f"{os.path.splitext(filename)[0]}.txt")
+        if not os.path.exists(txt_output_path) and os.path.exists(legacy_path):
+            txt_output_path = legacy_path # Written by versions that named the TXT after the file name only
+        yield media_path, txt_output_path
+
+
+def format_hit(hit):
+    offset = format_duration(hit['start']) if hit['start'] is not None else "-"
+    return f"{offset:>9}  {hit['media_path']}\n           {hit['snippet']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search finished transcripts, or index existing ones.")
+    parser.add_argument("--index", default=SEARCH_INDEX_FILE, help="search index file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query_parser = commands.add_parser("query", help="print ranked hits with their time offset")
+    query_parser.add_argument("text", nargs="+", help="words or an FTS5 query")
+    query_parser.add_argument("--limit", type=int, default=DEFAULT_SEARCH_LIMIT)
+    backfill_parser = commands.add_parser("backfill", help="index transcripts of files already processed")
+    backfill_parser.add_argument("--destination", required=True, help="destination folder of the transcripts")
+    backfill_parser.add_argument("--queue-db", default=None, help="queue store listing the files (default: queue.db)")
+    args = parser.parse_args(argv)
+
+    index = TranscriptIndex(args.index)
+    try:
+        if args.command == "query":
+            started = time.perf_counter()
+            hits = index.search(" ".join(args.text), args.limit)
+            elapsed = time.perf_counter() - started
+            for hit in hits:
+                print(format_hit(hit))
+            documents, _ = index.count()
+            sys.stderr.write(f"{len(hits)} hits in {elapsed * 1000:.1f} ms ({documents} transcripts indexed)\n")
+            return 0 if hits else 1
+        from vt_queue_store import QueueStore, QUEUE_DB_FILE
+        store = QueueStore(args.queue_db or QUEUE_DB_FILE)
+        try:
+            files = [(item['path'], item['filename']) for batch in store.iter_batches() for item in batch
+                     if item['processed'] == "Yes"]
+        finally:
+            store.close()
+        started = time.perf_counter()
+        indexed, unchanged, missing = index.backfill(transcript_paths(files, args.destination))
+        print(f"Indexed {indexed} transcripts ({unchanged} unchanged, {missing} missing) "
+              f"in {time.perf_counter() - started:.1f} s.")
+        return 0
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""No-speech pre-filter.
+
+Decodes a few short stretches spread over a file's audio track and measures
+how much of them sounds like speech, so silent B-roll, screen recordings
+without narration and music-only files can be skipped without starting the
+engine. Files without an audio stream are found with ffprobe alone.
+
+Usage (prints the measurements, e.g. to pick a threshold):
+    python vt_speech.py FILE [FILE ...] [--threshold 2]
+"""
+import sys
+import math
+import time
+import array
+import argparse
+import subprocess
+from vt_engine import CREATION_FLAGS
+from vt_chunking import FFMPEG_EXE, FFPROBE_EXE, ffmpeg_available, probe_duration
+
+# Constants
+DEFAULT_SPEECH_THRESHOLD = 0.0 # Percent of the sampled audio that must sound like speech; off unless chosen
+SUGGESTED_SPEECH_THRESHOLD = 2.0 # A starting point for users who turn the check on
+SAMPLE_WINDOWS = 8 # Stretches decoded per file
+SAMPLE_WINDOW_SECONDS = 4.0
+SAMPLE_RATE = 8000 # Hz; covers the voice band
+FRAME_SAMPLES = 160 # 20 ms frames
+MIN_SPEECH_DBFS = -45.0 # Quieter frames count as silence
+NOISE_MARGIN_DB = 9.0 # Voiced frames stand this far above the window's noise floor
+DIP_DB = 15.0 # Speech keeps dropping this far below its loud frames between syllables and words...
+MIN_DIP_FRACTION = 0.1 # ...in at least this share of a window; steady sound (music, hum) rarely does
+
+
+class SpeechCheck:
+    """Outcome of the pre-filter for one file. speech_percent is None when nothing could be decoded."""
+
+    def __init__(self, has_audio=True, speech_percent=None, sampled_seconds=0.0, elapsed=0.0):
+        self.has_audio = has_audio
+        self.speech_percent = speech_percent
+        self.sampled_seconds = sampled_seconds
+        self.elapsed = elapsed
+
+    def no_speech(self, threshold):
+        """True if the file can be skipped at this threshold."""
+        if not self.has_audio:
+            return True
+        return self.speech_percent is not None and self.speech_percent < threshold
+
+    def describe(self):
+        if not self.has_audio:
+            return "no audio stream"
+        if self.speech_percent is None:
+            return "audio could not be decoded"
+        return f"speech in {self.speech_percent:.1f}% of {self.sampled_seconds:.0f} s sampled"
+
+
+def has_audio_stream(media_path):
+    """Returns True/False, or None if ffprobe can't read the file."""
+    try:
+        completed = subprocess.run(
+            [FFPROBE_EXE, "-v", "error", "-select_streams", "a", "-show_entries", "stream=codec_type",
+             "-of", "csv=p=0", media_path],
+            capture_output=True, text=True, creationflags=CREATION_FLAGS)
+    except OSError:
+        return None
+    if completed.returncode != 0:
+        return None
+    return bool(completed.stdout.strip())
+
+
+def sample_windows(duration, windows=SAMPLE_WINDOWS, window_seconds=SAMPLE_WINDOW_SECONDS):
+    """Returns (start, length) stretches spread evenly over duration; short files are read whole."""
+    if duration is None or duration <= windows * window_seconds:
+        return [(0.0, duration)]
+    step = duration / windows
+    return [(step * index + (step - window_seconds) / 2, window_seconds) for index in range(windows)]
+
+
+def decode_window(media_path, start, length):
+    """Returns 16-bit mono samples of a stretch of the audio track."""
+    command = [FFMPEG_EXE, "-hide_banner", "-loglevel", "error", "-ss", f"{start:.3f}"]
+    if length is not None:
+        command += ["-t", f"{length:.3f}"]
+    command += ["-i", media_path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-"]
+    completed = subprocess.run(command, capture_output=True, creationflags=CREATION_FLAGS)
+    if completed.returncode != 0:
+        raise subprocess.CalledProcessError(completed.returncode, FFMPEG_EXE, stderr=completed.stderr)
+    samples = array.array('h')
+    data = completed.stdout
+    samples.frombytes(data[:len(data) - len(data) % samples.itemsize])
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples
+
+
+def frame_levels(samples):
+    """Returns the level of each 20 ms frame in dBFS."""
+    levels = []
+    for offset in range(0, len(samples) - FRAME_SAMPLES + 1, FRAME_SAMPLES):
+        frame = samples[offset:offset + FRAME_SAMPLES]
+        energy = sum(sample * sample for sample in frame) / (FRAME_SAMPLES * 32768.0 * 32768.0)
+        levels.append(10 * math.log10(energy + 1e-12))
+    return levels
+
+
+def speech_frames(levels):
+    """Returns how many frames of a window sound like speech.
+
+    A frame is voiced when it is loud enough and above the window's noise
+    floor. Voiced frames only count if the window also has the dips between
+    syllables and words that speech has and steady music or hum doesn't.
+    """
+    if not levels:
+        return 0
+    ordered = sorted(levels)
+    noise_floor = ordered[len(ordered) // 10]
+    loud = ordered[len(ordered) * 9 // 10]
+    voiced = sum(1 for level in levels if level > max(MIN_SPEECH_DBFS, noise_floor + NOISE_MARGIN_DB))
+    dips = sum(1 for level in levels if level < loud - DIP_DB)
+    return voiced if dips >= MIN_DIP_FRACTION * len(levels) else 0
+
+
+def check_speech(media_path, duration=None):
+    """Runs the pre-filter on a file. Returns a SpeechCheck."""
+    started = time.time()
+    has_audio = has_audio_stream(media_path)
+    if has_audio is False:
+        return SpeechCheck(False, elapsed=time.time() - started)
+    if duration is None:
+        duration = probe_duration(media_path)
+    frames = voiced = 0
+    for start, length in sample_windows(duration):
+        try:
+            levels = frame_levels(decode_window(media_path, start, length))
+        except (OSError, subprocess.CalledProcessError):
+            continue
+        frames += len(levels)
+        voiced += speech_frames(levels)
+    if not frames:
+        return SpeechCheck(elapsed=time.time() - started) # Not decodable; the engine reports it
+    return SpeechCheck(True, 100.0 * voiced / frames, frames * FRAME_SAMPLES / SAMPLE_RATE, time.time() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how much of each file sounds like speech.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--threshold", type=float, default=SUGGESTED_SPEECH_THRESHOLD,
+                        help="percent of speech below which a file is skipped (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if not ffmpeg_available():
+        sys.stderr.write("ffmpeg and ffprobe are needed in the PATH.\n")
+        return 2
+    for media_path in args.files:
+        check = check_speech(media_path)
+        decision = "skip" if check.no_speech(args.threshold) else "transcribe"
+        print(f"{decision:<10}  {check.describe()} ({check.elapsed:.2f} s)  {media_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
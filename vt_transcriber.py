@@ -1,21 +1,43 @@
+import time
+STARTUP_STARTED = time.perf_counter() # Taken before the other imports so the logged startup time includes them
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import os
 import json
+import shutil
+import tempfile
 import subprocess
 import threading
-from datetime import datetime
-from fpdf import FPDF
+import multiprocessing
+import importlib.util
 import sys
-import time
-import re # Import the regular expression module
+from vt_cache import TranscriptCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MB
+from vt_pipeline import TranscriptionPipeline, SUPPORTED_EXTENSIONS, MODEL_OPTIONS, DEFAULT_MODEL
+from vt_engine import ENGINE_MODES, ENGINE_MODE_SUBPROCESS, ENGINE_MODE_REMOTE, probe_engine
+from vt_chunking import DEFAULT_CHUNK_MINUTES, DEFAULT_CHUNK_OVERLAP
+from vt_prefetch import DEFAULT_PREFETCH_FILES, DEFAULT_SCRATCH_MB
+from vt_writers import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMATS, FORMAT_LABELS
+from vt_schedule import SCHEDULE_POLICIES, SCHEDULE_BOTTOM_UP, RtfTracker, DurationProber, format_duration
+from vt_scanner import FolderScanner
+from vt_watch import FolderWatcher
+from vt_speech import DEFAULT_SPEECH_THRESHOLD
+from vt_cascade import CASCADE_OFF, CASCADE_DRAFT_MODELS, DEFAULT_MIN_LOGPROB
+from vt_queue_store import QueueStore
+from vt_calibrate import EngineProfile
+from vt_metrics import MetricsCollector
+from vt_log import ConsoleLog, LOG_LEVELS
+from vt_queue import QueueModel, STATUS_FILTERS
 
 # Constants
 SETTINGS_FILE = 'settings.json'
-SUPPORTED_EXTENSIONS = (
-    '.mp4', '.avi', '.mkv', '.mov', '.flv', '.wmv', '.webm', # Video
-    '.mp3', '.wav', '.aac', '.flac', '.ogg' # Audio
-)
+CONSOLE_MAX_LINES = 2000 # Lines kept in the console widget; the full log is in vt_transcriber.log
+CONSOLE_REFRESH_MS = 100 # How often queued log messages are drawn
+CONSOLE_BATCH_SIZE = 500 # Maximum messages drawn per refresh
+QUEUE_HEADINGS = {"Processed": "Processed", "Duration": "Duration", "ETA": "ETA", "Path": "File Path",
+                  "Filename": "Filename"}
+QUEUE_WHEEL_ROWS = 3 # Rows scrolled per mouse wheel step
+ETA_REFRESH_MS = 1000 # How often the run ETA is recomputed while transcribing
+
 
 class VideoTranscriberApp:
     def __init__(self, root):
@@ -24,17 +46,68 @@ class VideoTranscriberApp:
         self.root.geometry("1000x700") # Set initial window size
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing) # Handle window close event
 
-        self.model_options = ["tiny", "small", "medium", "large", "turbo"]
-        self.default_model = "turbo"
+        self.model_options = list(MODEL_OPTIONS)
+        self.default_model = DEFAULT_MODEL
         self.current_destination_folder = self.get_downloads_folder()
 
+        self.max_workers = os.cpu_count() or 1
+        self.console_log = ConsoleLog()
+        self.cache_max_mb = DEFAULT_CACHE_MB
+        self.prefetch_files = DEFAULT_PREFETCH_FILES
+        self.scratch_max_mb = DEFAULT_SCRATCH_MB
+        self.transcript_cache = None
+        self.engine_server_command = None # Override for the warm model server, e.g. a stand-in script
+        self.pdf_font = None # Override for the Unicode TrueType font used in PDFs
+        self.coordinator = None # Serves the queue to vt_worker.py processes in the "Remote workers" engine mode
+        # vt_coordinator (and its HTTP server) is only imported for a remote run; None means its default
+        self.coordinator_address = None
+        self.coordinator_token = None
+        self.coordinator_slots = None
+
+        self.whisper_exe_found = None # Unknown until the background engine probe reports
+        self.queue_load_started = None
+        self.engine_profile = EngineProfile() # Calibrated compute type and threads per model on this host
+        self.calibration_thread = None
+        self.queue_store = QueueStore()
+        self.rtf_tracker = RtfTracker(self.queue_store) # Observed engine speed per model, for ETAs
+        self.metrics = MetricsCollector(self.queue_store) # Per-file stage timings
+        self.metrics_textfile = None # Prometheus file rewritten after every run, e.g. for the node exporter
+        self.search_index = None # Full-text index of finished transcripts, opened once the queue has loaded
+        self.speech_overrides = set() # Paths transcribed even if the no-speech check would skip them
+        self.cascade_min_logprob = DEFAULT_MIN_LOGPROB # Draft segments below this are redone by the selected model
+        self.probe_cancel_flag = threading.Event()
+        self.pipeline = None
+        self.queue_loading = False
+        self.queue_model = QueueModel() # Source of truth for the queue; the Treeview only shows a window of it
+        self.view_entries = [] # Filtered/sorted entries the Treeview window is cut from
+        self.view_key = None
+        self.view_offset = 0
+        self.visible_paths = [] # Paths shown in the Treeview rows, top to bottom
+        self.selected_paths = set()
+        self.sort_column = None
+        self.sort_descending = False
+        self.refresh_pending = False
+        self.scanner = None
+        self.scan_thread = None
+        self.scan_cancel_flag = threading.Event()
+        self.watcher = None # Started once settings are loaded, if any folders are watched
+        self.watch_folders = [] # Saved in settings.json; watched once the queue has loaded
+        self.watch_backlog = False # Watched files arrived during a run and wait for the next one
+        self.user_stopped = False # Auto-start never overrides the Stop button
+
         self.transcription_thread = None
         self.stop_flag = threading.Event()
         self.pause_flag = threading.Event()
 
         self.setup_ui()
+        self.flush_console()
         self.load_settings()
         self.check_whisper_exe()
+        self.root.after_idle(self.log_startup_time)
+
+    def log_startup_time(self):
+        """Logs how long it took until the window was ready, so startup regressions show up in the log."""
+        self.update_console(f"[INFO] Window ready {time.perf_counter() - STARTUP_STARTED:.2f} s after launch.")
 
     def setup_ui(self):
         # --- Top Frame (Settings) ---
@@ -49,7 +122,11 @@ class VideoTranscriberApp:
         self.model_var.set(self.default_model)
         self.model_dropdown = ttk.Combobox(model_frame, textvariable=self.model_var,
                                            values=self.model_options, state="readonly", width=15)
-        self.model_dropdown.pack(side=tk.LEFT, expand=True, fill=tk.X)
+        self.model_dropdown.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 15))
+        ttk.Label(model_frame, text="Draft Model:").pack(side=tk.LEFT, padx=(0, 5))
+        self.draft_model_var = tk.StringVar(self.root, value=CASCADE_OFF)
+        ttk.Combobox(model_frame, textvariable=self.draft_model_var, values=(CASCADE_OFF,) + CASCADE_DRAFT_MODELS,
+                     state="readonly", width=8).pack(side=tk.LEFT)
 
         # Destination Folder
         dest_frame = ttk.Frame(top_frame)
@@ -60,24 +137,88 @@ class VideoTranscriberApp:
         self.update_dest_folder_entry() # Set initial value
         ttk.Button(dest_frame, text="Select", command=self.select_destination_folder).pack(side=tk.LEFT)
 
+        # Worker Pool
+        workers_frame = ttk.Frame(top_frame)
+        workers_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(workers_frame, text="Parallel Workers:").pack(side=tk.LEFT, padx=(0, 5))
+        self.workers_var = tk.IntVar(self.root, value=1)
+        ttk.Spinbox(workers_frame, from_=1, to=self.max_workers, textvariable=self.workers_var,
+                    width=5).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(workers_frame, text="Threads per Worker (0 = auto):").pack(side=tk.LEFT, padx=(0, 5))
+        self.threads_var = tk.IntVar(self.root, value=0)
+        ttk.Spinbox(workers_frame, from_=0, to=self.max_workers, textvariable=self.threads_var,
+                    width=5).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(workers_frame, text="Engine Mode:").pack(side=tk.LEFT, padx=(0, 5))
+        self.engine_mode_var = tk.StringVar(self.root, value=ENGINE_MODE_SUBPROCESS)
+        engine_mode_combobox = ttk.Combobox(workers_frame, textvariable=self.engine_mode_var, values=ENGINE_MODES,
+                                            state="readonly", width=20)
+        engine_mode_combobox.pack(side=tk.LEFT)
+        engine_mode_combobox.bind("<<ComboboxSelected>>", lambda event: self.update_start_button())
+
+        # Calibrated engine profile of the selected model
+        profile_frame = ttk.Frame(top_frame)
+        profile_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(profile_frame, text="Engine Profile:").pack(side=tk.LEFT, padx=(0, 5))
+        self.profile_var = tk.StringVar(self.root)
+        ttk.Label(profile_frame, textvariable=self.profile_var).pack(side=tk.LEFT, padx=(0, 15))
+        self.calibrate_button = ttk.Button(profile_frame, text="Calibrate...", command=self.start_calibration)
+        self.calibrate_button.pack(side=tk.LEFT)
+        self.model_var.trace_add("write", lambda *args: self.update_profile_label())
+        self.update_profile_label()
+
+        # Chunking of long files
+        chunk_frame = ttk.Frame(top_frame)
+        chunk_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(chunk_frame, text="Split Files Longer Than (min, 0 = off):").pack(side=tk.LEFT, padx=(0, 5))
+        self.chunk_minutes_var = tk.IntVar(self.root, value=DEFAULT_CHUNK_MINUTES)
+        ttk.Spinbox(chunk_frame, from_=0, to=240, increment=5, textvariable=self.chunk_minutes_var,
+                    width=5).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(chunk_frame, text="Chunk Overlap (s):").pack(side=tk.LEFT, padx=(0, 5))
+        self.chunk_overlap_var = tk.IntVar(self.root, value=DEFAULT_CHUNK_OVERLAP)
+        ttk.Spinbox(chunk_frame, from_=0, to=30, textvariable=self.chunk_overlap_var,
+                    width=5).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(chunk_frame, text="Skip Files With Speech Below (%, 0 = off):").pack(side=tk.LEFT, padx=(0, 5))
+        self.speech_threshold_var = tk.DoubleVar(self.root, value=DEFAULT_SPEECH_THRESHOLD)
+        ttk.Spinbox(chunk_frame, from_=0, to=50, increment=0.5, textvariable=self.speech_threshold_var,
+                    width=5).pack(side=tk.LEFT)
+
+        # Output Formats
+        formats_frame = ttk.Frame(top_frame)
+        formats_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(formats_frame, text="Output Formats:").pack(side=tk.LEFT, padx=(0, 5))
+        self.format_vars = {}
+        for output_format in OUTPUT_FORMATS:
+            self.format_vars[output_format] = tk.BooleanVar(self.root, value=output_format in DEFAULT_OUTPUT_FORMATS)
+            ttk.Checkbutton(formats_frame, text=FORMAT_LABELS[output_format],
+                            variable=self.format_vars[output_format]).pack(side=tk.LEFT, padx=(0, 10))
+
         # --- Middle Frame (File List and Controls) ---
         middle_frame = ttk.LabelFrame(self.root, text="Transcription Queue", padding="10")
         middle_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
 
-        # Treeview (File List)
-        self.tree = ttk.Treeview(middle_frame, columns=("Processed", "Path", "Filename"), show="headings")
-        self.tree.heading("Processed", text="Processed", anchor=tk.W)
-        self.tree.heading("Path", text="File Path", anchor=tk.W)
-        self.tree.heading("Filename", text="Filename", anchor=tk.W)
+        # Treeview (File List). Only the visible rows exist as Treeview items; they are
+        # refilled from the queue model whenever the view scrolls or the queue changes.
+        self.tree = ttk.Treeview(middle_frame, columns=tuple(QUEUE_HEADINGS), show="headings")
+        for column, heading in QUEUE_HEADINGS.items():
+            self.tree.heading(column, text=heading, anchor=tk.W,
+                              command=lambda c=column: self.sort_queue_view(c))
 
         # Adjust column widths
-        self.tree.column("Processed", width=80, minwidth=60, stretch=tk.NO)
+        self.tree.column("Processed", width=110, minwidth=60, stretch=tk.NO)
+        self.tree.column("Duration", width=70, minwidth=50, stretch=tk.NO)
+        self.tree.column("ETA", width=70, minwidth=50, stretch=tk.NO)
         self.tree.column("Path", width=400, minwidth=200)
         self.tree.column("Filename", width=250, minwidth=150)
 
-        self.tree_scroll_y = ttk.Scrollbar(middle_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree_scroll_y = ttk.Scrollbar(middle_frame, orient=tk.VERTICAL, command=self.scroll_queue_view)
         self.tree_scroll_x = ttk.Scrollbar(middle_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=self.tree_scroll_y.set, xscrollcommand=self.tree_scroll_x.set)
+        self.tree.configure(xscrollcommand=self.tree_scroll_x.set)
+        self.tree.bind("<Configure>", lambda event: self.schedule_queue_refresh())
+        self.tree.bind("<Button-1>", self.on_queue_click, add="+")
+        self.tree.bind("<<TreeviewSelect>>", self.on_queue_select)
+        self.tree.bind("<MouseWheel>", self.on_queue_mousewheel)
+        self.tree.bind("<Button-4>", self.on_queue_mousewheel)
+        self.tree.bind("<Button-5>", self.on_queue_mousewheel)
 
         self.tree.grid(row=0, column=0, sticky="nsew")
         self.tree_scroll_y.grid(row=0, column=1, sticky="ns")
@@ -90,9 +231,20 @@ class VideoTranscriberApp:
         file_buttons_frame = ttk.Frame(middle_frame)
         file_buttons_frame.grid(row=2, column=0, columnspan=2, pady=5, sticky="ew")
         ttk.Button(file_buttons_frame, text="Find Files", command=self.find_source_folder).pack(side=tk.LEFT, padx=5)
+        self.cancel_scan_button = ttk.Button(file_buttons_frame, text="Cancel Scan", command=self.cancel_scan, state=tk.DISABLED)
+        self.cancel_scan_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(file_buttons_frame, text="Move Up", command=lambda: self.move_item("up")).pack(side=tk.LEFT, padx=5)
         ttk.Button(file_buttons_frame, text="Move Down", command=lambda: self.move_item("down")).pack(side=tk.LEFT, padx=5)
         ttk.Button(file_buttons_frame, text="Remove Selected", command=self.remove_selected_files).pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_buttons_frame, text="Transcribe Anyway", command=self.override_speech_check).pack(side=tk.LEFT, padx=5)
+        self.scan_status_var = tk.StringVar(self.root)
+        ttk.Label(file_buttons_frame, textvariable=self.scan_status_var).pack(side=tk.LEFT, padx=5)
+        self.status_filter_var = tk.StringVar(self.root, value="All")
+        status_filter = ttk.Combobox(file_buttons_frame, textvariable=self.status_filter_var,
+                                     values=STATUS_FILTERS, state="readonly", width=12)
+        status_filter.pack(side=tk.RIGHT, padx=5)
+        status_filter.bind("<<ComboboxSelected>>", lambda event: self.reset_queue_view())
+        ttk.Label(file_buttons_frame, text="Show:").pack(side=tk.RIGHT)
 
         # Transcription Control Buttons
         control_buttons_frame = ttk.Frame(middle_frame)
@@ -105,12 +257,53 @@ class VideoTranscriberApp:
         self.pause_button.pack(side=tk.LEFT, padx=5)
         self.resume_button = ttk.Button(control_buttons_frame, text="Resume", command=self.resume_transcription, state=tk.DISABLED)
         self.resume_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_buttons_frame, text="Stats", command=self.show_stats).pack(side=tk.LEFT, padx=5)
+        ttk.Label(control_buttons_frame, text="Order:").pack(side=tk.LEFT, padx=(15, 5))
+        self.schedule_var = tk.StringVar(self.root, value=SCHEDULE_BOTTOM_UP)
+        ttk.Combobox(control_buttons_frame, textvariable=self.schedule_var, values=SCHEDULE_POLICIES,
+                     state="readonly", width=22).pack(side=tk.LEFT)
+        self.eta_var = tk.StringVar(self.root)
+        ttk.Label(control_buttons_frame, textvariable=self.eta_var).pack(side=tk.LEFT, padx=10)
+
+        # Watch Folders
+        watch_frame = ttk.Frame(middle_frame)
+        watch_frame.grid(row=4, column=0, columnspan=2, pady=5, sticky="ew")
+        ttk.Label(watch_frame, text="Watched:").pack(side=tk.LEFT, padx=5)
+        self.watch_folder_var = tk.StringVar(self.root)
+        self.watch_combobox = ttk.Combobox(watch_frame, textvariable=self.watch_folder_var, state="readonly", width=50)
+        self.watch_combobox.pack(side=tk.LEFT, padx=5)
+        ttk.Button(watch_frame, text="Watch Folder", command=self.add_watch_folder).pack(side=tk.LEFT, padx=5)
+        ttk.Button(watch_frame, text="Unwatch", command=self.remove_watch_folder).pack(side=tk.LEFT, padx=5)
+        self.watch_auto_start_var = tk.BooleanVar(self.root, value=False)
+        ttk.Checkbutton(watch_frame, text="Auto-start when idle",
+                        variable=self.watch_auto_start_var).pack(side=tk.LEFT, padx=5)
+
+        # Transcript Search
+        search_frame = ttk.Frame(middle_frame)
+        search_frame.grid(row=5, column=0, columnspan=2, pady=5, sticky="ew")
+        ttk.Label(search_frame, text="Search Transcripts:").pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar(self.root)
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=50)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<Return>", lambda event: self.search_transcripts())
+        ttk.Button(search_frame, text="Search", command=self.search_transcripts).pack(side=tk.LEFT, padx=5)
 
 
         # --- Bottom Frame (Console) ---
         bottom_frame = ttk.LabelFrame(self.root, text="Console Output", padding="10")
         bottom_frame.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True, padx=10, pady=5)
 
+        # Level filter
+        filter_frame = ttk.Frame(bottom_frame)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="Show:").pack(side=tk.LEFT, padx=(0, 5))
+        self.level_filter_vars = {}
+        for level in LOG_LEVELS:
+            level_var = tk.BooleanVar(self.root, value=True)
+            ttk.Checkbutton(filter_frame, text=level.title(), variable=level_var,
+                            command=self.apply_console_filter).pack(side=tk.LEFT, padx=2)
+            self.level_filter_vars[level] = level_var
+
         self.console_text = tk.Text(bottom_frame, wrap=tk.WORD, state="disabled", height=10, bg="#f0f0f0")
         self.console_text.pack(fill=tk.BOTH, expand=True)
 
@@ -118,6 +311,11 @@ class VideoTranscriberApp:
         self.console_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         self.console_text.config(yscrollcommand=self.console_scroll.set)
 
+        self.console_text.tag_config("red", foreground="red")
+        self.console_text.tag_config("green", foreground="green")
+        self.console_text.tag_config("blue", foreground="blue")
+        self.console_text.tag_config("orange", foreground="orange")
+
     def update_dest_folder_entry(self):
         self.dest_folder_entry.config(state="normal")
         self.dest_folder_entry.delete(0, tk.END)
@@ -125,18 +323,37 @@ class VideoTranscriberApp:
         self.dest_folder_entry.config(state="readonly")
 
     def check_whisper_exe(self):
-        """Checks if faster-whisper-xxl.exe is available in the system's PATH."""
-        try:
-            subprocess.run(["faster-whisper-xxl.exe", "--version"], check=True,
-                           capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            self.update_console("[INFO] 'faster-whisper-xxl.exe' found in PATH.", "green")
-            self.whisper_exe_found = True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        """Checks in the background if faster-whisper-xxl.exe is available in the system's PATH."""
+        def probe():
+            started = time.perf_counter()
+            try:
+                found, version, cached = probe_engine()
+            except Exception as e:
+                self.update_console(f"[WARNING] Engine check failed: {e}", "orange")
+                found, version, cached = False, None, False
+            self.root.after(0, self.apply_engine_probe, found, version, cached, time.perf_counter() - started)
+
+        probe_thread = threading.Thread(target=probe)
+        probe_thread.daemon = True
+        probe_thread.start()
+
+    def apply_engine_probe(self, found, version, cached, elapsed):
+        self.whisper_exe_found = found
+        if found:
+            self.update_console(f"[INFO] 'faster-whisper-xxl.exe' found in PATH"
+                                f"{f' ({version})' if version else ''}.", "green")
+            self.update_console(f"[DEBUG] Engine check took {elapsed:.2f} s{' (cached)' if cached else ''}.")
+        else:
             self.update_console("[ERROR] 'faster-whisper-xxl.exe' not found in PATH or not executable. "
                                  "Please ensure it's installed and added to your system's PATH.", "red")
-            self.whisper_exe_found = False
-            # Disable start button if executable is not found
-            self.start_button.config(state=tk.DISABLED)
+            self.update_start_button()
+
+    def update_start_button(self):
+        """Disables Start while the local engine is missing, unless remote workers do the transcribing."""
+        if self.transcription_thread and self.transcription_thread.is_alive():
+            return
+        local_engine_missing = self.whisper_exe_found is False and self.engine_mode_var.get() != ENGINE_MODE_REMOTE
+        self.start_button.config(state=tk.DISABLED if local_engine_missing else tk.NORMAL)
 
 
     def get_downloads_folder(self):
@@ -154,21 +371,32 @@ class VideoTranscriberApp:
             return os.path.join(os.path.expanduser("~"), "Downloads")
 
     def update_console(self, message, color="black"):
-        """Appends a message to the console text widget."""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.console_text.config(state="normal")
-        self.console_text.insert(tk.END, f"[{timestamp}] {message}\n", color)
-        self.console_text.see(tk.END) # Scroll to the end
-        self.console_text.config(state="disabled")
-
-        self.console_text.tag_config("red", foreground="red")
-        self.console_text.tag_config("green", foreground="green")
-        self.console_text.tag_config("blue", foreground="blue")
-        self.console_text.tag_config("orange", foreground="orange")
+        """Queues a message for the console. Safe to call from any thread."""
+        self.console_log.log(message, color)
+
+    def flush_console(self):
+        """Draws queued console messages in one batch, then reschedules itself."""
+        records = self.console_log.drain(CONSOLE_BATCH_SIZE)
+        if records:
+            self.console_text.config(state="normal")
+            for timestamp, message, color, level in records:
+                self.console_text.insert(tk.END, f"[{timestamp}] {message}\n", (color, f"level_{level}"))
+            # Keep only the most recent lines in the widget
+            line_count = int(self.console_text.index('end-1c').split('.')[0])
+            if line_count > CONSOLE_MAX_LINES:
+                self.console_text.delete('1.0', f"{line_count - CONSOLE_MAX_LINES + 1}.0")
+            self.console_text.see(tk.END) # Scroll to the end
+            self.console_text.config(state="disabled")
+        self.root.after(CONSOLE_REFRESH_MS, self.flush_console)
+
+    def apply_console_filter(self):
+        """Hides console lines whose level is unchecked."""
+        for level, level_var in self.level_filter_vars.items():
+            self.console_text.tag_config(f"level_{level}", elide=not level_var.get())
 
 
     def load_settings(self):
-        """Loads settings from settings.json."""
+        """Loads settings from settings.json and the queue from the queue store."""
         if os.path.exists(SETTINGS_FILE):
             try:
                 with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
@@ -176,7 +404,36 @@ class VideoTranscriberApp:
                     self.model_var.set(settings.get('model', self.default_model))
                     self.current_destination_folder = settings.get('destination_folder', self.get_downloads_folder())
                     self.update_dest_folder_entry()
-                    self.populate_treeview(settings.get('file_queue', []))
+                    self.workers_var.set(settings.get('workers', 1))
+                    self.threads_var.set(settings.get('threads_per_worker', 0))
+                    self.cache_max_mb = settings.get('transcript_cache_mb', DEFAULT_CACHE_MB)
+                    self.prefetch_files = settings.get('audio_prefetch_files', DEFAULT_PREFETCH_FILES)
+                    self.scratch_max_mb = settings.get('audio_scratch_mb', DEFAULT_SCRATCH_MB)
+                    self.chunk_minutes_var.set(settings.get('chunk_minutes', DEFAULT_CHUNK_MINUTES))
+                    self.chunk_overlap_var.set(settings.get('chunk_overlap_seconds', DEFAULT_CHUNK_OVERLAP))
+                    # Read from a new key: 'speech_threshold' was saved with the check on by default, and the
+                    # check only runs for users who choose a threshold
+                    self.speech_threshold_var.set(settings.get('speech_filter_threshold', DEFAULT_SPEECH_THRESHOLD))
+                    self.speech_overrides = set(settings.get('speech_filter_overrides', []))
+                    if settings.get('cascade_draft_model') in CASCADE_DRAFT_MODELS:
+                        self.draft_model_var.set(settings['cascade_draft_model'])
+                    self.cascade_min_logprob = settings.get('cascade_min_logprob', DEFAULT_MIN_LOGPROB)
+                    if settings.get('engine_mode') in ENGINE_MODES:
+                        self.engine_mode_var.set(settings['engine_mode'])
+                    self.engine_server_command = settings.get('engine_server_command')
+                    self.pdf_font = settings.get('pdf_font')
+                    self.coordinator_address = settings.get('coordinator_address')
+                    self.coordinator_token = settings.get('coordinator_token')
+                    self.coordinator_slots = settings.get('coordinator_slots')
+                    self.metrics_textfile = settings.get('metrics_prometheus_file')
+                    if settings.get('schedule_policy') in SCHEDULE_POLICIES:
+                        self.schedule_var.set(settings['schedule_policy'])
+                    output_formats = settings.get('output_formats', DEFAULT_OUTPUT_FORMATS)
+                    for output_format, format_var in self.format_vars.items():
+                        format_var.set(output_format in output_formats)
+                    self.watch_auto_start_var.set(settings.get('watch_auto_start', False))
+                    self.watch_folders = [os.path.normpath(folder) for folder in settings.get('watch_folders', [])]
+                    self.migrate_settings_queue(settings.get('file_queue'))
                     self.update_console("[INFO] Settings loaded successfully.")
             except json.JSONDecodeError:
                 self.update_console("[WARNING] Could not decode settings.json. Starting with default settings.", "orange")
@@ -184,78 +441,555 @@ class VideoTranscriberApp:
                 self.update_console(f"[ERROR] Error loading settings: {e}", "red")
         else:
             self.update_console("[INFO] settings.json not found. Starting with default settings.")
+        self.populate_treeview()
 
+    def migrate_settings_queue(self, file_queue_data):
+        """Moves a queue saved by older versions in settings.json into the queue store."""
+        if not file_queue_data or self.queue_store.count() > 0:
+            return
+        self.queue_store.replace_all(file_queue_data)
+        self.update_console(f"[INFO] Migrated {len(file_queue_data)} queued files from settings.json to the queue store.")
 
     def save_settings(self):
         """Saves current settings to settings.json."""
         settings = {
             'model': self.model_var.get(),
             'destination_folder': self.current_destination_folder,
-            'file_queue': self.get_current_queue_data()
+            'workers': self.get_worker_count(),
+            'threads_per_worker': self.get_thread_count(),
+            'transcript_cache_mb': self.cache_max_mb,
+            'audio_prefetch_files': self.prefetch_files,
+            'audio_scratch_mb': self.scratch_max_mb,
+            'engine_mode': self.engine_mode_var.get(),
+            'chunk_minutes': self.get_chunk_minutes(),
+            'chunk_overlap_seconds': self.get_chunk_overlap(),
+            'speech_filter_threshold': self.get_speech_threshold(),
+            'speech_filter_overrides': sorted(self.speech_overrides),
+            'cascade_draft_model': self.draft_model_var.get(),
+            'cascade_min_logprob': self.cascade_min_logprob,
+            'output_formats': list(self.get_output_formats()),
+            'schedule_policy': self.schedule_var.get(),
+            'watch_folders': list(self.watch_folders),
+            'watch_auto_start': self.watch_auto_start_var.get(),
         }
+        if self.engine_server_command:
+            settings['engine_server_command'] = self.engine_server_command
+        if self.pdf_font:
+            settings['pdf_font'] = self.pdf_font
+        if self.coordinator_address:
+            settings['coordinator_address'] = self.coordinator_address
+        if self.coordinator_token:
+            settings['coordinator_token'] = self.coordinator_token
+        if self.coordinator_slots is not None:
+            settings['coordinator_slots'] = self.coordinator_slots
+        if self.metrics_textfile:
+            settings['metrics_prometheus_file'] = self.metrics_textfile
         try:
-            with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+            # Write to a temporary file first so a crash never leaves a truncated settings.json
+            temp_file = SETTINGS_FILE + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
                 json.dump(settings, f, indent=4)
+            os.replace(temp_file, SETTINGS_FILE)
             self.update_console("[INFO] Settings saved successfully.")
         except Exception as e:
             self.update_console(f"[ERROR] Error saving settings: {e}", "red")
 
+    def get_worker_count(self):
+        """Returns the configured number of parallel engine processes."""
+        try:
+            return min(max(1, int(self.workers_var.get())), self.max_workers)
+        except (tk.TclError, ValueError):
+            return 1
+
+    def get_thread_count(self):
+        """Returns the configured CPU threads per engine process (0 = auto)."""
+        try:
+            return max(0, int(self.threads_var.get()))
+        except (tk.TclError, ValueError):
+            return 0
+
+    def get_chunk_minutes(self):
+        """Returns the chunk length for long files in minutes (0 = no chunking)."""
+        try:
+            return max(0, int(self.chunk_minutes_var.get()))
+        except (tk.TclError, ValueError):
+            return DEFAULT_CHUNK_MINUTES
+
+    def get_chunk_overlap(self):
+        """Returns the overlap between neighbouring chunks in seconds."""
+        try:
+            return max(0, int(self.chunk_overlap_var.get()))
+        except (tk.TclError, ValueError):
+            return DEFAULT_CHUNK_OVERLAP
+
+    def get_speech_threshold(self):
+        """Returns the percent of speech below which files are skipped (0 = no check)."""
+        try:
+            return max(0.0, float(self.speech_threshold_var.get()))
+        except (tk.TclError, ValueError):
+            return DEFAULT_SPEECH_THRESHOLD
+
+    def get_draft_model(self):
+        """Returns the model that drafts each file before the selected one refines it, or None."""
+        draft_model = self.draft_model_var.get()
+        return draft_model if draft_model in CASCADE_DRAFT_MODELS else None
+
+    def get_output_formats(self):
+        """Returns the checked output formats, or the default if none are checked."""
+        return tuple(f for f in OUTPUT_FORMATS if self.format_vars[f].get()) or DEFAULT_OUTPUT_FORMATS
+
     def on_closing(self):
         """Called when the window is closed."""
         if self.transcription_thread and self.transcription_thread.is_alive():
-            if messagebox.askyesno("Confirm Exit", "A transcription is in progress. Do you want to stop it and exit?"):
-                self.stop_transcription()
-                self.transcription_thread.join(timeout=5) # Give it a moment to stop
-                self.save_settings()
-                self.root.destroy()
+            if not messagebox.askyesno("Confirm Exit", "A transcription is in progress. Do you want to stop it and exit?"):
+                return # Don't destroy if user cancels
+            self.stop_transcription()
+            self.transcription_thread.join(timeout=5) # Give it a moment to stop
+        self.shutdown()
+
+    def shutdown(self):
+        """Saves settings, stops the background services, closes the stores and destroys the window."""
+        self.probe_cancel_flag.set()
+        self.save_settings()
+        self.stop_watching()
+        if self.coordinator:
+            self.coordinator.stop()
+        self.queue_store.close()
+        if self.search_index is not None:
+            self.search_index.close()
+        self.root.destroy()
+
+    def populate_treeview(self):
+        """Loads the queue model from the queue store, one batch per event loop turn."""
+        self.queue_model = QueueModel()
+        self.selected_paths.clear()
+        self.queue_loading = True
+        self.queue_load_started = time.perf_counter()
+        # The first batch is drawn after the window is up; the rest follow one per event loop turn
+        self.root.after(1, self.populate_treeview_batch, self.queue_store.iter_batches())
+
+    def populate_treeview_batch(self, batches):
+        """Adds the next batch of stored queue items and schedules the one after it."""
+        batch = next(batches, None)
+        if batch is None:
+            self.queue_loading = False
+            self.update_console(f"[INFO] Loaded {len(self.queue_model)} queued files "
+                                f"in {time.perf_counter() - self.queue_load_started:.2f} s.")
+            self.start_duration_probe(entry.path for entry in self.queue_model.view() if entry.duration is None)
+            if self.watch_folders:
+                if self.watcher is None:
+                    self.start_watching(self.watch_folders)
+                else:
+                    for folder in self.watch_folders:
+                        self.watcher.add(folder) # Already watched folders are ignored
+                    self.update_watch_list()
+            self.start_search_backfill()
+            return
+        self.queue_model.extend((item['path'], item['filename'], item['processed'], item['duration'], item['eta'])
+                                for item in batch)
+        self.schedule_queue_refresh()
+        self.root.after(1, self.populate_treeview_batch, batches)
+
+    def schedule_queue_refresh(self):
+        """Redraws the visible queue rows once the event loop is idle."""
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.root.after_idle(self.refresh_queue_view)
+
+    def visible_row_count(self):
+        """Returns how many queue rows fit in the Treeview."""
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        height = self.tree.winfo_height()
+        if height <= 1: # Not laid out yet
+            return 20
+        return max(1, height // row_height - 1) # One row's worth for the headings
+
+    def refresh_queue_view(self):
+        """Fills the Treeview rows with the visible window of the (filtered, sorted) queue."""
+        self.refresh_pending = False
+        view_key = (self.queue_model.version, self.status_filter_var.get(), self.sort_column, self.sort_descending)
+        if view_key != self.view_key:
+            self.view_entries = self.queue_model.view(self.status_filter_var.get(),
+                                                      self.sort_column, self.sort_descending)
+            self.view_key = view_key
+
+        rows = self.visible_row_count()
+        total = len(self.view_entries)
+        self.view_offset = max(0, min(self.view_offset, total - rows))
+        window = self.view_entries[self.view_offset:self.view_offset + rows]
+
+        # Row items are named row0, row1, ... and reused between refreshes
+        row_count = len(self.tree.get_children())
+        for index, entry in enumerate(window):
+            values = (entry.processed, format_duration(entry.duration), format_duration(entry.eta),
+                      entry.path, entry.filename)
+            if index < row_count:
+                self.tree.item(f"row{index}", values=values)
             else:
-                pass # Don't destroy if user cancels
+                self.tree.insert("", "end", iid=f"row{index}", values=values)
+        if row_count > len(window):
+            self.tree.delete(*[f"row{index}" for index in range(len(window), row_count)])
+
+        self.visible_paths = [entry.path for entry in window]
+        self.tree.selection_set([f"row{index}" for index, path in enumerate(self.visible_paths)
+                                 if path in self.selected_paths])
+        if total:
+            self.tree_scroll_y.set(self.view_offset / total, min(1.0, (self.view_offset + rows) / total))
+        else:
+            self.tree_scroll_y.set(0.0, 1.0)
+
+    def reset_queue_view(self):
+        """Scrolls back to the top after the filter or sort order changed."""
+        self.view_offset = 0
+        self.schedule_queue_refresh()
+
+    def scroll_queue_view(self, *args):
+        """Scrollbar command for the virtual queue view."""
+        rows = self.visible_row_count()
+        if args[0] == "moveto":
+            self.view_offset = int(float(args[1]) * len(self.view_entries))
+        elif args[0] == "scroll":
+            self.view_offset += int(args[1]) * (rows if args[2] == "pages" else 1)
+        self.refresh_queue_view()
+
+    def on_queue_mousewheel(self, event):
+        """Scrolls the queue view with the mouse wheel (Windows/macOS delta or X11 buttons)."""
+        step = -QUEUE_WHEEL_ROWS if event.num == 4 or event.delta > 0 else QUEUE_WHEEL_ROWS
+        self.scroll_queue_view("scroll", step, "units")
+        return "break"
+
+    def on_queue_click(self, event):
+        """A plain click starts a new selection, dropping rows selected outside the window."""
+        if not event.state & 0x0005: # Neither Shift nor Control held
+            self.selected_paths.clear()
+
+    def on_queue_select(self, event):
+        """Mirrors the Treeview selection of the visible rows into selected_paths."""
+        visible_selected = {self.visible_paths[int(row_id[3:])] for row_id in self.tree.selection()
+                            if int(row_id[3:]) < len(self.visible_paths)}
+        self.selected_paths.difference_update(self.visible_paths)
+        self.selected_paths.update(visible_selected)
+
+    def sort_queue_view(self, column):
+        """Cycles a column heading between ascending, descending and queue order."""
+        if self.sort_column != column:
+            self.sort_column, self.sort_descending = column, False
+        elif not self.sort_descending:
+            self.sort_descending = True
         else:
-            self.save_settings()
-            self.root.destroy()
-
-    def get_current_queue_data(self):
-        """Extracts current data from the Treeview for saving."""
-        queue_data = []
-        for item_id in self.tree.get_children():
-            values = self.tree.item(item_id, 'values')
-            queue_data.append({
-                'processed': values[0],
-                'path': values[1],
-                'filename': values[2]
-            })
-        return queue_data
-
-    def populate_treeview(self, file_queue_data):
-        """Populates the Treeview from loaded settings."""
-        self.tree.delete(*self.tree.get_children()) # Clear existing items
-        for item in file_queue_data:
-            self.tree.insert("", "end", values=(item['processed'], item['path'], item['filename']))
+            self.sort_column = None
+        for heading_column, heading in QUEUE_HEADINGS.items():
+            if heading_column == self.sort_column:
+                heading += " \u25bc" if self.sort_descending else " \u25b2"
+            self.tree.heading(heading_column, text=heading)
+        self.reset_queue_view()
 
     def find_source_folder(self):
-        """Opens a directory dialog, scans for video/audio files, and adds them to the list."""
+        """Opens a directory dialog and scans it for video/audio files in the background."""
+        if self.scan_thread and self.scan_thread.is_alive():
+            self.update_console("[WARNING] A folder scan is already running.", "orange")
+            return
+
         folder_selected = filedialog.askdirectory()
         if folder_selected:
             self.update_console(f"[INFO] Scanning folder: {folder_selected}")
-            found_files = []
-            for root_dir, _, files in os.walk(folder_selected):
-                for file in files:
-                    if os.path.splitext(file)[1].lower() in SUPPORTED_EXTENSIONS:
-                        full_path = os.path.join(root_dir, file)
-                        found_files.append((full_path, file))
-            self.add_files_to_list(found_files)
-            self.update_console(f"[INFO] Found {len(found_files)} new files in {folder_selected}.")
-
-    def add_files_to_list(self, file_paths_and_names):
-        """Adds new files to the Treeview, avoiding duplicates based on full path."""
-        existing_paths = {self.tree.item(item, 'values')[1] for item in self.tree.get_children()}
-        added_count = 0
-        for full_path, filename in file_paths_and_names:
-            if full_path not in existing_paths:
-                self.tree.insert("", "end", values=("No", full_path, filename))
-                added_count += 1
-        self.update_console(f"[INFO] Added {added_count} new files to the queue.")
+            if self.scanner is None:
+                self.scanner = FolderScanner(SUPPORTED_EXTENSIONS)
+            self.scan_cancel_flag.clear()
+            self.scan_added_count = 0
+            self.cancel_scan_button.config(state=tk.NORMAL)
+            self.scan_thread = threading.Thread(target=self.scan_worker, args=(folder_selected,))
+            self.scan_thread.daemon = True
+            self.scan_thread.start()
+            self.update_scan_progress()
+
+    def scan_worker(self, folder_selected):
+        """Runs the folder scanner, streaming found files to the queue in batches."""
+        try:
+            self.scanner.scan(folder_selected,
+                              lambda batch: self.root.after(0, self.add_scanned_batch, batch),
+                              self.scan_cancel_flag)
+        except Exception as e:
+            self.update_console(f"[ERROR] Error scanning '{folder_selected}': {e}", "red")
+        self.root.after(0, self.finish_scan, folder_selected)
+
+    def add_scanned_batch(self, batch):
+        """Adds a batch of scanned files to the queue on the main thread."""
+        self.scan_added_count += self.add_files_to_list(batch, log=False)
+
+    def update_scan_progress(self):
+        """Shows scan progress while the scan thread is running."""
+        if self.scan_thread and self.scan_thread.is_alive():
+            self.scan_status_var.set(f"Scanning: {self.scanner.dirs_scanned} dirs "
+                                     f"({self.scanner.dirs_per_second():.0f} dirs/s), "
+                                     f"{self.scanner.files_matched} files matched")
+            self.root.after(500, self.update_scan_progress)
+
+    def finish_scan(self, folder_selected):
+        """Reports the scan result once the scan thread is done."""
+        scanner = self.scanner
+        self.scan_status_var.set("")
+        self.cancel_scan_button.config(state=tk.DISABLED)
+        state = "cancelled" if scanner.cancelled else "finished"
+        self.update_console(f"[INFO] Scan {state}: found {scanner.files_matched} files in {folder_selected} "
+                            f"({scanner.dirs_scanned} dirs, {scanner.dirs_listed} changed since last scan).")
+        self.update_console(f"[INFO] Added {self.scan_added_count} new files to the queue.")
+
+    def cancel_scan(self):
+        """Asks the running folder scan to stop."""
+        self.scan_cancel_flag.set()
+        self.update_console("[INFO] Scan cancel requested.", "blue")
+
+    def start_watching(self, folders=()):
+        """Starts the folder watcher; restored folders only report files added while the app was closed."""
+        self.watcher = FolderWatcher(SUPPORTED_EXTENSIONS,
+                                     lambda batch: self.root.after(0, self.add_watched_files, batch),
+                                     self.update_console)
+        self.watcher.start(folders)
+        self.update_watch_list()
+
+    def stop_watching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+
+    def add_watch_folder(self):
+        """Opens a directory dialog and watches the folder for new media files."""
+        folder_selected = filedialog.askdirectory()
+        if not folder_selected:
+            return
+        folder_selected = os.path.normpath(folder_selected)
+        if folder_selected not in self.watch_folders:
+            self.watch_folders.append(folder_selected)
+        if self.watcher is not None:
+            self.watcher.add(folder_selected)
+        elif not self.queue_loading: # While the queue loads, the watcher starts with all folders once it is done
+            self.start_watching(self.watch_folders)
+        self.update_watch_list()
+        self.save_settings()
+
+    def remove_watch_folder(self):
+        """Stops watching the folder selected in the Watched list."""
+        folder = self.watch_folder_var.get()
+        if folder not in self.watch_folders:
+            return
+        self.watch_folders.remove(folder)
+        if self.watcher is not None:
+            self.watcher.remove(folder)
+        self.update_watch_list()
+        self.save_settings()
+
+    def update_watch_list(self):
+        folders = list(self.watch_folders)
+        self.watch_combobox.config(values=folders)
+        if self.watch_folder_var.get() not in folders:
+            self.watch_folder_var.set(folders[0] if folders else "")
+
+    def add_watched_files(self, batch):
+        """Queues files from a watched folder and starts a run if the queue was idle."""
+        added_count = self.add_files_to_list(batch, log=False)
+        if not added_count:
+            return
+        self.update_console(f"[INFO] Watch: added {added_count} new file(s) to the queue.", "blue")
+        if self.transcription_thread and self.transcription_thread.is_alive():
+            self.watch_backlog = True # The running pipeline already scheduled its files
+        elif self.watch_auto_start_var.get() and not self.user_stopped:
+            self.update_console("[INFO] Watch: starting transcription of the new files.", "blue")
+            self.start_transcription()
+
+    def finish_transcription(self):
+        """Resets the controls after a run and starts another one for files watched in the meantime."""
+        self.set_control_buttons_state(stopped=True)
+        self.transcription_thread = None # Its last step was scheduling this call; don't block the UI joining it
+        if self.watch_backlog and self.watch_auto_start_var.get() and not self.user_stopped:
+            self.watch_backlog = False
+            self.update_console("[INFO] Watch: starting transcription of files added during the last run.", "blue")
+            self.start_transcription()
+
+    def add_files_to_list(self, file_paths_and_names, log=True):
+        """Adds new files to the queue, avoiding duplicates based on full path."""
+        new_items = self.queue_model.extend((full_path, filename, "No")
+                                            for full_path, filename in file_paths_and_names)
+        self.queue_store.add_items(new_items)
+        self.schedule_queue_refresh()
+        if not self.queue_loading:
+            self.start_duration_probe(path for path, _, _ in new_items)
+        added_count = len(new_items)
+        if log:
+            self.update_console(f"[INFO] Added {added_count} new files to the queue.")
+        return added_count
+
+
+    def start_duration_probe(self, paths):
+        """Probes media durations in the background; the Duration and ETA columns fill in as they arrive."""
+        DurationProber(paths, lambda batch: self.root.after(0, self.apply_durations, batch),
+                       self.probe_cancel_flag).start()
+
+    def apply_durations(self, batch):
+        """Stores probed (path, duration) pairs with the ETA for the selected model."""
+        model = self.model_var.get()
+        estimates = [(path, duration, self.rtf_tracker.estimate(model, duration)) for path, duration in batch]
+        self.queue_model.update_estimates(estimates)
+        self.queue_store.update_estimates(estimates)
+        self.schedule_queue_refresh()
+
+    def refresh_estimates(self):
+        """Recomputes every file's ETA for the selected model and its latest observed speed."""
+        self.apply_durations([(entry.path, entry.duration) for entry in self.queue_model.view()
+                              if entry.duration is not None])
+
+    def update_eta(self):
+        """Shows the estimated time left while a transcription runs."""
+        pipeline = self.pipeline
+        if pipeline is None:
+            self.eta_var.set("")
+            return
+        eta = pipeline.eta_seconds()
+        if eta is not None:
+            self.eta_var.set(f"ETA {format_duration(eta)} "
+                             f"(RTF {pipeline.rtf_tracker.rtf(pipeline.model):.2f})")
+        self.root.after(ETA_REFRESH_MS, self.update_eta)
+
+    def update_profile_label(self):
+        self.profile_var.set(self.engine_profile.describe(self.model_var.get()))
+
+    def start_calibration(self):
+        """Times the selected model with each compute type and thread count on a clip of a chosen file."""
+        if (self.transcription_thread and self.transcription_thread.is_alive()) or \
+                (self.calibration_thread and self.calibration_thread.is_alive()):
+            self.update_console("[WARNING] Wait for the running transcription or calibration to finish.", "orange")
+            return
+        media_path = filedialog.askopenfilename(
+            title="Choose a file for the reference clip",
+            filetypes=[("Media files", " ".join(f"*{extension}" for extension in SUPPORTED_EXTENSIONS))])
+        if not media_path:
+            return
+        model = self.model_var.get()
+        self.calibrate_button.config(state=tk.DISABLED)
+        self.start_button.config(state=tk.DISABLED)
+        self.calibration_thread = threading.Thread(target=self.calibration_worker, args=(media_path, model))
+        self.calibration_thread.daemon = True
+        self.calibration_thread.start()
 
+    def calibration_worker(self, media_path, model):
+        from vt_calibrate import prepare_clip, calibrate
+        work_dir = tempfile.mkdtemp(prefix="vt_clip_")
+        try:
+            clip_path, clip_seconds = prepare_clip(media_path, work_dir)
+            calibrate(clip_path, clip_seconds, [model], self.update_console, profile=self.engine_profile)
+        except Exception as e:
+            self.update_console(f"[ERROR] Calibration failed: {e}", "red")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            self.root.after(0, self.finish_calibration)
+
+    def finish_calibration(self):
+        self.update_profile_label()
+        self.calibrate_button.config(state=tk.NORMAL)
+        self.update_start_button()
+
+    def show_stats(self):
+        """Opens a window summarising the recorded per-file metrics, with CSV and Prometheus export."""
+        from vt_metrics import summarize, summary_lines, export_csv, export_prometheus
+        records = self.queue_store.metrics()
+        session = self.metrics.finished
+        window = tk.Toplevel(self.root)
+        window.title("Transcription Stats")
+        window.transient(self.root)
+        text = tk.Text(window, wrap=tk.WORD, width=80, height=16, bg="#f0f0f0")
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text.insert(tk.END, "This session\n", "heading")
+        text.insert(tk.END, "\n".join(summary_lines(summarize(session))) if session else "No files finished yet.")
+        text.insert(tk.END, "\n\nAll recorded files\n", "heading")
+        text.insert(tk.END, "\n".join(summary_lines(summarize(records))) if records else "No metrics recorded yet.")
+        text.tag_config("heading", font=("TkDefaultFont", 10, "bold"))
+        text.config(state="disabled")
+
+        buttons_frame = ttk.Frame(window)
+        buttons_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(buttons_frame, text="Export CSV...",
+                   command=lambda: self.export_metrics(export_csv, ".csv", window)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons_frame, text="Export Prometheus...",
+                   command=lambda: self.export_metrics(export_prometheus, ".prom", window)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons_frame, text="Close", command=window.destroy).pack(side=tk.RIGHT, padx=5)
+
+    def export_metrics(self, exporter, extension, parent):
+        file_path = filedialog.asksaveasfilename(parent=parent, defaultextension=extension,
+                                                 initialfile=f"transcriber_metrics{extension}")
+        if not file_path:
+            return
+        try:
+            if extension == ".prom":
+                exporter(self.queue_store.metrics(), file_path, self.queue_store.status_counts())
+            else:
+                exporter(self.queue_store.metrics(), file_path)
+            self.update_console(f"[INFO] Metrics exported to '{file_path}'.", "blue")
+        except OSError as e:
+            self.update_console(f"[ERROR] Could not export metrics: {e}", "red")
+
+    def open_search_index(self):
+        """Returns the transcript search index, opening it on first use."""
+        if self.search_index is None:
+            from vt_search import TranscriptIndex
+            self.search_index = TranscriptIndex()
+        return self.search_index
+
+    def start_search_backfill(self):
+        """Adds transcripts of processed files that aren't in the search index yet, in the background."""
+        from vt_search import transcript_paths
+        search_index = self.open_search_index()
+        files = [(entry.path, entry.filename) for entry in self.queue_model.view() if entry.processed == "Yes"]
+        destination_folder = self.current_destination_folder
+
+        def backfill():
+            started = time.perf_counter()
+            try:
+                indexed, unchanged, missing = search_index.backfill(
+                    transcript_paths(files, destination_folder), self.probe_cancel_flag, self.update_console)
+            except Exception as e: # e.g. the index was closed by exiting
+                self.update_console(f"[WARNING] Search index backfill stopped: {e}", "orange")
+                return
+            if indexed:
+                self.update_console(f"[INFO] Search index: added {indexed} transcripts in "
+                                    f"{time.perf_counter() - started:.1f} s ({unchanged} already indexed, "
+                                    f"{missing} without a transcript in the destination folder).", "blue")
+
+        threading.Thread(target=backfill, daemon=True).start()
+
+    def search_transcripts(self):
+        """Searches the transcript index and lists the hits, best first, with their time offset."""
+        text = self.search_var.get().strip()
+        if not text:
+            return
+        from vt_search import DEFAULT_SEARCH_LIMIT
+        started = time.perf_counter()
+        hits = self.open_search_index().search(text, DEFAULT_SEARCH_LIMIT)
+        elapsed = time.perf_counter() - started
+        self.update_console(f"[INFO] Search '{text}': {len(hits)} hits in {elapsed * 1000:.0f} ms.")
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Search: {text}")
+        window.geometry("900x400")
+        results = ttk.Treeview(window, columns=("Offset", "File", "Text"), show="headings")
+        for column, width in (("Offset", 80), ("File", 300), ("Text", 500)):
+            results.heading(column, text=column)
+            results.column(column, width=width, stretch=column == "Text")
+        scroll = ttk.Scrollbar(window, command=results.yview)
+        results.config(yscrollcommand=scroll.set)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        results.pack(fill=tk.BOTH, expand=True)
+        for hit in hits:
+            results.insert("", tk.END, values=(format_duration(hit['start']), hit['media_path'], hit['snippet']))
+
+        def copy_hit(event):
+            selected = results.selection()
+            if selected:
+                offset, media_path, _ = results.item(selected[0], 'values')
+                self.root.clipboard_clear()
+                self.root.clipboard_append(f"{media_path} @ {offset}")
+                self.update_console(f"[INFO] Copied '{media_path} @ {offset}' to the clipboard.")
+        results.bind("<Double-1>", copy_hit)
+        if not hits:
+            results.insert("", tk.END, values=("", "No matches.", ""))
 
     def select_destination_folder(self):
         """Opens a directory dialog for selecting the output destination."""
@@ -265,44 +999,59 @@ class VideoTranscriberApp:
             self.update_dest_folder_entry()
             self.update_console(f"[INFO] Destination folder set to: {self.current_destination_folder}")
 
-    def update_file_status(self, item_id, processed_status):
-        """Updates the 'Processed' status for a given item in the Treeview."""
-        current_values = list(self.tree.item(item_id, 'values'))
-        current_values[0] = processed_status # Update the first column
-        self.tree.item(item_id, values=current_values)
+    def update_file_status(self, file_path, processed_status):
+        """Updates the 'Processed' status for a given file in the queue."""
+        if self.queue_model.update_status(file_path, processed_status):
+            self.queue_store.update_status(file_path, processed_status)
+            self.schedule_queue_refresh()
 
     def move_item(self, direction):
-        """Moves selected item up or down in the Treeview."""
-        selected_items = self.tree.selection()
-        if not selected_items:
+        """Moves the selected files up or down in the queue as a block."""
+        if not self.selected_paths:
+            return
+
+        if self.status_filter_var.get() != "All" or self.sort_column:
+            self.update_console("[WARNING] Show all files in queue order (no filter or sorting) to reorder the queue.", "orange")
             return
 
-        for item_id in selected_items:
-            current_index = self.tree.index(item_id)
-            if direction == "up":
-                if current_index > 0:
-                    self.tree.move(item_id, "", current_index - 1)
-            elif direction == "down":
-                if current_index < len(self.tree.get_children()) - 1:
-                    self.tree.move(item_id, "", current_index + 1)
-        self.save_settings() # Save order changes
+        changed_paths = self.queue_model.move_block(self.selected_paths, direction)
+        if changed_paths:
+            self.queue_store.reorder(changed_paths) # Save order changes
+            self.schedule_queue_refresh()
 
     def remove_selected_files(self):
-        """Removes selected files from the Treeview."""
-        selected_items = self.tree.selection()
-        if not selected_items:
+        """Removes selected files from the queue."""
+        selected_paths = list(self.selected_paths)
+        if not selected_paths:
             return
 
-        if messagebox.askyesno("Confirm Removal", f"Are you sure you want to remove {len(selected_items)} selected file(s) from the queue?"):
-            for item_id in selected_items:
-                self.tree.delete(item_id)
-            self.save_settings()
-            self.update_console(f"[INFO] Removed {len(selected_items)} file(s) from the queue.")
+        if messagebox.askyesno("Confirm Removal", f"Are you sure you want to remove {len(selected_paths)} selected file(s) from the queue?"):
+            self.queue_model.remove_paths(selected_paths)
+            self.queue_store.remove_paths(selected_paths)
+            self.speech_overrides.difference_update(selected_paths)
+            self.selected_paths.clear()
+            self.schedule_queue_refresh()
+            self.update_console(f"[INFO] Removed {len(selected_paths)} file(s) from the queue.")
+
 
+    def override_speech_check(self):
+        """Has the selected files transcribed even if the no-speech check skips them, e.g. a quiet interview."""
+        selected_paths = [path for path in self.selected_paths if path in self.queue_model]
+        if not selected_paths:
+            return
+        self.speech_overrides.update(selected_paths)
+        requeued = 0
+        for path in selected_paths:
+            if self.queue_model.get(path).processed == "No speech":
+                self.update_file_status(path, "No")
+                requeued += 1
+        self.update_console(f"[INFO] {len(selected_paths)} file(s) will skip the no-speech check"
+                            f"{f'; {requeued} requeued' if requeued else ''}.")
 
     def start_transcription(self):
         """Starts the transcription process in a new thread."""
-        if not self.whisper_exe_found:
+        remote = self.engine_mode_var.get() == ENGINE_MODE_REMOTE
+        if self.whisper_exe_found is False and not remote: # Still None while the check runs; a missing engine then stops the run
             self.update_console("[ERROR] Cannot start. 'faster-whisper-xxl.exe' not found.", "red")
             return
 
@@ -310,13 +1059,32 @@ class VideoTranscriberApp:
             self.update_console("[WARNING] Transcription is already running.", "orange")
             return
 
+        if self.queue_loading:
+            self.update_console("[WARNING] The queue is still loading. Please wait a moment.", "orange")
+            return
+
+        if remote and self.coordinator is None:
+            from vt_coordinator import Coordinator, DEFAULT_COORDINATOR_ADDRESS
+            # Kept up between runs, so idle workers stay connected
+            address = self.coordinator_address or DEFAULT_COORDINATOR_ADDRESS
+            coordinator = Coordinator(address, self.update_console, self.coordinator_token)
+            try:
+                coordinator.start()
+            except (OSError, ValueError) as e:
+                self.update_console(f"[ERROR] Cannot start the coordinator on '{address}': {e}", "red")
+                return
+            self.coordinator = coordinator
+
         self.stop_flag.clear() # Clear stop flag for new run
+        self.user_stopped = False
+        self.watch_backlog = False
         self.pause_flag.clear() # Clear pause flag
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.pause_button.config(state=tk.NORMAL)
         self.resume_button.config(state=tk.DISABLED)
         self.update_console("[INFO] Transcription process started.", "blue")
+        self.refresh_estimates()
 
         self.transcription_thread = threading.Thread(target=self.transcription_worker)
         self.transcription_thread.daemon = True # Allow main program to exit even if thread is running
@@ -325,11 +1093,12 @@ class VideoTranscriberApp:
     def stop_transcription(self):
         """Sets the stop flag to terminate the transcription thread."""
         self.stop_flag.set()
-        self.update_console("[INFO] Stop requested. Waiting for current transcription to finish...", "blue")
+        self.user_stopped = True
+        self.update_console("[INFO] Stop requested. Running files are checkpointed and resume on the next start.", "blue")
         self.set_control_buttons_state(stopped=True)
 
     def pause_transcription(self):
-        """Sets the pause flag to pause the transcription thread."""
+        """Sets the pause flag; running engine processes are suspended until resumed."""
         self.pause_flag.set()
         self.update_console("[INFO] Transcription paused.", "blue")
         self.set_control_buttons_state(paused=True)
@@ -365,210 +1134,60 @@ class VideoTranscriberApp:
 
 
     def transcription_worker(self):
-        """Worker function for transcription, run in a separate thread."""
-        model = self.model_var.get()
-        destination_folder = self.current_destination_folder
-
-        # Get items in reverse order (descending) as per request
-        all_item_ids = list(self.tree.get_children())
-        all_item_ids.reverse()
-
-        for item_id in all_item_ids:
-            if self.stop_flag.is_set():
-                self.update_console("[INFO] Transcription stopped by user.", "blue")
-                break
-
-            while self.pause_flag.is_set():
-                self.update_console("[INFO] Transcription paused. Waiting to resume...", "blue")
-                time.sleep(1) # Wait for 1 second before checking pause_flag again
-                if self.stop_flag.is_set(): # Allow stopping even while paused
-                    self.update_console("[INFO] Transcription stopped while paused.", "blue")
-                    break
-
-            if self.stop_flag.is_set(): # Re-check after pause loop
-                break
-
-            values = self.tree.item(item_id, 'values')
-            processed_status = values[0]
-            file_path = values[1]
-            filename = values[2]
-
-            # Construct output file names based on original file for TXT
-            base_filename = os.path.splitext(filename)[0]
-            output_txt_filename_whisper = f"{base_filename}.txt" # faster-whisper-xxl.exe output filename
-            txt_output_path = os.path.join(destination_folder, output_txt_filename_whisper)
-
-            # Construct PDF filename with prepended folder name
-            parent_folder_name = os.path.basename(os.path.dirname(file_path))
-            if not parent_folder_name: # Fallback if file is directly in root
-                parent_folder_name = "Transcribed"
-            output_pdf_filename = f"{parent_folder_name}_{base_filename}.pdf"
-            pdf_output_path = os.path.join(destination_folder, output_pdf_filename)
-
-
-            # --- Check if already processed or can be retried ---
-            if processed_status == "Yes":
-                self.update_console(f"[INFO] Skipping '{filename}' - already processed.", "blue")
-                continue
-
-            # If failed, but TXT exists and is not empty, attempt PDF conversion directly
-            if processed_status == "Failed" and os.path.exists(txt_output_path) and os.path.getsize(txt_output_path) > 0:
-                self.update_console(f"[INFO] Detected existing TXT for failed '{filename}'. Attempting PDF conversion.", "blue")
-                # Update UI status immediately before conversion attempt
-                self.root.after(0, self.update_file_status, item_id, "Retrying PDF...")
-                try:
-                    self.convert_txt_to_pdf(txt_output_path, pdf_output_path)
-                    self.root.after(0, self.update_file_status, item_id, "Yes")
-                    self.root.after(0, self.save_settings)
-                    self.update_console(f"[SUCCESS] Retried PDF conversion for '{output_txt_filename_whisper}' to PDF: '{output_pdf_filename}'", "green")
-                except Exception as e:
-                    self.update_console(f"[ERROR] Failed to retry PDF conversion for '{filename}': {e}", "red")
-                    self.root.after(0, self.update_file_status, item_id, "Failed")
-                continue # Move to next file regardless of PDF retry success/failure
-
-
-            # Check if PDF already exists (even if 'Processed' status is 'No' due to manual deletion)
-            if os.path.exists(pdf_output_path):
-                self.update_console(f"[INFO] PDF for '{filename}' already exists. Marking as processed.", "blue")
-                self.root.after(0, self.update_file_status, item_id, "Yes")
-                self.root.after(0, self.save_settings)
-                continue
-
-            self.update_console(f"[INFO] Transcribing '{filename}' using '{model}' model...", "blue")
-            self.root.after(0, self.update_file_status, item_id, "Processing...") # Update GUI immediately
-
+        """Runs the transcription pipeline over the queue, in a separate thread."""
+        from vt_metrics import export_prometheus
+        if self.transcript_cache is None:
+            self.transcript_cache = TranscriptCache(DEFAULT_CACHE_DIR, self.cache_max_mb * 1024 * 1024)
+
+        worker_count = self.get_worker_count()
+        compute_type, engine_threads = self.engine_profile.engine_settings(self.model_var.get(), worker_count,
+                                                                           self.get_thread_count())
+        if self.engine_mode_var.get() == ENGINE_MODE_REMOTE:
+            from vt_coordinator import DEFAULT_REMOTE_SLOTS
+            worker_count = max(1, self.coordinator_slots or DEFAULT_REMOTE_SLOTS) # Runs out at once; each remote worker takes one
+        pipeline = TranscriptionPipeline(
+            self.queue_model, self.model_var.get(), self.current_destination_folder, self.transcript_cache,
+            log=self.update_console,
+            set_status=lambda path, status: self.root.after(0, self.update_file_status, path, status),
+            worker_count=worker_count, engine_threads=engine_threads, compute_type=compute_type,
+            stop_flag=self.stop_flag, pause_flag=self.pause_flag,
+            engine_mode=self.engine_mode_var.get(), server_command=self.engine_server_command,
+            chunk_seconds=self.get_chunk_minutes() * 60, chunk_overlap=self.get_chunk_overlap(),
+            prefetch_files=self.prefetch_files, scratch_bytes=self.scratch_max_mb * 1024 * 1024,
+            output_formats=self.get_output_formats(), pdf_font=self.pdf_font,
+            schedule_policy=self.schedule_var.get(), rtf_tracker=self.rtf_tracker, metrics=self.metrics,
+            coordinator=self.coordinator, search_index=self.open_search_index(),
+            speech_threshold=self.get_speech_threshold(), speech_overrides=self.speech_overrides,
+            draft_model=self.get_draft_model(), min_logprob=self.cascade_min_logprob)
+        self.pipeline = pipeline
+        self.root.after(0, self.update_eta)
+        pipeline.run()
+        self.pipeline = None
+        self.root.after(0, self.refresh_estimates) # Use what this run taught about the model's speed
+        if self.metrics_textfile:
             try:
-                # Command to run faster-whisper-xxl.exe
-                # Note: --output_dir is where the .txt file will be saved.
-                command = [
-                    "faster-whisper-xxl.exe",
-                    file_path,
-                    "--model", model,
-                    "--output_dir", destination_folder,
-                    "--output_format", "txt", # Ensure text output for PDF conversion
-                    "--compute_type", "float32", # Forcing float32 for maximum compatibility
-                    "--vad_filter", "true",
-                    "--task", "transcribe",
-                    "--word_timestamps", "false", # Disable word timestamps
-                    "--beep_off",
-                ]
-                self.update_console(f"[DEBUG] Executing: {' '.join(command)}")
-
-                # Use creationflags for Windows to prevent console window from popping up
-                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                           text=True, bufsize=1, universal_newlines=True,
-                                           creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0)
-
-                # Monitor process output in real-time
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        self.root.after(0, self.update_console, output.strip(), "blue")
-                    if self.stop_flag.is_set():
-                        # If stop requested, terminate the subprocess
-                        process.terminate()
-                        self.update_console(f"[INFO] Terminated transcription for '{filename}'.", "orange")
-                        break # Break out of inner while loop
-
-                process.wait() # Wait for the process to truly finish/terminate
-
-                if process.returncode == 0:
-                    self.update_console(f"[SUCCESS] Transcription of '{filename}' completed.", "green")
-                    # Ensure the TXT file is in the expected place before conversion
-                    if os.path.exists(txt_output_path) and os.path.getsize(txt_output_path) > 0:
-                        self.convert_txt_to_pdf(txt_output_path, pdf_output_path)
-                        self.root.after(0, self.update_file_status, item_id, "Yes") # Update GUI
-                        self.root.after(0, self.save_settings)
-                        self.update_console(f"[SUCCESS] Converted '{output_txt_filename_whisper}' to PDF: '{output_pdf_filename}'", "green")
-                    else:
-                        self.update_console(f"[ERROR] Expected TXT file '{txt_output_path}' not found or is empty after successful transcription process. (Check faster-whisper-xxl.exe output)", "red")
-                        self.root.after(0, self.update_file_status, item_id, "Failed")
-                else:
-                    stderr_output = process.stderr.read()
-                    self.update_console(f"[ERROR] Transcription of '{filename}' failed. Exit Code: {process.returncode}", "red")
-                    if stderr_output:
-                        self.update_console(f"[ERROR] Subprocess Error: {stderr_output.strip()}", "red")
-
-                    # Special handling for Exit Code 3221226505
-                    if process.returncode == 3221226505 and os.path.exists(txt_output_path) and os.path.getsize(txt_output_path) > 0:
-                        self.update_console(f"[INFO] Despite Exit Code {process.returncode}, TXT file exists. Attempting PDF conversion for '{filename}'.", "orange")
-                        try:
-                            self.convert_txt_to_pdf(txt_output_path, pdf_output_path)
-                            self.root.after(0, self.update_file_status, item_id, "Yes")
-                            self.root.after(0, self.save_settings)
-                            self.update_console(f"[SUCCESS] PDF conversion successful despite transcription exit code for '{filename}'.", "green")
-                        except Exception as pdf_e:
-                            self.update_console(f"[ERROR] PDF conversion failed even after transcription error: {pdf_e}", "red")
-                            self.root.after(0, self.update_file_status, item_id, "Failed")
-                    else:
-                        self.root.after(0, self.update_file_status, item_id, "Failed")
-
-            except FileNotFoundError:
-                self.update_console(f"[ERROR] 'faster-whisper-xxl.exe' not found. "
-                                     f"Please ensure it's in your system PATH.", "red")
-                self.root.after(0, self.update_file_status, item_id, "Failed")
-                self.stop_flag.set() # Stop the entire process
-                break
-            except Exception as e:
-                self.update_console(f"[ERROR] An unexpected error occurred during transcription for '{filename}': {e}", "red")
-                self.root.after(0, self.update_file_status, item_id, "Failed")
-                # Continue to next file or stop, depending on desired behavior
-                # For now, let's continue to the next file but mark current as failed.
+                export_prometheus(self.queue_store.metrics(), self.metrics_textfile, self.queue_store.status_counts())
+            except OSError as e:
+                self.update_console(f"[WARNING] Could not write metrics to '{self.metrics_textfile}': {e}", "orange")
 
         self.update_console("[INFO] Transcription queue finished or stopped.", "blue")
-        self.root.after(0, self.set_control_buttons_state, True) # Reset buttons
+        self.root.after(0, self.finish_transcription) # Reset buttons
 
-    def convert_txt_to_pdf(self, txt_path, pdf_path):
-        """Converts a text file to a PDF file and removes timestamps."""
-        if not os.path.exists(txt_path) or os.path.getsize(txt_path) == 0:
-            self.update_console(f"[ERROR] Text file not found or is empty for PDF conversion: {txt_path}", "red")
-            raise FileNotFoundError(f"Text file not found or empty: {txt_path}") # Raise for handling in worker
 
-        # Regex to find timestamps like [00:01.500 --> 00:04.320] or [01:00:01.500 --> 01:00:04.320]
-        timestamp_pattern = re.compile(r'\[(?:(?:\d{2}:)?\d{2}:\d{2}\.\d{3})\s*-->\s*(?:(?:\d{2}:)?\d{2}:\d{2}\.\d{3})\]\s*')
-
-        try:
-            pdf = FPDF()
-            # Set top, right, left, and bottom margins
-            pdf.set_margins(15, 15, 15)
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-
-            with open(txt_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    # Remove timestamps from the line
-                    cleaned_line = timestamp_pattern.sub('', line).strip()
-
-                    # Only write if there's actual content after removing timestamps
-                    if cleaned_line:
-                        # FPDF requires strings, ensure proper encoding and handling of special chars
-                        try:
-                            # Add a newline character back after stripping and cleaning
-                            pdf.write(8, cleaned_line.encode('latin-1', 'replace').decode('latin-1') + "\n")
-                        except UnicodeEncodeError:
-                            self.update_console(f"[WARNING] Encoding issue with line in {txt_path}. Skipping problematic characters.", "orange")
-                            # Fallback for complex characters - replace with ? or similar
-                            pdf.write(8, cleaned_line.encode('ascii', 'replace').decode('ascii') + "\n")
-            pdf.output(pdf_path)
-            # Optionally delete the source .txt file after successful PDF conversion
-            # os.remove(txt_path)
-            self.update_console(f"[INFO] '{os.path.basename(txt_path)}' converted to PDF.", "green")
-        except Exception as e:
-            self.update_console(f"[ERROR] Failed to convert '{txt_path}' to PDF: {e}", "red")
-            raise # Re-raise to be caught in the worker thread
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Needed for the PDF process pool in PyInstaller builds
 
+    # Frozen builds start the warm model server by re-running this executable
+    if "--engine-server" in sys.argv:
+        from vt_engine_server import main as engine_server_main
+        sys.exit(engine_server_main([arg for arg in sys.argv[1:] if arg != "--engine-server"]))
 
-if __name__ == "__main__":
-    # Ensure fpdf is installed
-    try:
-        from fpdf import FPDF
-    except ImportError:
+    # Ensure fpdf is installed; it is imported later by the render stage, so only look it up here
+    if importlib.util.find_spec("fpdf") is None:
         print("FPDF library not found. Installing now...")
         try:
             subprocess.check_call([sys.executable, "-m", "pip", "install", "fpdf"])
-            from fpdf import FPDF
+            importlib.invalidate_caches()
             print("FPDF installed successfully.")
         except Exception as e:
             print(f"Failed to install FPDF. Please install manually: pip install fpdf. Error: {e}")
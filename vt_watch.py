@@ -0,0 +1,292 @@
+import os
+import sys
+import time
+import queue
+import errno
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+from vt_scanner import FolderScanner
+
+# Constants
+WATCH_INDEX_FILE = 'watch_index.json' # Separate from scan_index.json so a Find Files scan doesn't hide new files
+WATCH_TICK_SECONDS = 1.0 # How often pending files are checked and inotify is read
+WATCH_POLL_SECONDS = 30 # Rescan interval of the polling backend
+STABLE_SECONDS = 5 # A file is queued once its size and mtime haven't changed for this long
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    """Minimal inotify binding over libc, mapping watch descriptors to directories."""
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.dirs = {} # wd -> dir path
+        self.wds = {} # dir path -> wd
+
+    def add(self, dir_path):
+        """Watches one directory. Raises OSError, e.g. ENOSPC when max_user_watches is reached."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), dir_path)
+        self.dirs[wd] = dir_path
+        self.wds[dir_path] = wd
+
+    def remove_tree(self, root_folder):
+        """Stops watching root_folder and every directory below it."""
+        prefix = os.path.join(root_folder, '')
+        for dir_path in [d for d in self.wds if d == root_folder or d.startswith(prefix)]:
+            wd = self.wds.pop(dir_path)
+            self.dirs.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout):
+        """Waits up to timeout seconds and returns (dir path, mask, name) events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_IGNORED: # Watched directory is gone
+                dir_path = self.dirs.pop(wd, None)
+                if dir_path is not None:
+                    self.wds.pop(dir_path, None)
+                continue
+            events.append((self.dirs.get(wd), mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """Watches folders for new media and reports each file once it has finished being written.
+
+    Uses inotify on Linux and falls back to polling rescans elsewhere, or when
+    inotify isn't available or runs out of watches. Both backends share a
+    FolderScanner index, so restoring the watches on startup only lists
+    directories that changed while the app was closed. New files wait in a
+    pending set until their size and mtime have been stable for
+    stable_seconds, then are passed to on_files as (full_path, filename) lists,
+    the same batches a folder scan produces.
+    """
+
+    def __init__(self, extensions, on_files, log, index_path=WATCH_INDEX_FILE,
+                 poll_seconds=WATCH_POLL_SECONDS, stable_seconds=STABLE_SECONDS, use_inotify=True):
+        self.extensions = extensions
+        self.on_files = on_files
+        self.log = log
+        self.scanner = FolderScanner(extensions, index_path)
+        self.poll_seconds = poll_seconds
+        self.stable_seconds = stable_seconds
+        self.use_inotify = use_inotify and sys.platform.startswith('linux')
+        self.folders = []
+        self.commands = queue.Queue() # ('add' | 'remove', folder), applied by the watch thread
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.inotify = None
+        self.pending = {} # path -> (size, mtime, unchanged since)
+        self.last_poll = 0.0
+
+    @property
+    def backend(self):
+        return "inotify" if self.inotify is not None else "polling"
+
+    def start(self, folders=()):
+        """Starts the watch thread; folders are caught up on files added since they were last watched."""
+        for folder in folders:
+            self.add(folder)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def add(self, folder):
+        folder = os.path.normpath(folder)
+        if folder not in self.folders:
+            self.folders.append(folder)
+            self.commands.put(('add', folder))
+
+    def remove(self, folder):
+        folder = os.path.normpath(folder)
+        if folder in self.folders:
+            self.folders.remove(folder)
+            self.commands.put(('remove', folder))
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def run(self):
+        if self.use_inotify:
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError) as e: # AttributeError: libc without inotify
+                self.log(f"[WARNING] inotify unavailable ({e}); watching folders by polling.", "orange")
+        try:
+            while not self.stop_event.is_set():
+                self.apply_commands()
+                if self.inotify is not None:
+                    try:
+                        self.handle_events(self.inotify.read(WATCH_TICK_SECONDS))
+                    except OSError as e:
+                        self.fall_back_to_polling(e)
+                else:
+                    self.stop_event.wait(WATCH_TICK_SECONDS)
+                    if time.time() - self.last_poll >= self.poll_seconds:
+                        self.poll()
+                self.check_pending()
+        except Exception as e:
+            self.log(f"[ERROR] Folder watcher stopped: {e}", "red")
+        finally:
+            if self.inotify is not None:
+                self.inotify.close()
+                self.inotify = None
+            self.save_index(keep_pending=True)
+
+    def apply_commands(self):
+        while True:
+            try:
+                command, folder = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command == 'add':
+                self.catch_up(folder)
+                self.log(f"[INFO] Watching {folder} ({self.backend}).", "blue")
+            else:
+                if self.inotify is not None:
+                    self.inotify.remove_tree(folder)
+                prefix = os.path.join(folder, '')
+                self.pending = {path: state for path, state in self.pending.items() if not path.startswith(prefix)}
+                self.log(f"[INFO] Stopped watching {folder}.", "blue")
+
+    def catch_up(self, folder):
+        """Rescans folder for files added since the index was saved, adding inotify watches on the way."""
+        visited = self.scan(folder)
+        if self.inotify is None:
+            return
+        for dir_path in sorted(visited):
+            if dir_path in self.inotify.wds:
+                continue
+            try:
+                self.inotify.add(dir_path)
+            except OSError as e:
+                if e.errno in (errno.ENOENT, errno.ENOTDIR): # Removed since the scan
+                    continue
+                self.fall_back_to_polling(e)
+                return
+
+    def fall_back_to_polling(self, error):
+        hint = " (raise fs.inotify.max_user_watches)" if error.errno == errno.ENOSPC else ""
+        self.log(f"[WARNING] inotify failed: {error}{hint}. Watching folders by polling.", "orange")
+        self.inotify.close()
+        self.inotify = None
+        self.last_poll = 0.0
+
+    def poll(self):
+        self.last_poll = time.time()
+        for folder in list(self.folders):
+            self.scan(folder)
+
+    def scan(self, folder):
+        """Rescans folder for new files. Returns the directories visited."""
+        pending_count = len(self.pending)
+        visited = self.scanner.scan(folder, self.add_pending, self.stop_event, only_new=True)
+        if len(self.pending) > pending_count:
+            self.save_index(keep_pending=True) # The scan saved the new files as known; a crash must not lose them
+        return visited
+
+    def handle_events(self, events):
+        for dir_path, mask, name in events:
+            if mask & IN_Q_OVERFLOW: # Events were dropped; rescan to find what they were
+                for folder in list(self.folders):
+                    self.catch_up(folder)
+                continue
+            if dir_path is None or not name:
+                continue
+            path = os.path.join(dir_path, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.catch_up(path) # New subtree: watch it and pick up files created before the watch
+            elif os.path.splitext(name)[1].lower() in self.extensions:
+                self.add_pending([(path, name)])
+
+    def add_pending(self, batch):
+        for path, _ in batch:
+            if path not in self.pending:
+                self.pending[path] = (None, None, time.time())
+
+    def check_pending(self):
+        """Passes on files whose size and mtime stayed the same for stable_seconds."""
+        now = time.time()
+        ready = []
+        for path, (size, mtime, since) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.pending[path] # Deleted or moved away before it was finished
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self.pending[path] = (stat.st_size, stat.st_mtime, now)
+            elif now - since >= self.stable_seconds:
+                del self.pending[path]
+                ready.append((path, os.path.basename(path)))
+        if ready:
+            self.on_files(ready)
+            if self.inotify is not None:
+                self.refresh_index({os.path.dirname(path) for path, _ in ready})
+
+    def refresh_index(self, dir_paths):
+        """Records queued files in the index, so a restart doesn't report them again."""
+        for dir_path in dir_paths:
+            try:
+                dir_mtime = os.stat(dir_path).st_mtime
+                subdirs, files = self.scanner.list_directory(dir_path)
+            except OSError:
+                continue
+            self.scanner.index[dir_path] = {'mtime': dir_mtime, 'subdirs': subdirs, 'files': files}
+        self.save_index(keep_pending=True)
+
+    def save_index(self, keep_pending=False):
+        """Saves the index; directories with files still pending are marked stale so a restart lists them again."""
+        if keep_pending:
+            for dir_path in {os.path.dirname(path) for path in self.pending}:
+                entry = self.scanner.index.get(dir_path)
+                if entry is not None:
+                    entry['mtime'] = 0
+                    entry['files'] = [file for file in entry['files']
+                                      if os.path.join(dir_path, file[0]) not in self.pending]
+        try:
+            self.scanner.save_index()
+        except OSError as e:
+            self.log(f"[WARNING] Could not save the watch index: {e}", "orange")
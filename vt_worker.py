@@ -0,0 +1,246 @@
+"""Remote transcription worker.
+
+Pulls jobs from a coordinator (the GUI or vt_headless.py with the remote
+engine mode), runs faster-whisper-xxl on them locally and uploads the
+transcripts. The lease of the running job is renewed with heartbeats that
+also carry the engine's output, so the queue shows progress as usual. On
+SIGINT/SIGTERM the running job is stopped and released to another worker.
+
+Usage:
+    python vt_worker.py --coordinator http://HOST:8765 [--name NAME] [--threads N]
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import signal
+import socket
+import argparse
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from vt_engine import SubprocessEngine
+from vt_coordinator import TOKEN_HEADER, HEARTBEAT_SECONDS
+
+# Constants
+IDLE_RETRY_SECONDS = 5 # Wait before asking again after the coordinator couldn't be reached
+REQUEST_TIMEOUT = 60 # Seconds; longer than the coordinator's lease wait
+
+
+def log_to_stderr(message, color="black"):
+    sys.stderr.write(f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n")
+    sys.stderr.flush()
+
+
+class LeaseLost(Exception):
+    """The coordinator no longer knows the lease: it ran out, or the run was stopped."""
+
+
+class CoordinatorClient:
+    """JSON-over-HTTP client of vt_coordinator's API."""
+
+    def __init__(self, url, token=None):
+        self.url = url.rstrip("/")
+        self.token = token
+
+    def request(self, method, endpoint, body=None):
+        """Returns (status, parsed JSON reply or None)."""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(f"{self.url}/{endpoint}", data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                payload = response.read()
+                return response.status, json.loads(payload) if payload else None
+        except urllib.error.HTTPError as e:
+            if e.code == 410:
+                raise LeaseLost(endpoint) from e
+            raise
+
+    def download(self, lease_id, target_path):
+        request = urllib.request.Request(f"{self.url}/media/{lease_id}")
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response, open(target_path, 'wb') as f:
+                shutil.copyfileobj(response, f, 1024 * 1024)
+        except urllib.error.HTTPError as e:
+            if e.code == 410:
+                raise LeaseLost("media") from e
+            raise
+
+
+class Worker:
+    """Runs leased jobs one at a time with a local one-shot engine."""
+
+    def __init__(self, client, name, log, engine_threads=0, engine_command=None, work_dir=None,
+                 shared_storage=False, exit_when_idle=False):
+        self.client = client
+        self.name = name
+        self.log = log
+        self.engine_threads = engine_threads
+        self.engine_command = engine_command
+        self.work_dir = work_dir or tempfile.gettempdir()
+        self.shared_storage = shared_storage
+        self.exit_when_idle = exit_when_idle
+        self.shutdown = threading.Event()
+        self.stop_flag = threading.Event() # Of the running job; set when its lease is lost or on shutdown
+        self.jobs_done = 0
+
+    def stop(self):
+        """Stops the running job (it is released to another worker) and exits the loop."""
+        self.shutdown.set()
+        self.stop_flag.set()
+
+    def run(self):
+        while not self.shutdown.is_set():
+            try:
+                status, job = self.client.request("POST", "lease", {'worker': self.name})
+            except (OSError, ValueError) as e:
+                if self.exit_when_idle: # The coordinator finished its run and stopped
+                    break
+                self.log(f"[WARNING] Coordinator unreachable: {e}. Retrying in {IDLE_RETRY_SECONDS} s.", "orange")
+                self.shutdown.wait(IDLE_RETRY_SECONDS)
+                continue
+            if status == 204 or not job:
+                if self.exit_when_idle:
+                    break
+                continue
+            self.run_job(job)
+        self.log(f"[INFO] Worker '{self.name}' exiting after {self.jobs_done} job(s).", "blue")
+
+    def run_job(self, job):
+        lease_id = job['lease']
+        stop_flag = self.stop_flag = threading.Event()
+        if self.shutdown.is_set(): # Asked to stop while the lease request was waiting
+            self.try_request(f"release/{lease_id}")
+            return
+        pause_flag = threading.Event()
+        output = []
+        output_lock = threading.Lock()
+        heartbeat_done = threading.Event()
+
+        def send_heartbeats():
+            # Sent a bit more often than asked, so one slow request doesn't cost the lease
+            interval = min(job.get('heartbeat_seconds', HEARTBEAT_SECONDS), job['lease_seconds'] / 3)
+            while not heartbeat_done.wait(interval):
+                with output_lock:
+                    lines = output[:]
+                    del output[:]
+                try:
+                    _, reply = self.client.request("POST", f"heartbeat/{lease_id}", {'output': lines})
+                except LeaseLost:
+                    self.log(f"[WARNING] Lease of '{job['media_name']}' was lost. Stopping it.", "orange")
+                    stop_flag.set()
+                    return
+                except (OSError, ValueError) as e:
+                    self.log(f"[WARNING] Heartbeat failed: {e}", "orange")
+                    with output_lock:
+                        output[:0] = lines # Sent again with the next heartbeat
+                    continue
+                if reply and reply.get('pause'):
+                    pause_flag.set()
+                else:
+                    pause_flag.clear()
+
+        def on_output(line):
+            with output_lock:
+                output.append(line)
+
+        job_dir = tempfile.mkdtemp(prefix="vt_job_", dir=self.work_dir)
+        heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+        heartbeat_thread.start()
+        try:
+            self.log(f"[INFO] Leased '{job['media_name']}' ({job['model']}, {job['compute_type']}).", "blue")
+            if self.shared_storage and os.path.exists(job['media_path']):
+                media_path = job['media_path']
+            else:
+                media_path = os.path.join(job_dir, job['media_name'])
+                self.client.download(lease_id, media_path)
+            engine = SubprocessEngine(job['model'], self.engine_threads, self.log,
+                                      engine_command=self.engine_command, compute_type=job['compute_type'])
+            result = engine.transcribe(media_path, job_dir, on_output, stop_flag, pause_flag)
+            heartbeat_done.set()
+            heartbeat_thread.join()
+            with output_lock:
+                lines = output[:]
+            if lines:
+                self.client.request("POST", f"heartbeat/{lease_id}", {'output': lines})
+
+            txt_path = os.path.join(job_dir, f"{os.path.splitext(os.path.basename(media_path))[0]}.txt")
+            if stop_flag.is_set():
+                if self.shutdown.is_set():
+                    self.client.request("POST", f"release/{lease_id}", {})
+                return
+            if result.returncode == 0 and os.path.exists(txt_path):
+                with open(txt_path, 'r', encoding='utf-8') as f:
+                    transcript = f.read()
+                self.client.request("POST", f"complete/{lease_id}",
+                                    {'transcript': transcript, 'wall_time': result.wall_time,
+                                     'load_time': result.load_time, 'inference_time': result.inference_time,
+                                     'peak_memory': result.peak_memory, 'compute_type': result.compute_type})
+                self.jobs_done += 1
+                self.log(f"[SUCCESS] Uploaded the transcript of '{job['media_name']}' {result.timing_message()}.",
+                         "green")
+            else:
+                self.client.request("POST", f"fail/{lease_id}",
+                                    {'returncode': result.returncode or 1,
+                                     'stderr': result.stderr.strip() or "No transcript written"})
+                self.log(f"[ERROR] '{job['media_name']}' failed (Exit Code: {result.returncode}).", "red")
+        except LeaseLost:
+            self.log(f"[WARNING] Lease of '{job['media_name']}' was lost.", "orange")
+        except FileNotFoundError as e:
+            self.log(f"[ERROR] Engine not found: {e}", "red")
+            self.try_request(f"release/{lease_id}") # Let a worker that has the engine take it
+            self.shutdown.set()
+        except (OSError, ValueError) as e:
+            self.log(f"[ERROR] Job '{job['media_name']}' aborted: {e}", "red")
+            self.try_request(f"release/{lease_id}")
+        finally:
+            heartbeat_done.set()
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def try_request(self, endpoint):
+        try:
+            self.client.request("POST", endpoint, {})
+        except (LeaseLost, OSError, ValueError):
+            pass # The lease runs out on its own
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe jobs pulled from a transcriber coordinator.")
+    parser.add_argument("--coordinator", required=True, help="coordinator URL, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}", help="worker name shown in the log")
+    parser.add_argument("--token", help="shared token, if the coordinator requires one")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads of the engine (0 = auto)")
+    parser.add_argument("--engine-cmd", help="command line of the engine (default: faster-whisper-xxl.exe)")
+    parser.add_argument("--work-dir", help="folder for downloaded media and transcripts (default: temp folder)")
+    parser.add_argument("--shared-storage", action="store_true",
+                        help="read media from the coordinator's paths when they exist here instead of downloading")
+    parser.add_argument("--exit-when-idle", action="store_true", help="exit when the coordinator has no job")
+    args = parser.parse_args(argv)
+
+    worker = Worker(CoordinatorClient(args.coordinator, args.token), args.name, log_to_stderr, args.threads,
+                    shlex.split(args.engine_cmd) if args.engine_cmd else None, args.work_dir,
+                    args.shared_storage, args.exit_when_idle)
+
+    def request_shutdown(signum, frame):
+        log_to_stderr("[INFO] Shutting down; the running job is released to another worker.")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+    started = time.time()
+    worker.run()
+    log_to_stderr(f"[INFO] Ran for {time.time() - started:.0f} s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+from vt_chunking import SEGMENT_PATTERN, parse_timestamp
+
+# Constants
+OUTPUT_FORMATS = ("pdf", "txt", "srt", "vtt", "json")
+DEFAULT_OUTPUT_FORMATS = ("pdf",)
+FORMAT_LABELS = {"pdf": "PDF", "txt": "Text", "srt": "SRT", "vtt": "VTT", "json": "JSON"}
+# FPDF keeps every page in memory until output, so PDFs stop at about 1,000 pages of text
+PDF_MAX_CHARS = 3_000_000
+# TrueType fonts tried in order for Unicode PDFs; a fonts/ folder next to the app comes first
+UNICODE_FONT_PATHS = (
+    os.path.join(os.path.dirname(os.path.abspath(sys.argv[0] or __file__)), "fonts", "DejaVuSans.ttf"),
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts", "arial.ttf"),
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+)
+
+
+def load_fpdf():
+    """Imports fpdf on first use; it is only needed by the render stage, so the app starts without it."""
+    from fpdf import FPDF, set_global
+    set_global("FPDF_CACHE_MODE", 1) # Don't write font cache files next to system fonts
+    return FPDF
+
+
+def find_unicode_font(preferred=None):
+    """Returns the first TrueType font file that exists, or None to use the latin-1 core font."""
+    for path in ((preferred,) if preferred else ()) + UNICODE_FONT_PATHS:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def iter_segments(txt_path):
+    """Yields (start, end, text) for each line of an engine transcript; times are None for untimed lines."""
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            match = SEGMENT_PATTERN.match(line)
+            if match:
+                text = match.group(3).strip()
+                if text:
+                    yield parse_timestamp(match.group(1)), parse_timestamp(match.group(2)), text
+            elif line:
+                yield None, None, line
+
+
+def caption_timestamp(seconds, separator):
+    """Formats seconds as HH:MM:SS<separator>mmm (',' for SRT, '.' for VTT)."""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+class TranscriptWriter:
+    """Base class of the output writers: writes to a temporary file that replaces path on close()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = path + '.part'
+        self.file = open(self.temp_path, 'w', encoding='utf-8')
+
+    def write(self, start, end, text):
+        raise NotImplementedError
+
+    def finish(self):
+        """Writes any trailer before the file is closed."""
+
+    def close(self):
+        self.finish()
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+class TextTranscriptWriter(TranscriptWriter):
+    """Plain text without timestamps."""
+
+    def write(self, start, end, text):
+        self.file.write(text + "\n")
+
+
+class SrtTranscriptWriter(TranscriptWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self.index = 0
+
+    def write(self, start, end, text):
+        if start is None:
+            return # Subtitles need timing
+        self.index += 1
+        self.file.write(f"{self.index}\n{caption_timestamp(start, ',')} --> {caption_timestamp(end, ',')}\n{text}\n\n")
+
+
+class VttTranscriptWriter(TranscriptWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self.file.write("WEBVTT\n\n")
+
+    def write(self, start, end, text):
+        if start is None:
+            return
+        self.file.write(f"{caption_timestamp(start, '.')} --> {caption_timestamp(end, '.')}\n{text}\n\n")
+
+
+class JsonTranscriptWriter(TranscriptWriter):
+    """{"segments": [{"start": s, "end": s, "text": "..."}, ...]}, streamed one segment at a time."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file.write('{"segments": [')
+        self.count = 0
+
+    def write(self, start, end, text):
+        self.file.write(("," if self.count else "") + "\n  "
+                        + json.dumps({'start': start, 'end': end, 'text': text}, ensure_ascii=False))
+        self.count += 1
+
+    def finish(self):
+        self.file.write("\n]}\n")
+
+
+class PdfTranscriptWriter:
+    """Timestamp-free PDF. Uses a Unicode TrueType font when one is available, else Arial with latin-1 replacement."""
+
+    def __init__(self, path, font_path=None):
+        self.path = path
+        self.pdf = load_fpdf()()
+        # Set top, right, left, and bottom margins
+        self.pdf.set_margins(15, 15, 15)
+        self.pdf.add_page()
+        self.chars = 0
+        self.truncated = False
+        self.unicode = font_path is not None
+        if self.unicode:
+            self.pdf.add_font("TranscriptFont", "", font_path, uni=True)
+            self.pdf.set_font("TranscriptFont", size=12)
+        else:
+            self.pdf.set_font("Arial", size=12)
+
+    def write(self, start, end, text):
+        if self.truncated:
+            return
+        self.chars += len(text) + 1
+        if self.chars > PDF_MAX_CHARS:
+            self.truncated = True
+            text = (f"[Transcript cut at {PDF_MAX_CHARS:,} characters to bound memory use; "
+                    "the engine's .txt transcript has the full text.]")
+        if not self.unicode:
+            # The core fonts only cover latin-1; anything else becomes '?'
+            text = text.encode('latin-1', 'replace').decode('latin-1')
+        self.pdf.write(8, text + "\n")
+
+    def close(self):
+        temp_path = self.path + '.part'
+        self.pdf.output(temp_path)
+        os.replace(temp_path, self.path)
+
+    def abort(self):
+        try:
+            os.remove(self.path + '.part') # Left by a close() that failed part way
+        except OSError:
+            pass
+
+
+WRITERS = {
+    "txt": TextTranscriptWriter,
+    "srt": SrtTranscriptWriter,
+    "vtt": VttTranscriptWriter,
+    "json": JsonTranscriptWriter,
+}
+
+
+def render_transcript(txt_path, outputs, font_path=None):
+    """Reads an engine transcript once and writes every requested format.
+
+    outputs maps a format from OUTPUT_FORMATS to its destination path. The
+    transcript is streamed segment by segment, so the text writers use
+    constant memory; the PDF is the only output built up in memory and is cut
+    at PDF_MAX_CHARS. Returns a list of warning messages. Kept at module level
+    so it can run in the render process pool.
+    """
+    writers = []
+    try:
+        for output_format, path in outputs.items():
+            if output_format == "pdf":
+                writers.append(PdfTranscriptWriter(path, font_path))
+            else:
+                writers.append(WRITERS[output_format](path))
+        for start, end, text in iter_segments(txt_path):
+            for writer in writers:
+                writer.write(start, end, text)
+    except Exception:
+        for writer in writers:
+            writer.abort()
+        raise
+    # Every writer is closed or aborted even if one fails; a failed render leaves no partial set of outputs
+    error = None
+    closed = []
+    for writer in writers:
+        if error is None:
+            try:
+                writer.close()
+                closed.append(writer)
+                continue
+            except Exception as e:
+                error = e
+        writer.abort()
+    if error is not None:
+        for writer in closed:
+            try:
+                os.remove(writer.path)
+            except OSError:
+                pass
+        raise error
+    return [f"'{os.path.basename(writer.path)}' was cut at {PDF_MAX_CHARS:,} characters."
+            for writer in writers if getattr(writer, 'truncated', False)]